@@ -0,0 +1,132 @@
+"""
+Recall vs latency of Milvus vector indexes on a synthetic dataset
+
+Inserts clustered random vectors (similar to object crops of a few classes
+seen from many angles) into a scratch collection per index type, then runs
+single-vector searches for a sweep of search parameters and reports
+recall@k against exact cosine neighbours together with latency percentiles.
+
+Usage:
+    MILVUS_ENDPOINT=http://localhost:19530 python benchmarks/ann_index_benchmark.py \
+        [--rows 200000] [--dim 1000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from milvus_utils import (  # noqa: E402
+    build_search_params,
+    create_collection,
+    get_milvus_client,
+    rebuild_index,
+)
+
+# (index config, search parameter name, values swept)
+CONFIGS = [
+    ({"index_type": "FLAT"}, None, [None]),
+    ({"index_type": "HNSW", "M": 16, "efConstruction": 200}, "ef", [16, 32, 64, 128, 256]),
+    ({"index_type": "HNSW", "M": 32, "efConstruction": 360}, "ef", [16, 32, 64, 128, 256]),
+    ({"index_type": "IVF_FLAT", "nlist": 1024}, "nprobe", [4, 8, 16, 32, 64]),
+    ({"index_type": "IVF_PQ", "nlist": 1024, "pq_m": 50, "nbits": 8}, "nprobe", [4, 8, 16, 32, 64]),
+]
+
+
+def make_dataset(rows: int, dim: int, clusters: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    assignment = rng.integers(0, clusters, rows)
+    data = centers[assignment] + 0.35 * rng.standard_normal((rows, dim), dtype=np.float32)
+    query_assignment = rng.integers(0, clusters, queries)
+    query = centers[query_assignment] + 0.35 * rng.standard_normal((queries, dim), dtype=np.float32)
+    return data, query
+
+
+def exact_neighbours(data: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    data_n = data / np.linalg.norm(data, axis=1, keepdims=True)
+    query_n = query / np.linalg.norm(query, axis=1, keepdims=True)
+    neighbours = []
+    for start in range(0, len(query_n), 64):
+        scores = query_n[start : start + 64] @ data_n.T
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+        neighbours.append(top)
+    return np.concatenate(neighbours)
+
+
+def load_collection(milvus_client, name: str, dim: int, data: np.ndarray, index_config: dict):
+    """Fills a scratch collection and indexes it. Returns the index build time in seconds."""
+    create_collection(milvus_client, name, dim, drop_old=True, index_config=index_config)
+    for offset in range(0, len(data), 5000):
+        batch = data[offset : offset + 5000]
+        milvus_client.insert(
+            collection_name=name,
+            data=[{"vector": v.tolist(), "row": offset + i} for i, v in enumerate(batch)],
+        )
+    milvus_client.flush(name)
+    # Index the sealed segments from scratch, as manage_index.py rebuild does
+    start = time.perf_counter()
+    rebuild_index(milvus_client, name, index_config)
+    return time.perf_counter() - start
+
+
+def run_searches(milvus_client, name, query, truth, k, search_params):
+    latencies = []
+    hits = 0
+    for q, expected in zip(query, truth):
+        start = time.perf_counter()
+        result = milvus_client.search(
+            collection_name=name,
+            data=[q.tolist()],
+            limit=k,
+            search_params=search_params,
+            output_fields=["row"],
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        found = {hit["entity"]["row"] for hit in result[0]}
+        hits += len(found & set(expected.tolist()))
+    return hits / (len(query) * k), np.percentile(latencies, 50), np.percentile(latencies, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Milvus index recall vs latency")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=1000)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--endpoint", default=os.getenv("MILVUS_ENDPOINT", "http://localhost:19530"))
+    args = parser.parse_args()
+
+    milvus_client = get_milvus_client(uri=args.endpoint, token=os.getenv("MILVUS_TOKEN"))
+    data, query = make_dataset(args.rows, args.dim, args.clusters, args.queries)
+    truth = exact_neighbours(data, query, args.k)
+
+    print(f"{args.rows} rows, dim {args.dim}, {args.queries} queries, recall@{args.k}")
+    print(f"{'index':<32}{'param':>12}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}{'build s':>9}")
+    for index_config, param, values in CONFIGS:
+        name = f"ann_bench_{index_config['index_type'].lower()}"
+        label = " ".join(f"{k}={v}" for k, v in index_config.items() if k != "index_type")
+        label = f"{index_config['index_type']} {label}".strip()
+        try:
+            build_seconds = load_collection(milvus_client, name, args.dim, data, index_config)
+            for value in values:
+                search_params = build_search_params(
+                    index_config["index_type"],
+                    ef=value if param == "ef" else None,
+                    nprobe=value if param == "nprobe" else None,
+                    limit=args.k,
+                )
+                recall, p50, p95 = run_searches(milvus_client, name, query, truth, args.k, search_params)
+                shown = f"{param}={value}" if param else "-"
+                print(f"{label:<32}{shown:>12}{recall:>9.3f}{p50:>9.2f}{p95:>9.2f}{build_seconds:>9.1f}")
+        finally:
+            milvus_client.drop_collection(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+In-process feature extraction for query images with OpenVINO
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+import numpy as np
+from PIL import Image
+
+
+class OpenVINOEmbedder:
+    def __init__(
+        self,
+        model_path: str,
+        device: str = "CPU",
+        output_name: str = "prob",
+        size=(224, 224),
+        max_batch: int = 8,
+        batch_wait: float = 0.005,
+        timeout: float = 10.0,
+    ):
+        """
+        Runs the model the search_image pipeline runs (resnet-50-pytorch),
+        compiled once at startup, and batches images that arrive together
+        into a single inference.
+
+        Args:
+            model_path (str): OpenVINO IR (.xml) of the model.
+            device (str): OpenVINO device, CPU by default.
+            output_name (str): Output used as the feature vector, the
+                layer_name the pipeline publishes.
+            size (tuple): Model input size (width, height).
+            max_batch (int): Images per inference at most.
+            batch_wait (float): Seconds to wait for more images once one arrived.
+            timeout (float): Seconds embed() waits for the vectors at most.
+
+        Raises:
+            RuntimeError: If OpenVINO is not installed.
+        """
+        try:
+            import openvino as ov
+            from openvino.preprocess import PrePostProcessor
+        except ImportError as e:
+            raise RuntimeError("OpenVINO is not installed") from e
+
+        self.size = size
+        self.max_batch = max(1, max_batch)
+        self.batch_wait = batch_wait
+        self.timeout = timeout
+
+        core = ov.Core()
+        model = core.read_model(model_path)
+        # Feed BGR uint8 images as the pipeline's OpenCV pre-processing does;
+        # the IR converts and normalizes them itself
+        ppp = PrePostProcessor(model)
+        ppp.input().tensor().set_element_type(ov.Type.u8).set_layout(ov.Layout("NHWC"))
+        ppp.input().model().set_layout(ov.Layout("NCHW"))
+        model = ppp.build()
+        model.reshape([-1, size[1], size[0], 3])
+        self._compiled = core.compile_model(model, device, {"PERFORMANCE_HINT": "LATENCY"})
+        outputs = [o for o in self._compiled.outputs if output_name in o.get_names()]
+        self._output = outputs[0] if outputs else self._compiled.output(0)
+
+        # Warm up so the first query does not pay for lazy initialization
+        self._compiled(np.zeros((1, size[1], size[0], 3), dtype=np.uint8))
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedder", daemon=True)
+        self._thread.start()
+        logging.info(f"OpenVINO embedder ready: {model_path} on {device}")
+
+    def submit(self, image: Image.Image) -> Future:
+        """Queues an image; the future resolves to its feature vector."""
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    async def embed(self, images: list) -> list:
+        """
+        Feature vectors of the images, in order.
+
+        Raises:
+            asyncio.TimeoutError: If the vectors are not ready within the
+                timeout; the queued images are cancelled.
+        """
+        futures = [asyncio.wrap_future(self.submit(image)) for image in images]
+        try:
+            _, pending = await asyncio.wait(futures, timeout=self.timeout)
+        finally:
+            # Lets the worker skip images nobody waits for anymore
+            for future in futures:
+                future.cancel()
+        if pending:
+            raise asyncio.TimeoutError(f"No feature vectors after {self.timeout}s")
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _preprocess(self, image: Image.Image) -> np.ndarray:
+        image = image.convert("RGB").resize(self.size, Image.LANCZOS)
+        return np.asarray(image)[:, :, ::-1]
+
+    def _next_batch(self) -> list:
+        """
+        Waits for an image, then up to batch_wait for more. Images whose
+        caller already gave up are skipped. None once closed.
+        """
+        batch = []
+        while not batch:
+            item = self._queue.get()
+            if item is None:
+                return None
+            if item[1].set_running_or_notify_cancel():
+                batch.append(item)
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            if item[1].set_running_or_notify_cancel():
+                batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                inputs = np.stack([self._preprocess(image) for image, _ in batch])
+                vectors = self._compiled(inputs)[self._output]
+            except Exception as e:
+                logging.error(f"Embedding of {len(batch)} images failed: {str(e)}")
+                for _, future in batch:
+                    self._resolve(future, exception=e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                self._resolve(future, result=vector.reshape(-1).tolist())
+
+    @staticmethod
+    def _resolve(future: Future, result=None, exception: Exception = None):
+        # A future resolved elsewhere must not take the worker thread down
+        try:
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass
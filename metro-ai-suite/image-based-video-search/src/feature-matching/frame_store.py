@@ -0,0 +1,129 @@
+"""
+Persists MQTT frames to the static folder off the MQTT network thread
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+JPEG_MAGIC = b"\xff\xd8\xff"
+
+
+class FrameStore:
+    def __init__(self, directory: str = "static", workers: int = 2, max_pending: int = 64):
+        """
+        Saves frames as JPEG files named after their content, so a frame is
+        written once however many objects reference it and repeated frames
+        are not written again.
+
+        Args:
+            directory (str): Folder the frames are saved in.
+            workers (int): Threads decoding and writing frames.
+            max_pending (int): Frames queued or being written at most. When
+                full, save() drops the frame instead of waiting.
+        """
+        self.directory = directory
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="frame-store")
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._cond = threading.Condition()
+        # Path -> callbacks to run once it is written, for the frames being saved
+        self._pending = {}
+        self._stats = {"saved": 0, "duplicates": 0, "dropped": 0, "failed": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def save(self, frame: str, on_saved=None):
+        """
+        Queues a base64 encoded frame for saving and returns the path it will
+        be saved at, or None if the frame was dropped because the queue is full.
+
+        on_saved(path) runs on a store thread once the file exists, and not
+        at all if the frame is dropped or cannot be written.
+        """
+        digest = hashlib.blake2b(frame.encode("ascii"), digest_size=16).hexdigest()
+        path = os.path.join(self.directory, f"{digest}.jpg")
+
+        with self._cond:
+            callbacks = self._pending.get(path)
+            if callbacks is not None:
+                self._stats["duplicates"] += 1
+                if on_saved:
+                    callbacks.append(on_saved)
+                return path
+            if not self._slots.acquire(blocking=False):
+                self._stats["dropped"] += 1
+                logging.warning(f"Frame store queue full, dropped frame {digest}")
+                return None
+            self._pending[path] = [on_saved] if on_saved else []
+
+        try:
+            self._executor.submit(self._write, frame, path)
+        except RuntimeError:
+            # Shut down
+            self._finish(path, "dropped")
+            return None
+        return path
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """
+        Waits until the frames queued so far are written and their on_saved
+        callbacks ran. Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    def close(self):
+        """Waits for the queued frames to be written."""
+        self._executor.shutdown(wait=True)
+        logging.info(f"Frame store closed: {self.stats()}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _write(self, frame: str, path: str):
+        outcome = "saved"
+        try:
+            if os.path.exists(path):
+                outcome = "duplicates"
+                return
+            image_bytes = base64.b64decode(frame)
+            tmp_path = f"{path}.tmp"
+            if image_bytes.startswith(JPEG_MAGIC):
+                # Already a JPEG, no need to decode and re-encode it
+                with open(tmp_path, "wb") as f:
+                    f.write(image_bytes)
+            else:
+                Image.open(io.BytesIO(image_bytes)).convert("RGB").save(tmp_path, format="JPEG")
+            # Readers never see a partially written file
+            os.replace(tmp_path, path)
+        except Exception as e:
+            outcome = "failed"
+            logging.error(f"Failed to save frame {path}: {str(e)}")
+        finally:
+            self._finish(path, outcome)
+
+    def _finish(self, path: str, outcome: str):
+        with self._cond:
+            self._stats[outcome] += 1
+        self._slots.release()
+        ran = 0
+        while True:
+            # Frames saved again meanwhile may have added callbacks
+            with self._cond:
+                callbacks = self._pending[path][ran:]
+                if not callbacks or outcome not in ("saved", "duplicates"):
+                    del self._pending[path]
+                    self._cond.notify_all()
+                    return
+            ran += len(callbacks)
+            for callback in callbacks:
+                try:
+                    callback(path)
+                except Exception as e:
+                    logging.error(f"Callback for frame {path} failed: {str(e)}")
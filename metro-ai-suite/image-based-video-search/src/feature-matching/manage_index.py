@@ -0,0 +1,70 @@
+"""
+Build or rebuild the vector index of the feature-matching collection
+
+Usage (inside the feature-matching container):
+    python manage_index.py describe
+    python manage_index.py rebuild [--index-type HNSW] [--M 16] [--efConstruction 200]
+    python manage_index.py rebuild --index-type IVF_FLAT --nlist 2048
+
+Settings not given on the command line come from the same environment
+variables the server uses (see milvus_utils.index_config_from_env). Searches
+fail while the index is rebuilt; ingestion continues.
+"""
+
+import argparse
+import os
+import time
+
+from dotenv import load_dotenv
+
+from milvus_utils import (
+    INDEX_TYPES,
+    VECTOR_INDEX,
+    get_milvus_client,
+    index_config_from_env,
+    rebuild_index,
+)
+
+
+def main():
+    load_dotenv()
+    config = index_config_from_env()
+
+    parser = argparse.ArgumentParser(description="Manage the feature-matching vector index")
+    parser.add_argument("command", choices=["describe", "rebuild"])
+    parser.add_argument("--collection", default=os.getenv("COLLECTION_NAME"))
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=config["index_type"])
+    parser.add_argument("--M", type=int, default=config["M"])
+    parser.add_argument("--efConstruction", type=int, default=config["efConstruction"])
+    parser.add_argument("--nlist", type=int, default=config["nlist"])
+    parser.add_argument("--pq-m", type=int, default=config["pq_m"])
+    parser.add_argument("--nbits", type=int, default=config["nbits"])
+    args = parser.parse_args()
+
+    milvus_client = get_milvus_client(
+        uri=os.getenv("MILVUS_ENDPOINT"), token=os.getenv("MILVUS_TOKEN")
+    )
+    if not milvus_client.has_collection(args.collection):
+        parser.error(f"Collection {args.collection} does not exist")
+
+    if args.command == "rebuild":
+        index_config = {
+            "index_type": args.index_type,
+            "M": args.M,
+            "efConstruction": args.efConstruction,
+            "nlist": args.nlist,
+            "pq_m": args.pq_m,
+            "nbits": args.nbits,
+        }
+        print(f"Rebuilding {args.index_type} index on {args.collection}...")
+        start = time.perf_counter()
+        rebuild_index(milvus_client, args.collection, index_config)
+        print(f"Index rebuilt and collection loaded in {time.perf_counter() - start:.1f}s")
+
+    stats = milvus_client.get_collection_stats(args.collection)
+    print(f"Rows: {stats.get('row_count')}")
+    print(f"Index: {milvus_client.describe_index(args.collection, VECTOR_INDEX)}")
+
+
+if __name__ == "__main__":
+    main()
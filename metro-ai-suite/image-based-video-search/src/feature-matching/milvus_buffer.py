@@ -0,0 +1,178 @@
+"""
+Write-behind buffer for Milvus inserts
+"""
+
+import logging
+import threading
+import time
+
+
+class MilvusWriteBuffer:
+    def __init__(
+        self,
+        milvus_client,
+        collection_name: str,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        max_rows: int = 10000,
+        put_timeout: float = 1.0,
+        insert_retries: int = 3,
+    ):
+        """
+        Accumulates rows across MQTT frames and inserts them into Milvus in
+        batches from a background thread.
+
+        Args:
+            milvus_client (MilvusClient): Client used for the inserts.
+            collection_name (str): Collection the rows are inserted into.
+            batch_size (int): Rows per insert; a full batch is flushed right away.
+            flush_interval (float): Max seconds a row waits before it is flushed.
+            max_rows (int): Rows buffered at most. When full, add() waits up to
+                put_timeout seconds for room and then drops the rows.
+            put_timeout (float): See max_rows.
+            insert_retries (int): Attempts per batch before it is dropped.
+        """
+        self.milvus_client = milvus_client
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_rows = max(max_rows, self.batch_size)
+        self.put_timeout = put_timeout
+        self.insert_retries = max(1, insert_retries)
+
+        self._rows = []
+        self._oldest = None  # time the oldest buffered row was added
+        self._closed = False
+        self._flush_requested = False
+        # Rows accepted so far, and how many of them were inserted, dropped or cleared
+        self._accepted = 0
+        self._handled = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name="milvus-writer", daemon=True
+        )
+        self._stats = {"inserted": 0, "dropped": 0, "failed_inserts": 0, "batches": 0}
+
+    def start(self):
+        self._thread.start()
+
+    def add(self, rows: list) -> bool:
+        """
+        Queues rows for insertion. Returns False if they were dropped because
+        the buffer stayed full for put_timeout seconds or is closed.
+        """
+        if not rows:
+            return True
+        deadline = time.monotonic() + self.put_timeout
+        with self._cond:
+            while len(self._rows) + len(rows) > self.max_rows and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["dropped"] += len(rows)
+                    logging.warning(
+                        f"Milvus write buffer full ({len(self._rows)} rows), dropped {len(rows)} rows"
+                    )
+                    return False
+                self._cond.wait(remaining)
+            if self._closed:
+                self._stats["dropped"] += len(rows)
+                return False
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.extend(rows)
+            self._accepted += len(rows)
+            self._cond.notify_all()
+        return True
+
+    def wait_flushed(self, timeout: float = None) -> bool:
+        """
+        Flushes the rows buffered so far without waiting for the flush
+        interval, and waits until they are inserted. Returns False on timeout.
+        """
+        with self._cond:
+            target = self._accepted
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._handled >= target, timeout)
+
+    def clear(self):
+        """Discards buffered rows, e.g. before the collection is recreated."""
+        with self._cond:
+            self._handled += len(self._rows)
+            self._rows.clear()
+            self._oldest = None
+            self._cond.notify_all()
+
+    def close(self, timeout: float = 30):
+        """Flushes every buffered row and stops the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        logging.info(f"Milvus write buffer closed: {self.stats()}")
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._stats, buffered=len(self._rows))
+
+    def _next_batch(self) -> list:
+        """Waits for a full batch, the flush interval or close. [] once closed and drained."""
+        with self._cond:
+            while (
+                not self._closed
+                and not self._flush_requested
+                and len(self._rows) < self.batch_size
+            ):
+                if self._rows:
+                    timeout = self._oldest + self.flush_interval - time.monotonic()
+                    if timeout <= 0:
+                        break
+                else:
+                    timeout = None
+                self._cond.wait(timeout)
+
+            batch = self._rows[: self.batch_size]
+            del self._rows[: self.batch_size]
+            if not self._rows:
+                self._oldest = None
+                self._flush_requested = False
+            # Wake producers waiting for room
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            self._insert(batch)
+
+    def _insert(self, batch: list):
+        for attempt in range(1, self.insert_retries + 1):
+            try:
+                self.milvus_client.insert(
+                    collection_name=self.collection_name,
+                    data=batch,
+                )
+                with self._cond:
+                    self._stats["inserted"] += len(batch)
+                    self._stats["batches"] += 1
+                    self._handled += len(batch)
+                    self._cond.notify_all()
+                logging.info(f"Inserted {len(batch)} tensors into Milvus.")
+                return
+            except Exception as e:
+                with self._cond:
+                    self._stats["failed_inserts"] += 1
+                logging.error(
+                    f"Milvus insert of {len(batch)} rows failed "
+                    f"(attempt {attempt}/{self.insert_retries}): {str(e)}"
+                )
+                if attempt < self.insert_retries:
+                    time.sleep(min(2 ** attempt, 10))
+
+        with self._cond:
+            self._stats["dropped"] += len(batch)
+            self._handled += len(batch)
+            self._cond.notify_all()
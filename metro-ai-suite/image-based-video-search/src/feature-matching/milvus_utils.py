@@ -1,4 +1,14 @@
-from pymilvus import MilvusClient
+import os
+
+from pymilvus import DataType, MilvusClient
+from pymilvus.client import ts_utils
+
+VECTOR_FIELD = "vector"
+# Quick-setup collections name their index after the vector field as well
+VECTOR_INDEX = "vector"
+METRIC_TYPE = "COSINE"
+INDEX_TYPES = ("HNSW", "IVF_FLAT", "IVF_PQ", "FLAT", "AUTOINDEX")
+CONSISTENCY_LEVELS = ("Strong", "Bounded", "Session", "Eventually")
 
 
 class CollectionExists(RuntimeError):
@@ -9,8 +19,87 @@ def get_milvus_client(uri: str, token: str = None) -> MilvusClient:
     return MilvusClient(uri=uri, token=token)
 
 
+def consistency_level_from_env() -> str:
+    """
+    MILVUS_CONSISTENCY_LEVEL: consistency of searches without a session token,
+    Bounded (default), Strong, Session or Eventually
+    """
+    level = os.getenv("MILVUS_CONSISTENCY_LEVEL", "Bounded").capitalize()
+    if level not in CONSISTENCY_LEVELS:
+        raise ValueError(
+            f"Unsupported consistency level {level}, use one of {', '.join(CONSISTENCY_LEVELS)}"
+        )
+    return level
+
+
+def index_config_from_env() -> dict:
+    """
+    Vector index settings:
+      MILVUS_INDEX_TYPE: HNSW (default), IVF_FLAT, IVF_PQ, FLAT or AUTOINDEX
+      HNSW_M, HNSW_EF_CONSTRUCTION: HNSW graph degree and build-time candidates
+      IVF_NLIST: IVF cluster count
+      IVF_PQ_M, IVF_PQ_NBITS: PQ sub-vectors (must divide the dimension) and bits each
+    """
+    return {
+        "index_type": os.getenv("MILVUS_INDEX_TYPE", "HNSW").upper(),
+        "M": int(os.getenv("HNSW_M", 16)),
+        "efConstruction": int(os.getenv("HNSW_EF_CONSTRUCTION", 200)),
+        "nlist": int(os.getenv("IVF_NLIST", 1024)),
+        "pq_m": int(os.getenv("IVF_PQ_M", 50)),
+        "nbits": int(os.getenv("IVF_PQ_NBITS", 8)),
+    }
+
+
+def build_index_params(
+    index_type: str = "HNSW",
+    M: int = 16,
+    efConstruction: int = 200,
+    nlist: int = 1024,
+    pq_m: int = 50,
+    nbits: int = 8,
+):
+    index_type = index_type.upper()
+    if index_type == "HNSW":
+        params = {"M": M, "efConstruction": efConstruction}
+    elif index_type == "IVF_FLAT":
+        params = {"nlist": nlist}
+    elif index_type == "IVF_PQ":
+        params = {"nlist": nlist, "m": pq_m, "nbits": nbits}
+    elif index_type in ("FLAT", "AUTOINDEX"):
+        params = {}
+    else:
+        raise ValueError(f"Unsupported index type {index_type}, use one of {', '.join(INDEX_TYPES)}")
+
+    index_params = MilvusClient.prepare_index_params()
+    index_params.add_index(
+        field_name=VECTOR_FIELD,
+        index_type=index_type,
+        index_name=VECTOR_INDEX,
+        metric_type=METRIC_TYPE,
+        params=params,
+    )
+    return index_params
+
+
+def build_search_params(index_type: str, ef: int = None, nprobe: int = None, limit: int = 10) -> dict:
+    """Search-time parameters for the collection's index type."""
+    params = {}
+    index_type = (index_type or "").upper()
+    if index_type == "HNSW" and ef:
+        # HNSW needs at least as many candidates as results
+        params["ef"] = max(ef, limit)
+    elif index_type.startswith("IVF") and nprobe:
+        params["nprobe"] = nprobe
+    return {"metric_type": METRIC_TYPE, "params": params}
+
+
 def create_collection(
-    milvus_client: MilvusClient, collection_name: str, dim: int, drop_old: bool = True
+    milvus_client: MilvusClient,
+    collection_name: str,
+    dim: int,
+    drop_old: bool = True,
+    index_config: dict = None,
+    consistency_level: str = "Bounded",
 ):
     if milvus_client.has_collection(collection_name) and drop_old:
         milvus_client.drop_collection(collection_name)
@@ -18,20 +107,134 @@ def create_collection(
         raise CollectionExists(
             f"Collection {collection_name} already exists. Set drop_old=True to create a new one instead."
         )
+
+    # Same fields as the quick-setup collection (filename, label and timestamp
+    # are dynamic fields), with an explicit vector index
+    schema = MilvusClient.create_schema(auto_id=True, enable_dynamic_field=True)
+    schema.add_field("id", DataType.INT64, is_primary=True)
+    schema.add_field(VECTOR_FIELD, DataType.FLOAT_VECTOR, dim=dim)
     return milvus_client.create_collection(
         collection_name=collection_name,
-        dimension=dim,
-        metric_type="COSINE",
-        consistency_level="Strong",
-        auto_id=True,
+        schema=schema,
+        index_params=build_index_params(**(index_config or index_config_from_env())),
+        consistency_level=consistency_level,
+    )
+
+
+def get_index_type(milvus_client: MilvusClient, collection_name: str) -> str:
+    """Index type of the collection's vector field, None if it has no index."""
+    if VECTOR_INDEX not in milvus_client.list_indexes(collection_name, field_name=VECTOR_FIELD):
+        return None
+    return milvus_client.describe_index(collection_name, VECTOR_INDEX).get("index_type")
+
+
+def rebuild_index(milvus_client: MilvusClient, collection_name: str, index_config: dict):
+    """
+    Replaces the collection's vector index. The collection cannot be searched
+    until the new index is built and the collection is loaded again.
+    """
+    index_params = build_index_params(**index_config)
+    milvus_client.release_collection(collection_name)
+    if VECTOR_INDEX in milvus_client.list_indexes(collection_name, field_name=VECTOR_FIELD):
+        milvus_client.drop_index(collection_name, VECTOR_INDEX)
+    milvus_client.create_index(collection_name, index_params)
+    milvus_client.load_collection(collection_name)
+
+
+def last_write_timestamp(collection_name: str) -> int:
+    """
+    Hybrid timestamp of this process's last insert into the collection, 0 if
+    none. A search with guarantee_timestamp set to it sees that insert.
+    """
+    return ts_utils.get_collection_ts(collection_name) or 0
+
+
+def consistency_kwargs(consistency_level: str, session_token: int = None) -> dict:
+    """
+    Search arguments for the configured level or, given a session token (see
+    last_write_timestamp), for reading at least up to that token.
+    """
+    if session_token:
+        return {"consistency_level": "Customized", "guarantee_timestamp": session_token}
+    return {"consistency_level": consistency_level}
+
+
+def get_search_results(
+    milvus_client,
+    collection_name,
+    query_vector,
+    output_fields,
+    search_params=None,
+    limit=10,
+    **kwargs,
+):
+    return get_batch_search_results(
+        milvus_client,
+        collection_name,
+        [query_vector],
+        output_fields,
+        search_params=search_params,
+        limit=limit,
+        **kwargs,
     )
 
 
-def get_search_results(milvus_client, collection_name, query_vector, output_fields):
+def get_batch_search_results(
+    milvus_client,
+    collection_name,
+    query_vectors,
+    output_fields,
+    search_params=None,
+    limit=10,
+    **kwargs,
+):
+    """Searches all query vectors in one request; one list of hits per vector."""
     search_res = milvus_client.search(
         collection_name=collection_name,
-        data=[query_vector],
-        search_params={"metric_type": "COSINE", "params": {}},
+        data=query_vectors,
+        limit=limit,
+        search_params=search_params or {"metric_type": METRIC_TYPE, "params": {}},
         output_fields=output_fields,
+        **kwargs,
     )
     return search_res
+
+
+FUSION_METHODS = ("rrf", "max")
+# Damps the weight of the top ranks in reciprocal rank fusion
+RRF_K = 60
+
+
+def fuse_results(results, method: str = "rrf", limit: int = 10) -> list:
+    """
+    Merges the hits of several query vectors into one ranking.
+
+    rrf sums 1 / (RRF_K + rank) over the queries that found an entity, so
+    entities similar to several queries rank first. max ranks entities by
+    their best cosine similarity to any query.
+
+    Each fused hit keeps the best distance and adds its score and the number
+    of queries that found it.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unsupported fusion {method}, use one of {', '.join(FUSION_METHODS)}")
+
+    fused = {}
+    for hits in results:
+        for rank, hit in enumerate(hits, start=1):
+            score = 1 / (RRF_K + rank) if method == "rrf" else hit["distance"]
+            entry = fused.get(hit["id"])
+            if entry is None:
+                fused[hit["id"]] = {
+                    "id": hit["id"],
+                    "distance": hit["distance"],
+                    "entity": hit["entity"],
+                    "score": score,
+                    "matches": 1,
+                }
+                continue
+            entry["distance"] = max(entry["distance"], hit["distance"])
+            entry["score"] = entry["score"] + score if method == "rrf" else max(entry["score"], score)
+            entry["matches"] += 1
+
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:limit]
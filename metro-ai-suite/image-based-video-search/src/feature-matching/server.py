@@ -2,29 +2,41 @@
 FastAPI server for search
 """
 
-import base64
+import asyncio
 import io
 import json
 import logging
 import os
-from typing import Annotated
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, Literal
 
 import httpx  # For sending HTTP requests
 import numpy as np
 import paho.mqtt.client as mqtt
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, UploadFile
+from fastapi import FastAPI, File, Query, Response, UploadFile
 from fastapi.responses import FileResponse, JSONResponse
 from marshmallow import ValidationError
 from PIL import Image
 from pymilvus import Collection, CollectionSchema, DataType, FieldSchema
 
+from embedder import OpenVINOEmbedder
 from encoder import Base64ImageProcessor
+from frame_store import FrameStore
+from milvus_buffer import MilvusWriteBuffer
 from milvus_utils import (
     CollectionExists,
+    build_search_params,
+    consistency_kwargs,
+    consistency_level_from_env,
     create_collection,
+    fuse_results,
+    get_batch_search_results,
+    get_index_type,
     get_milvus_client,
-    get_search_results,
+    index_config_from_env,
+    last_write_timestamp,
 )
 from schemas import PayloadSchema, TensorSchema
 
@@ -35,9 +47,48 @@ COLLECTION_NAME = os.getenv("COLLECTION_NAME")
 MILVUS_ENDPOINT = os.getenv("MILVUS_ENDPOINT")
 MILVUS_TOKEN = os.getenv("MILVUS_TOKEN")
 
+# Milvus write-behind buffer: rows are inserted in batches of
+# MILVUS_INSERT_BATCH_SIZE, or after MILVUS_FLUSH_INTERVAL seconds at most.
+# When MILVUS_BUFFER_MAX_ROWS rows are waiting, new frames wait up to
+# MILVUS_BUFFER_PUT_TIMEOUT seconds for room and are then dropped.
+MILVUS_INSERT_BATCH_SIZE = int(os.getenv("MILVUS_INSERT_BATCH_SIZE", 256))
+MILVUS_FLUSH_INTERVAL = float(os.getenv("MILVUS_FLUSH_INTERVAL", 1.0))
+MILVUS_BUFFER_MAX_ROWS = int(os.getenv("MILVUS_BUFFER_MAX_ROWS", 10000))
+MILVUS_BUFFER_PUT_TIMEOUT = float(os.getenv("MILVUS_BUFFER_PUT_TIMEOUT", 1.0))
+
+# Vector index used for new collections (see milvus_utils.index_config_from_env)
+# and default search-time parameters: HNSW candidates (ef) and IVF clusters
+# probed (nprobe). Both can be overridden per request on /search/.
+INDEX_CONFIG = index_config_from_env()
+MILVUS_SEARCH_EF = int(os.getenv("MILVUS_SEARCH_EF", 64))
+MILVUS_SEARCH_NPROBE = int(os.getenv("MILVUS_SEARCH_NPROBE", 16))
+
+# Reference images accepted by one /search/ request; they are searched together
+MAX_SEARCH_IMAGES = int(os.getenv("MAX_SEARCH_IMAGES", 16))
+
+# Consistency of searches (see milvus_utils.consistency_level_from_env). A
+# client that must see the frames ingested before a point in time gets a
+# session token from /search/session/ and passes it to /search/, which then
+# waits for Milvus to apply writes up to that token only.
+MILVUS_CONSISTENCY_LEVEL = consistency_level_from_env()
+SESSION_FLUSH_TIMEOUT = float(os.getenv("SESSION_FLUSH_TIMEOUT", 5.0))
+
 # Model Settings
 MODEL_DIM = os.getenv("MODEL_DIM")
 
+# Query images are embedded in-process with OpenVINO when EMBEDDER_MODEL_PATH
+# points at the IR of the search_image pipeline's model, instead of through the
+# pipeline server. Up to EMBEDDER_MAX_BATCH concurrent queries arriving within
+# EMBEDDER_BATCH_WAIT seconds share one inference. A query not embedded within
+# EMBEDDER_TIMEOUT seconds falls back to the pipeline server.
+EMBEDDER_MODEL_PATH = os.getenv("EMBEDDER_MODEL_PATH")
+EMBEDDER_DEVICE = os.getenv("EMBEDDER_DEVICE", "CPU")
+EMBEDDER_MAX_BATCH = int(os.getenv("EMBEDDER_MAX_BATCH", 8))
+EMBEDDER_BATCH_WAIT = float(os.getenv("EMBEDDER_BATCH_WAIT", 0.005))
+EMBEDDER_TIMEOUT = float(os.getenv("EMBEDDER_TIMEOUT", 10))
+
+PIPELINE_SERVER_URL = "http://ibvs-dlstreamer-pipeline-server:8080"
+
 # MQTT Settings
 MQTT_BROKER = os.getenv("MQTT_BROKER")
 MQTT_PORT = int(os.getenv("MQTT_PORT", 1883))
@@ -46,6 +97,11 @@ MQTT_TOPIC = os.getenv("MQTT_TOPIC")
 # Detection Settings
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.4))
 
+# Frames are saved to static/ by FRAME_SAVE_WORKERS threads. At most
+# FRAME_SAVE_QUEUE frames wait to be saved; further frames are skipped.
+FRAME_SAVE_WORKERS = int(os.getenv("FRAME_SAVE_WORKERS", 2))
+FRAME_SAVE_QUEUE = int(os.getenv("FRAME_SAVE_QUEUE", 64))
+
 # Create Milvus Client
 milvus_client = get_milvus_client(uri=MILVUS_ENDPOINT, token=MILVUS_TOKEN)
 
@@ -59,10 +115,43 @@ try:
         collection_name=COLLECTION_NAME,
         dim=int(MODEL_DIM),
         drop_old=False,
+        index_config=INDEX_CONFIG,
+        consistency_level=MILVUS_CONSISTENCY_LEVEL,
     )
 except CollectionExists:
     print(f"Collection {COLLECTION_NAME} already exists. Will not create a new one.")
 
+# Inserts run on the buffer's writer thread, never on paho's network thread
+milvus_buffer = MilvusWriteBuffer(
+    milvus_client=milvus_client,
+    collection_name=COLLECTION_NAME,
+    batch_size=MILVUS_INSERT_BATCH_SIZE,
+    flush_interval=MILVUS_FLUSH_INTERVAL,
+    max_rows=MILVUS_BUFFER_MAX_ROWS,
+    put_timeout=MILVUS_BUFFER_PUT_TIMEOUT,
+)
+milvus_buffer.start()
+
+# Frame decoding and writes run on the store's threads, never on paho's network thread
+frame_store = FrameStore(
+    directory="static", workers=FRAME_SAVE_WORKERS, max_pending=FRAME_SAVE_QUEUE
+)
+
+
+# Index type of the collection, cached since it only changes on /clear/ or an
+# index rebuild (manage_index.py)
+_index_type_cache = {}
+INDEX_TYPE_CACHE_SECONDS = 60
+
+
+def current_index_type() -> str:
+    cached = _index_type_cache.get("value")
+    if cached and time.monotonic() - cached[1] < INDEX_TYPE_CACHE_SECONDS:
+        return cached[0]
+    index_type = get_index_type(milvus_client, COLLECTION_NAME)
+    _index_type_cache["value"] = (index_type, time.monotonic())
+    return index_type
+
 
 # Define the on_connect callback
 def on_connect(client, userdata, flags, rc):
@@ -90,11 +179,6 @@ def on_message(client, userdata, message):
         # Prepare data for Milvus insertion
         to_insert = []
 
-        if frame:
-            # Decode the frame
-            image_bytes = base64.b64decode(frame)
-            image = Image.open(io.BytesIO(image_bytes))
-
         for obj in objects:
             tensors = obj.get("tensors", [])
             label_name = obj.get("detection", {}).get("label", "unknown").lower().replace(" ", "_")
@@ -109,15 +193,10 @@ def on_message(client, userdata, message):
                         tensor_data = validated_tensor["data"]
 
                         if confidence > CONFIDENCE_THRESHOLD:
-                            # Save the frame as an image
-                            frame_path = f"static/{timestamp}_{label_name}.jpg"
-                            image.save(frame_path)
-
-                            # Prepare data for Milvus
+                            # Prepare data for Milvus; the filename is set once the frame is saved
                             to_insert.append(
                                 {
                                 "vector": tensor_data,
-                                "filename": frame_path,
                                 "label": label_name,
                                 "timestamp": timestamp,
                                 }
@@ -125,13 +204,17 @@ def on_message(client, userdata, message):
                 except ValidationError as e:
                     logging.warning(f"Invalid tensor skipped: {e.messages}")
                     continue
-            # Insert data into Milvus
-            if to_insert:
-                milvus_client.insert(
-                    collection_name=COLLECTION_NAME,
-                    data=to_insert,
-                )
-                logging.info(f"Inserted tensors into Milvus.")
+
+        if not to_insert or not frame:
+            return
+
+        def queue_rows(frame_path):
+            # Queue the frame's rows; they are inserted in batches across frames
+            milvus_buffer.add([dict(row, filename=frame_path) for row in to_insert])
+
+        # Rows are only queued once their frame is on disk, so the index never
+        # points at a frame that was dropped or failed to save
+        frame_store.save(frame, on_saved=queue_rows)
 
     except ValidationError as e:
         logging.error(f"Invalid payload: {e.messages}")
@@ -148,43 +231,71 @@ mqtt_client.connect(MQTT_BROKER, MQTT_PORT, 60)
 # Start the MQTT client loop in a separate thread
 mqtt_client.loop_start()
 
-# Create static folder if it doesn't exist
-os.makedirs("static", exist_ok=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop receiving frames, then flush what is still buffered
+    mqtt_client.loop_stop()
+    mqtt_client.disconnect()
+    # Saved frames queue their rows, so the frame store goes first
+    frame_store.close()
+    milvus_buffer.close()
+    if embedder:
+        embedder.close()
+    await http_client.aclose()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Initialize the Base64ImageProcessor with the desired size
 processor = Base64ImageProcessor(size=(224, 224))
 
+# Shared by the pipeline server requests to reuse connections
+http_client = httpx.AsyncClient(timeout=30)
 
-@app.post("/search/")
-async def search(
-    images: Annotated[list[UploadFile], File(description="Upload an image")]
-):
+embedder = None
+if EMBEDDER_MODEL_PATH:
+    try:
+        embedder = OpenVINOEmbedder(
+            model_path=EMBEDDER_MODEL_PATH,
+            device=EMBEDDER_DEVICE,
+            max_batch=EMBEDDER_MAX_BATCH,
+            batch_wait=EMBEDDER_BATCH_WAIT,
+            timeout=EMBEDDER_TIMEOUT,
+        )
+    except Exception as e:
+        logging.error(f"In-process embedder unavailable, using the pipeline server: {str(e)}")
+
+
+class PipelineError(Exception):
+    pass
+
+
+async def pipeline_feature_vector(img: Image.Image) -> list:
+    """Feature vector of the image from the search_image pipeline."""
     # Step 0: Check if a search_image pipeline is already running
     pipeline_id = None
     try:
-        async with httpx.AsyncClient() as client:
-            # Fetch pipelines status
-            response = await client.get("http://ibvs-dlstreamer-pipeline-server:8080/pipelines/status")
-            response.raise_for_status()
-            pipelines = response.json()
-            
-            # Check if a search_image pipeline is already running
-            for pipeline in pipelines:
-
-                # Ignore the pipelines that are not running
-                if pipeline["state"] != "RUNNING":
-                    continue
+        # Fetch pipelines status
+        response = await http_client.get(f"{PIPELINE_SERVER_URL}/pipelines/status")
+        response.raise_for_status()
+        pipelines = response.json()
 
-                _pipeline_response = await client.get(f"http://ibvs-dlstreamer-pipeline-server:8080/pipelines/{pipeline['id']}")
-                _pipeline_response.raise_for_status()
-                _pipeline_response_json = _pipeline_response.json()
+        # Check if a search_image pipeline is already running
+        for pipeline in pipelines:
 
-                # If the pipeline is search_image, save the pipeline_id and break
-                if _pipeline_response_json["request"]["pipeline"]["version"] == "search_image":
-                    pipeline_id = pipeline['id']
-                    break
+            # Ignore the pipelines that are not running
+            if pipeline["state"] != "RUNNING":
+                continue
+
+            _pipeline_response = await http_client.get(f"{PIPELINE_SERVER_URL}/pipelines/{pipeline['id']}")
+            _pipeline_response.raise_for_status()
+            _pipeline_response_json = _pipeline_response.json()
+
+            # If the pipeline is search_image, save the pipeline_id and break
+            if _pipeline_response_json["request"]["pipeline"]["version"] == "search_image":
+                pipeline_id = pipeline['id']
+                break
 
     except httpx.RequestError as e:
         # Ignore the error and continue
@@ -192,46 +303,30 @@ async def search(
 
     # Step 1: When the search_image pipeline is not running, start the pipeline with sync mode as true
     if not pipeline_id:
-        pipeline_endpoint = "http://ibvs-dlstreamer-pipeline-server:8080/pipelines/user_defined_pipelines/search_image"
+        pipeline_endpoint = f"{PIPELINE_SERVER_URL}/pipelines/user_defined_pipelines/search_image"
         body = {"sync": True}
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(pipeline_endpoint, json=body)
-                response.raise_for_status()  # Raise HTTP error for non-2xx responses
+            response = await http_client.post(pipeline_endpoint, json=body)
+            response.raise_for_status()  # Raise HTTP error for non-2xx responses
 
-                pipeline_id = (
-                    response.text.strip()
-                )  # Use `.strip()` to remove any extra whitespace
+            pipeline_id = (
+                response.text.strip()
+            )  # Use `.strip()` to remove any extra whitespace
 
         except httpx.RequestError as e:
-            return {
-                "error": f"An error occurred while making the pipeline request: {str(e)}"
-            }
-
-    # Step 2: Process the uploaded images
-    # Process the uploaded images
-    results = []
-    for image in images:
-        # Read the uploaded image
-        _bytes = await image.read()
-
-        # Convert bytes to a PIL image
-        img = Image.open(io.BytesIO(_bytes))
-
-        # Process the image using the Base64ImageProcessor
-        base64_image = processor.process_image_to_base64(img)
+            raise PipelineError(
+                f"An error occurred while making the pipeline request: {str(e)}"
+            )
 
-        # Append the Base64 string to the results
-        results.append({"base64_image": base64_image})
-    # Extract the Base64 string
-    base64_image = results[0]["base64_image"]  # Access the value of "base64_image"
+    # Step 2: Process the image using the Base64ImageProcessor
+    base64_image = processor.process_image_to_base64(img)
 
     # Step 3: Send data to the second pipeline
     # Ensure pipeline_id has no extra quotes
     pipeline_id = pipeline_id.strip('"').strip()  # Remove surrounding quotes, if any
     second_pipeline_endpoint = (
-        f"http://ibvs-dlstreamer-pipeline-server:8080/pipelines/user_defined_pipelines/search_image/{pipeline_id}"
+        f"{PIPELINE_SERVER_URL}/pipelines/user_defined_pipelines/search_image/{pipeline_id}"
     )
 
     second_pipeline_body = {
@@ -241,42 +336,122 @@ async def search(
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            second_response = await client.post(
-                second_pipeline_endpoint, json=second_pipeline_body
-            )
-            second_response.raise_for_status()  # Raise HTTP error for non-2xx responses
-
-            second_pipeline_result = second_response.json()  # Parse the response
-            second_pipeline_result_parsed = json.loads(second_pipeline_result)
-            objects = second_pipeline_result_parsed.get("metadata", {}).get("objects", [])
-
-            # Initialize a list to store tensor data
-            tensor_data_list = []
-
-            # Iterate through objects and extract tensor data
-            for obj in objects:
-                tensors = obj.get("tensors", [])
-                for tensor in tensors:
-                    if tensor.get("layer_name") == "prob":  # Filter by layer_name
-                        tensor_data = tensor.get("data", [])
-                        if tensor_data:
-                            tensor_data_list.append(tensor_data)
-            # Print the extracted tensor data
-            print("Extracted Tensor Data:", tensor_data_list[0])
+        second_response = await http_client.post(
+            second_pipeline_endpoint, json=second_pipeline_body
+        )
+        second_response.raise_for_status()  # Raise HTTP error for non-2xx responses
+
+        second_pipeline_result = second_response.json()  # Parse the response
+        second_pipeline_result_parsed = json.loads(second_pipeline_result)
+        objects = second_pipeline_result_parsed.get("metadata", {}).get("objects", [])
+
+        # Initialize a list to store tensor data
+        tensor_data_list = []
+
+        # Iterate through objects and extract tensor data
+        for obj in objects:
+            tensors = obj.get("tensors", [])
+            for tensor in tensors:
+                if tensor.get("layer_name") == "prob":  # Filter by layer_name
+                    tensor_data = tensor.get("data", [])
+                    if tensor_data:
+                        tensor_data_list.append(tensor_data)
 
     except httpx.RequestError as e:
-        return {
-            "error": f"An error occurred while making the second pipeline request: {str(e)}"
-        }
-    
+        raise PipelineError(
+            f"An error occurred while making the second pipeline request: {str(e)}"
+        )
+
+    return tensor_data_list[0]
+
+
+async def feature_vectors(images: list) -> list:
+    """Feature vectors of the images, in-process when the embedder is available."""
+    if embedder:
+        try:
+            return await embedder.embed(images)
+        except Exception as e:
+            logging.error(f"In-process embedding failed, using the pipeline server: {str(e)}")
+    return [await pipeline_feature_vector(img) for img in images]
+
+
+@app.get("/search/session/")
+async def session_token():
+    """
+    Token covering every frame received so far: frames still being saved
+    and rows still in the write buffer are flushed first, waiting up to
+    SESSION_FLUSH_TIMEOUT seconds for each.
+    """
+    saved = await asyncio.to_thread(frame_store.wait_idle, SESSION_FLUSH_TIMEOUT)
+    flushed = await asyncio.to_thread(milvus_buffer.wait_flushed, SESSION_FLUSH_TIMEOUT)
+    if not (saved and flushed):
+        logging.warning("Write buffer not flushed in time, session token may miss recent frames")
+    # Hybrid timestamps exceed the integers JavaScript represents exactly
+    return {"session_token": str(last_write_timestamp(COLLECTION_NAME))}
+
+
+@app.post("/search/")
+async def search(
+    response: Response,
+    images: Annotated[list[UploadFile], File(description="Upload one or more images")],
+    limit: Annotated[int, Query(ge=1, le=1000, description="Number of results")] = 10,
+    ef: Annotated[
+        int | None, Query(ge=1, description="HNSW search candidates (higher: better recall, slower)")
+    ] = None,
+    nprobe: Annotated[
+        int | None, Query(ge=1, description="IVF clusters probed (higher: better recall, slower)")
+    ] = None,
+    session_token: Annotated[
+        int | None, Query(ge=0, description="Token from /search/session/ the results must reflect")
+    ] = None,
+    fusion: Annotated[
+        Literal["rrf", "max"] | None,
+        Query(description="Also rank the hits of all images together: reciprocal rank or max score"),
+    ] = None,
+):
+    """
+    Searches with every uploaded image in one Milvus request. Returns a list
+    of hits per image, or with fusion {"results": <hits per image>,
+    "fused": <combined ranking>}.
+    """
+    if len(images) > MAX_SEARCH_IMAGES:
+        return {"error": f"At most {MAX_SEARCH_IMAGES} images can be searched at once"}
+
+    # Read the uploaded images
+    pil_images = []
+    for image in images:
+        _bytes = await image.read()
+
+        # Convert bytes to a PIL image
+        pil_images.append(Image.open(io.BytesIO(_bytes)))
+
     try:
-        results = get_search_results(
+        tensor_data_list = await feature_vectors(pil_images)
+    except PipelineError as e:
+        return {"error": str(e)}
+
+    try:
+        search_params = build_search_params(
+            current_index_type(),
+            ef=ef or MILVUS_SEARCH_EF,
+            nprobe=nprobe or MILVUS_SEARCH_NPROBE,
+            limit=limit,
+        )
+        results = get_batch_search_results(
             milvus_client=milvus_client,
             collection_name=COLLECTION_NAME,
-            query_vector=tensor_data_list[0],
+            query_vectors=tensor_data_list,
             output_fields=["filename", "label", "timestamp"],
+            search_params=search_params,
+            limit=limit,
+            **consistency_kwargs(MILVUS_CONSISTENCY_LEVEL, session_token),
+        )
+        # Lets the client carry its session forward to the next search
+        response.headers["X-Session-Token"] = str(
+            max(session_token or 0, last_write_timestamp(COLLECTION_NAME))
         )
+        if fusion:
+            return {"results": results, "fused": fuse_results(results, fusion, limit)}
         return results
     except Exception as e:
         logging.error(f"Search failed: {str(e)}")
@@ -295,12 +470,19 @@ async def get_image(filename: str):
 @app.post("/clear/")
 async def clear():
     print("Clearing collection")
+    # Let pending frame writes finish, so none is replacing a file deleted below
+    if not await asyncio.to_thread(frame_store.wait_idle, SESSION_FLUSH_TIMEOUT):
+        logging.warning("Frame store not idle in time, clearing anyway")
+    milvus_buffer.clear()
     create_collection(
         milvus_client=milvus_client,
         collection_name=COLLECTION_NAME,
         dim=int(MODEL_DIM),
         drop_old=True,
+        index_config=INDEX_CONFIG,
+        consistency_level=MILVUS_CONSISTENCY_LEVEL,
     )
+    _index_type_cache.clear()
 
     for file in os.listdir("static"):
         os.remove(os.path.join("static", file))
@@ -0,0 +1,122 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""
+Encode/decode benchmark for the Redis payload codecs (service/codec.py).
+
+Builds realistic payloads (rules, action responses, search results with
+keyframe mappings, matched-event records) and reports, per codec and payload
+type, the stored size and the median encode/decode time.
+
+Usage:
+    python benchmark_tools/redis_codec_benchmark.py [--count 1000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from service.codec import CODECS, decode  # noqa: E402
+
+LABELS = ("person", "car", "truck", "bicycle", "dog")
+ACTIONS = ("summarize", "add to search")
+
+
+def make_rule(i: int) -> dict:
+    camera = f"camera-{i % 16}"
+    label = random.choice(LABELS)
+    action = random.choice(ACTIONS)
+    return {
+        "id": f"{camera}-{label}-{action}-{random.getrandbits(32):08x}",
+        "label": label,
+        "action": action,
+        "camera": camera,
+        "priority": random.choice(("high", "normal", "low")),
+        "search_mode": "clip",
+    }
+
+
+def make_response(i: int) -> dict:
+    return {
+        "summary_id": f"{random.getrandbits(128):032x}",
+        "result": (
+            "A person in a dark jacket walks from the left side of the frame towards "
+            "the entrance, stops briefly near the parked vehicle and leaves. "
+        ) * random.randint(1, 4),
+    }
+
+
+def make_search_result(i: int) -> dict:
+    start = 1_750_000_000 + i * 37.5
+    return {
+        "video_id": f"{random.getrandbits(128):032x}",
+        "message": "Embeddings created for video",
+        "camera": f"camera-{i % 16}",
+        "start_time": start,
+        "end_time": start + 42.0,
+        "keyframes": [
+            {"offset": n, "timestamp": round(start + n * 5.25, 3), "source": "recording"}
+            for n in range(8)
+        ],
+    }
+
+
+def make_event(i: int) -> dict:
+    start = 1_750_000_000 + i * 37.5
+    return {
+        "id": f"{start:.6f}-{random.getrandbits(24):06x}",
+        "camera": f"camera-{i % 16}",
+        "label": random.choice(LABELS),
+        "start_time": start,
+        "end_time": start + random.uniform(10, 120),
+        "rule_ids": [make_rule(i)["id"] for _ in range(random.randint(1, 3))],
+    }
+
+
+PAYLOADS = {
+    "rule": make_rule,
+    "response": make_response,
+    "search_result": make_search_result,
+    "event": make_event,
+}
+
+
+def timed(fn, values, repeat: int) -> float:
+    """Median time per value in microseconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            fn(value)
+        runs.append((time.perf_counter() - start) / len(values) * 1e6)
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    random.seed(0)
+
+    missing = {"orjson", "msgpack"} - set(CODECS)
+    if missing:
+        print(f"Not installed, skipped: {', '.join(sorted(missing))}")
+
+    print(f"{'payload':<14}{'codec':<9}{'bytes':>8}{'encode us':>11}{'decode us':>11}")
+    for payload, make in PAYLOADS.items():
+        values = [make(i) for i in range(args.count)]
+        for name, codec in CODECS.items():
+            encoded = [codec.encode(value) for value in values]
+            assert all(decode(data) == value for data, value in zip(encoded, values))
+            size = statistics.mean(len(data) for data in encoded)
+            encode_us = timed(codec.encode, values, args.repeat)
+            decode_us = timed(decode, encoded, args.repeat)
+            print(f"{payload:<14}{name:<9}{size:>8.0f}{encode_us:>11.2f}{decode_us:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""
+Startup-time benchmark for the NVR Event Router backend.
+
+Every run happens in a fresh interpreter (cold start) and measures:
+  - import:   time to import main (module import side effects)
+  - startup:  time to run the app lifespan until it is ready to serve
+  - threads:  threads alive right after import
+  - services: services constructed by the end of startup
+
+Usage:
+    python benchmark_tools/startup_benchmark.py [--runs 10]
+
+Run with NVR_ROLE=api (the default here) so no MQTT/Redis connection is
+needed; upstream URLs only need to be syntactically valid.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+PROBE = """
+import json, threading, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+threads = threading.active_count()
+from fastapi.testclient import TestClient
+with TestClient(main.app):
+    t2 = time.perf_counter()
+    services = len(getattr(main.app.state.container, "_instances", {}))
+print(json.dumps({"import": t1 - t0, "startup": t2 - t1, "threads": threads, "services": services}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=SRC_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("NVR_ROLE", "api")
+    env.setdefault("FRIGATE_BASE_URL", "http://frigate-vms:5000")
+    env.setdefault("VSS_SUMMARY_URL", "http://vss-summary:8000")
+    env.setdefault("VSS_SEARCH_URL", "http://vss-search:8000")
+
+    results = [run_once(env) for _ in range(args.runs)]
+    for key in ("import", "startup"):
+        values = [r[key] * 1000 for r in results]
+        print(
+            f"{key:>8}: median {statistics.median(values):7.1f} ms  "
+            f"min {min(values):7.1f} ms  max {max(values):7.1f} ms"
+        )
+    print(f" threads: {results[-1]['threads']} after import")
+    print(f"services: {results[-1]['services']} constructed at startup")
+
+
+if __name__ == "__main__":
+    main()
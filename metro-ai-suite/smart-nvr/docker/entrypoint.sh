@@ -1,19 +1,27 @@
 #!/bin/bash
+# API_WORKERS: number of uvicorn worker processes serving the HTTP API.
+# MQTT ingestion runs in whichever process holds the Redis leader lock, so
+# multiple workers never duplicate event processing (see NVR_ROLE).
+API_WORKERS=${API_WORKERS:-1}
 if [ "$MODE" = "ui" ]; then
     echo "Starting in UI mode..."
     cd /app/ui
     exec python main.py
 elif [ "$MODE" = "backend" ]; then
-    echo "Starting in backend mode..."
+    echo "Starting in backend mode with ${API_WORKERS} worker(s)..."
     cd /app/backend
-    exec uvicorn main:app --host 0.0.0.0 --port 8000
+    exec uvicorn main:app --host 0.0.0.0 --port 8000 --workers "$API_WORKERS"
+elif [ "$MODE" = "ingest" ]; then
+    echo "Starting in ingest mode (MQTT ingestion/dispatch only)..."
+    cd /app/backend
+    exec python ingest_worker.py
 elif [ "$MODE" = "combined" ]; then
     echo "Starting in combined mode (both UI and backend)..."
     cd /app/backend
-    uvicorn main:app --host 0.0.0.0 --port 8000 &
+    uvicorn main:app --host 0.0.0.0 --port 8000 --workers "$API_WORKERS" &
     cd /app/ui
     exec python main.py
 else
-    echo "Unknown mode: $MODE. Valid options are: ui, backend, combined"
+    echo "Unknown mode: $MODE. Valid options are: ui, backend, ingest, combined"
     exit 1
-fi
\ No newline at end of file
+fi
@@ -1,37 +1,153 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
+import threading
+from contextlib import contextmanager
 import requests
+from requests.adapters import HTTPAdapter
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Dict
 from fastapi.responses import FileResponse
-from config import FRIGATE_BASE_URL
+from config import (
+    FRIGATE_BASE_URL,
+    UPSTREAM_TIMEOUT,
+    FRIGATE_POOL_SIZE,
+    FRIGATE_MAX_CONCURRENCY,
+)
+from service.circuit_breaker import CircuitOpenError, get_breaker, upstream_for_url
+
+
+class _ClipStream:
+    """
+    Chunks of a streamed clip. Unlike a generator, close() releases the
+    request slot even if iteration never started.
+    """
+
+    def __init__(self, response: requests.Response, release):
+        self._response = response
+        self._chunks = response.iter_content(chunk_size=8192)
+        self._release = release
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._response.close()
+        self._release()
 
 
 class FrigateService:
-    def __init__(self, base_url: str = FRIGATE_BASE_URL):
+    """
+    Client for one Frigate instance.
+
+    Requests go through a pooled session of its own and at most
+    max_concurrency of them run at a time, so a slow instance only queues
+    its own requests.
+    """
+
+    def __init__(
+        self,
+        base_url: str = FRIGATE_BASE_URL,
+        upstream: str = None,
+        pool_size: int = FRIGATE_POOL_SIZE,
+        max_concurrency: int = FRIGATE_MAX_CONCURRENCY,
+    ):
         self.base_url = base_url
+        self.upstream = upstream or upstream_for_url(base_url)
+        self.breaker = get_breaker(self.upstream)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
 
-    def get_camera_names(self) -> Dict[str, list]:
-        """Get mapping of camera names to detected objects from Frigate"""
+    def _acquire_slot(self):
+        with self._stats_lock:
+            self._waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=UPSTREAM_TIMEOUT)
+        finally:
+            with self._stats_lock:
+                self._waiting -= 1
+        if not acquired:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many concurrent requests to Frigate at {self.base_url}",
+            )
+        with self._stats_lock:
+            self._in_flight += 1
+
+    def _release_slot(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    @contextmanager
+    def _slot(self):
+        self._acquire_slot()
         try:
-            response = requests.get(f"{self.base_url}/api/config")
+            yield
+        finally:
+            self._release_slot()
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", UPSTREAM_TIMEOUT)
+        with self._slot(), self.breaker.guard():
+            response = self.session.get(url, **kwargs)
             response.raise_for_status()
-            config = response.json()
-            cameras = config.get("cameras", {})
-            
-            camera_object_map = {
-                cam_name: cam_cfg.get("objects", {}).get("track", [])
-                for cam_name, cam_cfg in cameras.items()
+        return response
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "base_url": self.base_url,
+                "in_flight": self._in_flight,
+                "waiting": self._waiting,
+                "max_concurrency": self.max_concurrency,
             }
-            print(camera_object_map)
-            return camera_object_map
 
+    def get_config(self) -> dict:
+        """Frigate's full /api/config"""
+        try:
+            return self._get(f"{self.base_url}/api/config").json()
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         except requests.exceptions.RequestException as e:
             raise HTTPException(
                 status_code=502, detail=f"Failed to connect to Frigate: {str(e)}"
             )
 
+    @staticmethod
+    def camera_objects(config: dict) -> Dict[str, list]:
+        """Mapping of camera names to tracked objects in a Frigate config"""
+        return {
+            cam_name: cam_cfg.get("objects", {}).get("track", [])
+            for cam_name, cam_cfg in config.get("cameras", {}).items()
+        }
+
+    def get_camera_names(self) -> Dict[str, list]:
+        """Get mapping of camera names to detected objects from Frigate"""
+        return self.camera_objects(self.get_config())
+
     @staticmethod
     def _validate_time_range(start_time: int, end_time: int):
         """Validate time range parameters"""
@@ -49,9 +165,11 @@ class FrigateService:
         url = f"{self.base_url}/api/events?camera={camera_name}"
 
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            # Off the event loop: waits for a free request slot on the instance
+            response = await asyncio.to_thread(self._get, url, timeout=10)
             return response.json()
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         except requests.exceptions.HTTPError as e:
             raise HTTPException(
                 status_code=e.response.status_code,
@@ -62,6 +180,28 @@ class FrigateService:
                 status_code=502, detail=f"Failed to contact Frigate: {str(e)}"
             )
 
+    def get_recording_segments(
+        self, camera_name: str, start_time: float, end_time: float
+    ) -> list:
+        """
+        Get recording segments overlapping a time range, including Frigate's
+        per-segment motion and object counts.
+
+        Returns:
+            list: Segment dicts with start_time, end_time, motion and objects.
+        """
+        url = f"{self.base_url}/api/{camera_name}/recordings"
+        params = {"after": int(start_time), "before": int(end_time) + 1}
+
+        try:
+            return self._get(url, params=params, timeout=10).json()
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except requests.exceptions.RequestException as e:
+            raise HTTPException(
+                status_code=502, detail=f"Failed to fetch recordings: {str(e)}"
+            )
+
     MEDIA_BASE_PATH = "/media/exports"
 
     def get_clip_from_timestamps(
@@ -88,18 +228,35 @@ class FrigateService:
         if download:
             url += "?download=1"
 
+        # The slot is held until the clip stream is closed: once it is read to
+        # the end, or by the response's background task. Callers that consume
+        # the response themselves must run that task when done.
+        self._acquire_slot()
         try:
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            return StreamingResponse(
-                response.iter_content(chunk_size=8192),
-                media_type="video/mp4",
-                headers={
-                    "Content-Disposition": response.headers.get(
-                        "Content-Disposition", "inline"
-                    )
-                },
-            )
+            response = self._open_clip(url)
+        except BaseException:
+            self._release_slot()
+            raise
+        stream = _ClipStream(response, self._release_slot)
+        return StreamingResponse(
+            stream,
+            background=BackgroundTask(stream.close),
+            media_type="video/mp4",
+            headers={
+                "Content-Disposition": response.headers.get(
+                    "Content-Disposition", "inline"
+                )
+            },
+        )
+
+    def _open_clip(self, url: str) -> requests.Response:
+        try:
+            with self.breaker.guard():
+                response = self.session.get(url, stream=True, timeout=UPSTREAM_TIMEOUT)
+                response.raise_for_status()
+            return response
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
                 raise HTTPException(
@@ -111,4 +268,32 @@ class FrigateService:
         except requests.exceptions.RequestException as e:
             raise HTTPException(
                 status_code=502, detail=f"Failed to connect to Frigate: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    def _get_image(self, url: str, params: dict = None) -> bytes:
+        try:
+            return self._get(url, params=params).content
+        except CircuitOpenError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except requests.exceptions.HTTPError as e:
+            raise HTTPException(
+                status_code=e.response.status_code,
+                detail=f"Frigate image error: {e.response.text}",
+            )
+        except requests.exceptions.RequestException as e:
+            raise HTTPException(
+                status_code=502, detail=f"Failed to fetch image from Frigate: {str(e)}"
+            )
+
+    def get_event_snapshot(self, event_id: str, height: int = None) -> bytes:
+        """Best snapshot Frigate saved for an event (JPEG)."""
+        params = {"h": height} if height else None
+        return self._get_image(
+            f"{self.base_url}/api/events/{event_id}/snapshot.jpg", params
+        )
+
+    def get_recording_frame(self, camera_name: str, frame_time: float) -> bytes:
+        """Frame from the camera's recordings at a timestamp (PNG)."""
+        return self._get_image(
+            f"{self.base_url}/api/{camera_name}/recordings/{frame_time}/snapshot.png"
+        )
@@ -10,6 +10,9 @@ from typing import Optional
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse, FileResponse
 from model.model import SummaryPayload
+from config import UPSTREAM_TIMEOUT
+from service.circuit_breaker import CircuitOpenError, get_breaker, upstream_for_url
+from service.bandwidth_limiter import ThrottledMultipartFile, get_limiter
 import traceback
 
 # Setup logger
@@ -24,7 +27,13 @@ class SummarizationService:
     def __init__(self):
         logger.debug(f"SummarizationService initialized")
 
-    def video_upload(self, video_path: Union[str, Path], base_url: str) -> dict:
+    def video_upload(
+        self, video_path: Union[str, Path], base_url: str, camera: Optional[str] = None
+    ) -> dict:
+        """
+        Streams a video to VSS. The upload shares the destination's bandwidth
+        limit with all other uploads, fairly across cameras.
+        """
         logger.debug(f"Starting video upload: {video_path}")
 
         try:
@@ -42,21 +51,31 @@ class SummarizationService:
                     status_code=400, detail=f"Path is not a file: {video_path}"
                 )
 
-            with open(video_path, "rb") as video_file:
-                files = {"video": (video_path.name, video_file, "video/mp4")}
+            upstream = upstream_for_url(base_url)
+            with ThrottledMultipartFile(
+                video_path, "video", "video/mp4", get_limiter(upstream), camera or "default"
+            ) as body:
                 upload_url = f"{base_url}/manager/videos/"
                 logger.debug(f"Sending POST request to {upload_url}")
 
-                response = requests.post(
-                    upload_url, files=files, timeout=30
-                )
+                with get_breaker(upstream).guard():
+                    response = requests.post(
+                        upload_url,
+                        data=body,
+                        headers={"Content-Type": body.content_type},
+                        timeout=UPSTREAM_TIMEOUT,
+                    )
+                    response.raise_for_status()
 
-            response.raise_for_status()
             logger.info(f"Video uploaded successfully: {video_path}")
             logger.debug(f"Upload response: {response.json()}")
 
             return response.json()
 
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping video upload: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
+
         except FileNotFoundError:
             logger.error(f"File not found: {video_path}")
             raise HTTPException(status_code=400, detail="Video file not found.")
@@ -75,11 +94,19 @@ class SummarizationService:
     def create_summary(self, payload: SummaryPayload, base_url: str) -> dict:
         logger.debug(f"Creating summary for payload: {payload}")
         try:
-            response = requests.post(f"{base_url}/manager/summary", json=payload.dict())
-            response.raise_for_status()
+            with get_breaker(upstream_for_url(base_url)).guard():
+                response = requests.post(
+                    f"{base_url}/manager/summary",
+                    json=payload.dict(),
+                    timeout=UPSTREAM_TIMEOUT,
+                )
+                response.raise_for_status()
             logger.info("Summary creation request successful.")
             logger.debug(f"Summary creation response: {response.json()}")
             return response.json()
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping summary creation: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to create summary: {e}")
             raise HTTPException(
@@ -89,8 +116,12 @@ class SummarizationService:
     def get_summary_result(self, pipeline_id: str, base_url: str) -> dict:
         logger.debug(f"Fetching summary result for pipeline_id: {pipeline_id}")
         try:
-            response = requests.get(f"{base_url}/manager/summary/{pipeline_id}")
-            response.raise_for_status()
+            with get_breaker(upstream_for_url(base_url)).guard():
+                response = requests.get(
+                    f"{base_url}/manager/summary/{pipeline_id}",
+                    timeout=UPSTREAM_TIMEOUT,
+                )
+                response.raise_for_status()
 
             json_data = response.json()
             logger.info(
@@ -99,10 +130,15 @@ class SummarizationService:
             # logger.debug(f"Summary result JSON: {json.dumps(json_data, indent=2)}")
 
             return json_data  # ✅ This returns the full parsed response
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping summary result fetch: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
         except requests.exceptions.RequestException as e:
             logger.error(
                 f"Failed to get summary result for pipeline_id {pipeline_id}: {e}"
             )
+            # Keep 4xx (e.g. unknown pipeline ID) distinguishable from outages
+            status = e.response.status_code if e.response is not None else 502
             raise HTTPException(
-                status_code=502, detail=f"Failed to get summary result: {str(e)}"
+                status_code=status, detail=f"Failed to get summary result: {str(e)}"
             )
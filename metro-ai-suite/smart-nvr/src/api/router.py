@@ -1,30 +1,62 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import BaseModel
-from api.endpoints.frigate_api import FrigateService
-from api.endpoints.summarization_api import SummarizationService
-from service.vms_service import VmsService
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from service.frigate_registry import FrigateRegistry
+from service.vms_service import VmsService, SUMMARY_PENDING_MESSAGE, is_final_summary
+from service.container import get_frigate_service, get_vms_service
+from model.rule import Rule
+from model.model import SummaryStatusBatch
+from config import SUMMARY_BATCH_MAX_IDS, EVENT_INDEX_MAX_RESULTS
 from service import redis_store
+from service import metrics
+from service.action_limiter import get_suppressed_counts
 
 router = APIRouter()
-frigate_service = FrigateService()
-summarization_service = SummarizationService()
-vms_service = VmsService(frigate_service, summarization_service)
 
 
 @router.get("/cameras", summary="Get list of camera names")
-async def get_cameras():
-    return frigate_service.get_camera_names()
+async def get_cameras(frigate_service: FrigateRegistry = Depends(get_frigate_service)):
+    # Discovery queries every Frigate instance; keep it off the event loop
+    return await asyncio.to_thread(frigate_service.get_camera_names)
 
 
 @router.get("/events", summary="Get list of events for a specific camera")
-async def get_camera_events(camera: str):
+async def get_camera_events(
+    camera: str, frigate_service: FrigateRegistry = Depends(get_frigate_service)
+):
     return await frigate_service.get_camera_events(camera)
 
+@router.get(
+    "/events/history", summary="Get rule-matched events for a camera in a time window"
+)
+async def get_event_history(
+    request: Request,
+    camera: str,
+    start_time: float,
+    end_time: float,
+    label: Optional[str] = None,
+    limit: int = Query(EVENT_INDEX_MAX_RESULTS, ge=1, le=EVENT_INDEX_MAX_RESULTS),
+):
+    """
+    Events that matched at least one rule and started within
+    [start_time, end_time], oldest first, served from the local Redis index.
+    """
+    if end_time < start_time:
+        raise HTTPException(status_code=400, detail="End time must be after start time")
+    return await redis_store.get_indexed_events(
+        request, camera, start_time, end_time, label, limit
+    )
+
+
 @router.get("/summary/{camera_name}", summary="Stream video using clip.mp4 API")
 async def summarize_video(
-    camera_name: str, start_time: float, end_time: float, download: bool = False
+    camera_name: str,
+    start_time: float,
+    end_time: float,
+    download: bool = False,
+    vms_service: VmsService = Depends(get_vms_service),
 ):
     return await vms_service.summarize(camera_name, start_time, end_time)
 
@@ -33,13 +65,24 @@ async def summarize_video(
     "/search-embeddings/{camera_name}", summary="Stream video using clip.mp4 API"
 )
 async def search_video_embeddings(
-    camera_name: str, start_time: float, end_time: float, download: bool = False
+    camera_name: str,
+    start_time: float,
+    end_time: float,
+    download: bool = False,
+    vms_service: VmsService = Depends(get_vms_service),
 ):
     return await vms_service.search_embeddings(camera_name, start_time, end_time)
 
 
+@router.get("/metrics", summary="Scheduler and upstream circuit breaker metrics")
+async def get_metrics():
+    return metrics.collect()
+
+
 @router.get("/summary-status/{summary_id}", summary="Get the summary using id")
-async def get_summary(summary_id: str):
+async def get_summary(
+    summary_id: str, vms_service: VmsService = Depends(get_vms_service)
+):
     return vms_service.summary(summary_id)
 
 
@@ -47,12 +90,58 @@ from service.redis_store import (
     get_rules,
     get_summary_ids,
     get_summary_result,
+    get_summary_results,
+    save_summary_results,
     get_search_results_by_rule,
 )
 
 
+@router.post("/summary-status/batch", summary="Get the summaries for a list of ids")
+async def get_summaries_batch(
+    batch: SummaryStatusBatch,
+    request: Request,
+    vms_service: VmsService = Depends(get_vms_service),
+):
+    """
+    Returns {summary_id: summary} for every requested ID. Final summaries are
+    served from the Redis result cache; only unknown or still pending IDs are
+    looked up in VSS, concurrently. Lookups that fail map to
+    {"error": ..., "status": HTTP status code}.
+    """
+    summary_ids = list(dict.fromkeys(batch.summary_ids))
+    if len(summary_ids) > SUMMARY_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SUMMARY_BATCH_MAX_IDS} summary IDs per request",
+        )
+
+    cached = await get_summary_results(request, summary_ids)
+    output = {
+        sid: {"summary": summary}
+        for sid, summary in cached.items()
+        if summary != SUMMARY_PENDING_MESSAGE
+    }
+
+    missing = [sid for sid in summary_ids if sid not in output]
+    if missing:
+        fetched = await vms_service.summaries(missing)
+        output.update(fetched)
+        await save_summary_results(
+            {
+                sid: result["summary"]
+                for sid, result in fetched.items()
+                if is_final_summary(result)
+            },
+            request,
+        )
+
+    return {sid: output[sid] for sid in summary_ids}
+
+
 @router.get("/rules/responses/")
-async def get_all_rule_summaries(request: Request):
+async def get_all_rule_summaries(
+    request: Request, vms_service: VmsService = Depends(get_vms_service)
+):
     rules = await get_rules(request)
     output = {}
 
@@ -97,13 +186,6 @@ async def get_search_responses(request: Request):
         return {"error": str(e)}
 
 
-class Rule(BaseModel):
-    id: str
-    label: str
-    action: str
-    camera: str | None = None
-
-
 @router.post("/rules/")
 async def add_rule(rule: Rule, request: Request):
     success = await redis_store.add_rule(request, rule.id, rule.dict())
@@ -125,6 +207,14 @@ async def get_rule(rule_id: str, request: Request):
     return rule
 
 
+@router.get("/rules/{rule_id}/suppressed", summary="Matches suppressed by cooldown or rate limits")
+async def get_rule_suppressed(rule_id: str, request: Request):
+    """Number of times the rule matched but its action was suppressed, by reason."""
+    if not await redis_store.get_rule(request, rule_id):
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return await get_suppressed_counts(request.app.state.redis_client, rule_id)
+
+
 @router.delete("/rules/{rule_id}")
 async def delete_rule(rule_id: str, request: Request):
     deleted = await redis_store.delete_rule(request, rule_id)
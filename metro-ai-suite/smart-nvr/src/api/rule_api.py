@@ -1,19 +1,12 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from model.rule import Rule
 from service import redis_store
 
 app = FastAPI()
 
 
-class Rule(BaseModel):
-    id: str
-    label: str
-    action: str
-    camera: str | None = None
-
-
 @app.post("/rules/")
 async def add_rule(rule: Rule):
     success = await redis_store.add_rule(rule.id, rule.dict())
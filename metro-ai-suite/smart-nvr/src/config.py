@@ -10,6 +10,35 @@ import os
 
 # Combine safely
 FRIGATE_BASE_URL = os.getenv("FRIGATE_BASE_URL")
+# Several Frigate instances as "name=url" pairs, e.g.
+# "nvr-a=http://frigate-a:5000,nvr-b=http://frigate-b:5000". Cameras are mapped
+# to instances from each instance's /api/config. Defaults to one instance
+# named "frigate" at FRIGATE_BASE_URL.
+FRIGATE_INSTANCES = {
+    name.strip(): url.strip()
+    for name, _, url in (
+        item.partition("=")
+        for item in os.getenv("FRIGATE_INSTANCES", "").split(",")
+        if item.strip()
+    )
+} or {"frigate": FRIGATE_BASE_URL}
+# MQTT broker per instance as "name=host:port"; unlisted instances use the
+# default broker. Each instance's events topic is "<topic_prefix>/events".
+FRIGATE_MQTT_BROKERS = {
+    name.strip(): broker.strip()
+    for name, _, broker in (
+        item.partition("=")
+        for item in os.getenv("FRIGATE_MQTT_BROKERS", "").split(",")
+        if item.strip()
+    )
+}
+# Pooled HTTP connections and concurrent requests per Frigate instance
+FRIGATE_POOL_SIZE = int(os.getenv("FRIGATE_POOL_SIZE", 10))
+FRIGATE_MAX_CONCURRENCY = int(os.getenv("FRIGATE_MAX_CONCURRENCY", 8))
+# Seconds between refreshes of the camera -> instance map
+FRIGATE_DISCOVERY_INTERVAL = float(os.getenv("FRIGATE_DISCOVERY_INTERVAL", 300))
+# Minimum seconds between refreshes triggered by a lookup of an unknown camera
+FRIGATE_REDISCOVERY_INTERVAL = float(os.getenv("FRIGATE_REDISCOVERY_INTERVAL", 5))
 # VSS Service url
 VSS_SUMMARY_URL = os.getenv("VSS_SUMMARY_URL")
 VSS_SEARCH_URL = os.getenv("VSS_SEARCH_URL")
@@ -19,5 +48,131 @@ MQTT_PORT = int(os.getenv("MQTT_PORT", 1884))
 MQTT_TOPIC = os.getenv("MQTT_TOPIC", "frigate/events")
 REDIS_HOST = os.getenv("HOST_IP", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Redis connection pool, shared by every client of an event loop
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+# Seconds to wait for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 5))
+REDIS_SOCKET_KEEPALIVE = os.getenv("REDIS_SOCKET_KEEPALIVE", "true").lower() == "true"
+# PING idle connections older than this many seconds before reuse (0 = never)
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+REDIS_RETRY_ON_TIMEOUT = os.getenv("REDIS_RETRY_ON_TIMEOUT", "true").lower() == "true"
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", 3))
+# Encoding of JSON-like Redis payloads: "msgpack", "orjson" or "json" (legacy
+# plain JSON). Values written with any codec stay readable after switching.
+REDIS_CODEC = os.getenv("REDIS_CODEC", "msgpack").lower()
 MQTT_USER = os.getenv("MQTT_USER")
 MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
+
+# Clip preprocessing before upload to VSS (trim idle segments / transcode)
+CLIP_TRIM_ENABLED = os.getenv("CLIP_TRIM_ENABLED", "false").lower() == "true"
+# Activity source: "frigate" (recording motion/object counts) or "freezedetect"
+CLIP_TRIM_SOURCE = os.getenv("CLIP_TRIM_SOURCE", "frigate")
+CLIP_TRIM_PADDING = float(os.getenv("CLIP_TRIM_PADDING", 1.0))
+CLIP_TRIM_MIN_IDLE = float(os.getenv("CLIP_TRIM_MIN_IDLE", 3.0))
+CLIP_TRIM_MIN_DURATION = float(os.getenv("CLIP_TRIM_MIN_DURATION", 8.0))
+CLIP_TRANSCODE_HEIGHT = int(os.getenv("CLIP_TRANSCODE_HEIGHT", 0))
+CLIP_TRANSCODE_BITRATE = os.getenv("CLIP_TRANSCODE_BITRATE", "")
+FFMPEG_PATH = os.getenv("FFMPEG_PATH", "ffmpeg")
+
+# Action scheduling (priority tiers, weighted fair queuing across cameras)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", 2))
+SCHEDULER_STARVATION_SECONDS = float(os.getenv("SCHEDULER_STARVATION_SECONDS", 120))
+# Comma separated camera weights, e.g. "front_gate:3,backyard:1" (default weight 1)
+SCHEDULER_CAMERA_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, _, weight in (
+        item.partition(":")
+        for item in os.getenv("SCHEDULER_CAMERA_WEIGHTS", "").split(",")
+        if item.strip()
+    )
+}
+
+# Upstream (Frigate / VSS) timeouts and circuit breakers
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", 30))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 30))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", 1))
+# Load shedding while an upstream is degraded: "normal" actions are deferred,
+# "low" actions are dropped, "high" actions always go through
+SHED_DEFER_SECONDS = float(os.getenv("SHED_DEFER_SECONDS", 30))
+SHED_MAX_DEFERS = int(os.getenv("SHED_MAX_DEFERS", 10))
+FFPROBE_PATH = os.getenv("FFPROBE_PATH", "ffprobe")
+
+# Batched "add to search" ingestion: clips are grouped per camera and
+# uploaded as one video once the window elapses or the batch is full
+SEARCH_BATCH_ENABLED = os.getenv("SEARCH_BATCH_ENABLED", "false").lower() == "true"
+SEARCH_BATCH_WINDOW = float(os.getenv("SEARCH_BATCH_WINDOW", 60))
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", 8))
+# Flushes a clip that failed to ingest is queued again for (without the spool)
+SEARCH_BATCH_MAX_RETRIES = int(os.getenv("SEARCH_BATCH_MAX_RETRIES", 3))
+
+# Batch summary-status endpoint: max IDs per request and concurrent upstream lookups
+SUMMARY_BATCH_MAX_IDS = int(os.getenv("SUMMARY_BATCH_MAX_IDS", 100))
+SUMMARY_BATCH_CONCURRENCY = int(os.getenv("SUMMARY_BATCH_CONCURRENCY", 8))
+
+# Deployment role of this process:
+#   "all"    - HTTP API plus MQTT ingestion/dispatch (single process, default)
+#   "api"    - HTTP API only; run any number of workers
+#   "ingest" - MQTT ingestion/dispatch only (see ingest_worker.py)
+# Ingestion is guarded by a Redis lock so only one process consumes events.
+NVR_ROLE = os.getenv("NVR_ROLE", "all").lower()
+API_WORKERS = int(os.getenv("API_WORKERS", 1))
+UVICORN_RELOAD = os.getenv("UVICORN_RELOAD", "false").lower() == "true"
+LEADER_LOCK_KEY = os.getenv("LEADER_LOCK_KEY", "nvr:ingest-leader")
+LEADER_LOCK_TTL = float(os.getenv("LEADER_LOCK_TTL", 15))
+LEADER_RENEW_INTERVAL = float(os.getenv("LEADER_RENEW_INTERVAL", 5))
+
+# Time-indexed store of matched events (seconds of history kept, max rows per query)
+EVENT_INDEX_RETENTION = float(os.getenv("EVENT_INDEX_RETENTION", 7 * 24 * 3600))
+EVENT_INDEX_MAX_RESULTS = int(os.getenv("EVENT_INDEX_MAX_RESULTS", 1000))
+
+# Durable local spool for clips waiting to be uploaded to VSS
+CLIP_SPOOL_ENABLED = os.getenv("CLIP_SPOOL_ENABLED", "false").lower() == "true"
+CLIP_SPOOL_DIR = os.getenv("CLIP_SPOOL_DIR", "/var/lib/nvr/spool")
+CLIP_SPOOL_MAX_BYTES = int(os.getenv("CLIP_SPOOL_MAX_BYTES", 10 * 1024**3))
+CLIP_SPOOL_CONCURRENCY = int(os.getenv("CLIP_SPOOL_CONCURRENCY", 2))
+CLIP_SPOOL_MAX_ATTEMPTS = int(os.getenv("CLIP_SPOOL_MAX_ATTEMPTS", 20))
+CLIP_SPOOL_RETRY_BASE = float(os.getenv("CLIP_SPOOL_RETRY_BASE", 10))
+CLIP_SPOOL_RETRY_MAX = float(os.getenv("CLIP_SPOOL_RETRY_MAX", 600))
+
+# Upload bandwidth caps in bytes/s, shared by all clip uploads to a destination.
+# UPLOAD_BANDWIDTH_LIMITS maps an upstream name (vss_search, vss_summary) or a
+# base URL to its cap, e.g. "vss_search:2000000,vss_summary:1000000".
+# Destinations not listed use UPLOAD_BANDWIDTH_DEFAULT (0 = unlimited).
+UPLOAD_BANDWIDTH_LIMITS = {
+    name.strip(): float(rate)
+    for name, _, rate in (
+        item.rpartition(":")
+        for item in os.getenv("UPLOAD_BANDWIDTH_LIMITS", "").split(",")
+        if item.strip()
+    )
+}
+UPLOAD_BANDWIDTH_DEFAULT = float(os.getenv("UPLOAD_BANDWIDTH_DEFAULT", 0))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+
+# "keyframes" search mode (per rule): instead of the whole clip, the event's
+# best snapshot plus one recording frame every KEYFRAME_INTERVAL seconds are
+# encoded as a 1 fps video and indexed for search
+KEYFRAME_INTERVAL = float(os.getenv("KEYFRAME_INTERVAL", 5))
+KEYFRAME_MAX_FRAMES = int(os.getenv("KEYFRAME_MAX_FRAMES", 8))
+KEYFRAME_HEIGHT = int(os.getenv("KEYFRAME_HEIGHT", 480))
+
+# Seconds a downloaded clip is kept for other actions on the same event
+SHARED_CLIP_TTL = float(os.getenv("SHARED_CLIP_TTL", 60))
+
+# Per-camera action rate limit in actions/hour, enforced before actions are
+# queued, e.g. "front_gate:30,backyard:10". Cameras not listed use
+# CAMERA_ACTION_LIMIT_DEFAULT (0 = unlimited); CAMERA_ACTION_BURST actions
+# may run back to back. Per-rule limits and cooldowns are set on each rule.
+CAMERA_ACTION_LIMITS = {
+    name.strip(): float(rate)
+    for name, _, rate in (
+        item.rpartition(":")
+        for item in os.getenv("CAMERA_ACTION_LIMITS", "").split(",")
+        if item.strip()
+    )
+}
+CAMERA_ACTION_LIMIT_DEFAULT = float(os.getenv("CAMERA_ACTION_LIMIT_DEFAULT", 0))
+CAMERA_ACTION_BURST = int(os.getenv("CAMERA_ACTION_BURST", 5))
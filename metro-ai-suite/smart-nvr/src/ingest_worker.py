@@ -0,0 +1,37 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""
+Dedicated MQTT ingestion/dispatch worker.
+
+Run one (or more, for failover) next to API processes started with
+NVR_ROLE=api. Only the process holding the Redis leader lock consumes events.
+"""
+import asyncio
+import logging
+import signal
+from service.ingest import run_ingestion
+from service.redis_store import get_redis_client, close_redis_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ingest-worker")
+
+
+async def main():
+    redis_client = get_redis_client()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("🚀 Ingest worker starting... joining leader election")
+    task = asyncio.create_task(run_ingestion(redis_client))
+    await stop.wait()
+
+    logger.info("🛑 Ingest worker shutting down")
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await close_redis_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
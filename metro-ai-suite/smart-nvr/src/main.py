@@ -1,43 +1,55 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from api.router import router  # your custom route logic (rules, results, etc.)
-from service.mqtt_listener import start_mqtt
+from service.ingest import run_ingestion
+from service.container import init_container
+from service.redis_store import get_redis_client, close_redis_client
+from contextlib import asynccontextmanager
 import asyncio
 import logging
-from config import REDIS_HOST, REDIS_PORT
-import redis.asyncio as redis
+from config import NVR_ROLE, API_WORKERS, UVICORN_RELOAD
 
 # Configure global logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("main")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Services are shared singletons built lazily on first use
+    app.state.container = init_container()
+    app.state.redis_client = get_redis_client()
+    ingest_task = None
+    if NVR_ROLE == "api":
+        logger.info("🚀 FastAPI starting up in API-only mode")
+    else:
+        # Every worker campaigns, only the elected leader consumes MQTT events
+        logger.info("🚀 FastAPI starting up... joining MQTT ingest leader election")
+        ingest_task = asyncio.create_task(run_ingestion(app.state.redis_client))
+
+    yield
+
+    if ingest_task:
+        ingest_task.cancel()
+        await asyncio.gather(ingest_task, return_exceptions=True)
+    await close_redis_client()
+
+
 # Create FastAPI app instance
 app = FastAPI(
     title="NVR Event Router",
     version="1.0.0",
     description="FastAPI app to interface with Frigate and handle event routing",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Register API routes
 app.include_router(router)
 
 
-# Run MQTT listener in background when FastAPI starts
-@app.on_event("startup")
-async def startup_event():
-    app.state.redis_client = redis.from_url(
-        f"redis://{REDIS_HOST}:{REDIS_PORT}", decode_responses=True
-    )
-    logger.info("🚀 FastAPI starting up... launching MQTT listener")
-    asyncio.create_task(start_mqtt())
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    await app.state.redis_client.close()
-
-
 @app.get("/")
 async def root():
     return {"message": "NVR Event Router is running!"}
@@ -48,4 +60,12 @@ if __name__ == "__main__":
     import uvicorn
 
     logger.info("🔥 Running FastAPI app via uvicorn...")
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, log_level="debug")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=UVICORN_RELOAD,
+        # uvicorn does not support multiple workers together with reload
+        workers=1 if UVICORN_RELOAD else API_WORKERS,
+        log_level="debug",
+    )
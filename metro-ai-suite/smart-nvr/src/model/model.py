@@ -1,5 +1,6 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
+from typing import List
 from pydantic import BaseModel
 
 
@@ -17,3 +18,7 @@ class SummaryPayload(BaseModel):
     title: str
     sampling: Sampling
     evam: Evam
+
+
+class SummaryStatusBatch(BaseModel):
+    summary_ids: List[str]
@@ -1,6 +1,7 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, Field
 
 
 class Rule(BaseModel):
@@ -8,3 +9,13 @@ class Rule(BaseModel):
     label: str
     action: str
     camera: str | None = None
+    priority: Literal["high", "normal", "low"] = "normal"
+    # "add to search" only: index the whole clip or just its keyframes
+    search_mode: Literal["clip", "keyframes"] = "clip"
+    # Seconds after an action during which further matches of this rule on
+    # the same camera are suppressed (0 = no cooldown)
+    cooldown: float = Field(0, ge=0)
+    # Token bucket over all cameras: actions per hour (0 = unlimited) and how
+    # many may run back to back
+    max_actions_per_hour: float = Field(0, ge=0)
+    burst: int = Field(1, ge=1)
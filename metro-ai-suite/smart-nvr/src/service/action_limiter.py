@@ -0,0 +1,168 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+from config import (
+    CAMERA_ACTION_LIMITS,
+    CAMERA_ACTION_LIMIT_DEFAULT,
+    CAMERA_ACTION_BURST,
+)
+from service import metrics
+
+logger = logging.getLogger(__name__)
+
+# Reasons a matched rule is suppressed
+COOLDOWN = "cooldown"
+RULE_RATE = "rule_rate"
+CAMERA_RATE = "camera_rate"
+
+# Checks the rule's cooldown on the camera, then the rule and camera token
+# buckets. Only when all pass are tokens taken and the cooldown started, so a
+# suppressed match costs nothing. Suppressions are counted per rule.
+#   KEYS: cooldown, rule bucket, camera bucket, suppressed counters
+#   ARGV: cooldown s, rule rate/s, rule burst, camera rate/s, camera burst
+# Returns "ok" or the suppression reason.
+_ADMIT_SCRIPT = """
+local t = redis.call('time')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local cooldown = tonumber(ARGV[1])
+
+local function refill(key, rate, burst)
+    if rate <= 0 then
+        return nil
+    end
+    local state = redis.call('hmget', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    return math.min(burst, tokens + math.max(0, now - ts) * rate)
+end
+
+local function take(key, tokens, rate, burst)
+    redis.call('hset', key, 'tokens', tostring(tokens - 1), 'ts', tostring(now))
+    -- Once full again the bucket is the same as no bucket
+    redis.call('pexpire', key, math.ceil(burst / rate * 1000))
+end
+
+if cooldown > 0 and redis.call('exists', KEYS[1]) == 1 then
+    redis.call('hincrby', KEYS[4], 'cooldown', 1)
+    return 'cooldown'
+end
+
+local rule_rate, rule_burst = tonumber(ARGV[2]), tonumber(ARGV[3])
+local rule_tokens = refill(KEYS[2], rule_rate, rule_burst)
+if rule_tokens and rule_tokens < 1 then
+    redis.call('hincrby', KEYS[4], 'rule_rate', 1)
+    return 'rule_rate'
+end
+
+local camera_rate, camera_burst = tonumber(ARGV[4]), tonumber(ARGV[5])
+local camera_tokens = refill(KEYS[3], camera_rate, camera_burst)
+if camera_tokens and camera_tokens < 1 then
+    redis.call('hincrby', KEYS[4], 'camera_rate', 1)
+    return 'camera_rate'
+end
+
+if rule_tokens then
+    take(KEYS[2], rule_tokens, rule_rate, rule_burst)
+end
+if camera_tokens then
+    take(KEYS[3], camera_tokens, camera_rate, camera_burst)
+end
+if cooldown > 0 then
+    redis.call('set', KEYS[1], '1', 'px', math.ceil(cooldown * 1000))
+end
+return 'ok'
+"""
+
+
+def cooldown_key(rule_id: str, camera: str) -> str:
+    return f"limit:cooldown:{rule_id}:{camera}"
+
+
+def rule_bucket_key(rule_id: str) -> str:
+    return f"limit:bucket:rule:{rule_id}"
+
+
+def camera_bucket_key(camera: str) -> str:
+    return f"limit:bucket:camera:{camera}"
+
+
+def suppressed_key(rule_id: str) -> str:
+    return f"limit:suppressed:{rule_id}"
+
+
+def camera_limit(camera: str) -> float:
+    """Actions per hour allowed for a camera (0 = unlimited)."""
+    return CAMERA_ACTION_LIMITS.get(camera, CAMERA_ACTION_LIMIT_DEFAULT)
+
+
+def is_limited(rule: dict, camera: str) -> bool:
+    return bool(
+        rule.get("cooldown") or rule.get("max_actions_per_hour") or camera_limit(camera)
+    )
+
+
+# Process-local counters for /metrics; the per-rule totals live in Redis
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def _count(outcome: str):
+    with _counts_lock:
+        _counts[outcome] += 1
+
+
+async def admit(redis_client, rule: dict, event: dict) -> Optional[str]:
+    """
+    Decides atomically in Redis whether a matched rule may run its action for
+    the event. Returns None if it may, else why it is suppressed. Rules and
+    cameras without limits skip Redis. Fails open if Redis is unavailable.
+    """
+    camera = event.get("camera") or ""
+    if not is_limited(rule, camera):
+        return None
+
+    rule_id = rule["id"]
+    try:
+        result = await redis_client.eval(
+            _ADMIT_SCRIPT,
+            4,
+            cooldown_key(rule_id, camera),
+            rule_bucket_key(rule_id),
+            camera_bucket_key(camera),
+            suppressed_key(rule_id),
+            rule.get("cooldown") or 0,
+            (rule.get("max_actions_per_hour") or 0) / 3600,
+            rule.get("burst") or 1,
+            camera_limit(camera) / 3600,
+            CAMERA_ACTION_BURST,
+        )
+    except Exception as e:
+        logger.error(f"❌ Action limit check failed for rule {rule_id}, allowing: {e}")
+        _count("errors")
+        return None
+
+    if result == "ok":
+        _count("admitted")
+        return None
+    _count(result)
+    logger.info(f"🚫 Rule {rule_id} suppressed on camera {camera}: {result}")
+    return result
+
+
+async def get_suppressed_counts(redis_client, rule_id: str) -> dict:
+    """Suppressed matches of a rule by reason."""
+    counts = await redis_client.hgetall(suppressed_key(rule_id))
+    return {
+        reason: int(counts.get(reason, 0)) for reason in (COOLDOWN, RULE_RATE, CAMERA_RATE)
+    }
+
+
+def stats() -> dict:
+    with _counts_lock:
+        return dict(_counts)
+
+
+metrics.register("action_limits", stats)
@@ -0,0 +1,272 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from config import (
+    SCHEDULER_WORKERS,
+    SCHEDULER_STARVATION_SECONDS,
+    SCHEDULER_CAMERA_WEIGHTS,
+    SHED_DEFER_SECONDS,
+    SHED_MAX_DEFERS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Strict priority order, highest first
+PRIORITY_TIERS = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+# Admission decisions returned by the load-shedding policy
+RUN = "run"
+DEFER = "defer"
+DROP = "drop"
+
+
+class ScheduledAction:
+    """A dispatched action waiting in the scheduler."""
+
+    __slots__ = (
+        "action",
+        "event",
+        "priority",
+        "camera",
+        "future",
+        "enqueued_at",
+        "done",
+        "defers",
+        "seq",
+    )
+
+    def __init__(self, action: str, event: dict, priority: str, future: asyncio.Future):
+        self.action = action
+        self.event = event
+        self.priority = priority
+        self.camera = event.get("camera") or ""
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.done = False
+        self.defers = 0
+        self.seq = None
+
+
+class ActionScheduler:
+    """
+    Priority-aware scheduler in front of dispatch_action.
+
+    - Strict priority across tiers: "high" actions always run before "normal"
+      and "low" ones.
+    - Weighted fair queuing across cameras within a tier, so one busy camera
+      cannot monopolize the workers.
+    - Starvation protection: an action waiting longer than starvation_seconds
+      is served next regardless of its tier.
+    - Load shedding: an optional admission policy (action, priority, camera)
+      is consulted right before dispatch and may defer the action (re-queued after defer_seconds) or
+      drop it.
+    """
+
+    def __init__(
+        self,
+        handler,
+        workers: int = SCHEDULER_WORKERS,
+        camera_weights: dict = None,
+        starvation_seconds: float = SCHEDULER_STARVATION_SECONDS,
+        admission=None,
+        defer_seconds: float = SHED_DEFER_SECONDS,
+        max_defers: int = SHED_MAX_DEFERS,
+    ):
+        self._handler = handler
+        self._admission = admission
+        self._defer_seconds = defer_seconds
+        self._max_defers = max_defers
+        self._worker_count = max(1, workers)
+        self._camera_weights = (
+            SCHEDULER_CAMERA_WEIGHTS if camera_weights is None else camera_weights
+        )
+        self._starvation_seconds = starvation_seconds
+
+        # Per tier: heap of (finish_tag, seq, item) plus arrival order of (seq, item)
+        # for aging. Entries whose seq no longer matches the item are stale.
+        self._queues = {tier: [] for tier in PRIORITY_TIERS}
+        self._arrivals = {tier: deque() for tier in PRIORITY_TIERS}
+        self._virtual_time = {tier: 0.0 for tier in PRIORITY_TIERS}
+        self._last_finish = {tier: {} for tier in PRIORITY_TIERS}
+        self._seq = itertools.count()
+
+        self._pending = 0
+        self._running = 0
+        self._dispatched = {tier: 0 for tier in PRIORITY_TIERS}
+        self._promoted = 0
+        self._deferred = 0
+        self._deferred_waiting = 0
+        self._dropped = 0
+        self._wakeup = None
+        self._workers = []
+
+    def submit(self, action: str, event: dict, priority: str = DEFAULT_PRIORITY) -> asyncio.Future:
+        """Queue an action for dispatch. Returns a future resolved with the dispatch response."""
+        if priority not in self._queues:
+            logger.warning(f"Unknown priority '{priority}', using '{DEFAULT_PRIORITY}'")
+            priority = DEFAULT_PRIORITY
+
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        item = ScheduledAction(action, event, priority, future)
+        self._enqueue(item)
+
+        logger.info(
+            f"🗂️ Queued '{action}' for camera {item.camera} at priority {priority} "
+            f"({self._pending} pending)"
+        )
+        return future
+
+    def _enqueue(self, item: ScheduledAction):
+        tier = item.priority
+        weight = self._camera_weights.get(item.camera, 1.0)
+        last_finish = self._last_finish[tier].get(item.camera, 0.0)
+        finish_tag = max(self._virtual_time[tier], last_finish) + 1.0 / weight
+        self._last_finish[tier][item.camera] = finish_tag
+
+        item.done = False
+        item.seq = next(self._seq)
+        heapq.heappush(self._queues[tier], (finish_tag, item.seq, item))
+        self._arrivals[tier].append((item.seq, item))
+        self._pending += 1
+        self._wakeup.set()
+
+    def _requeue(self, item: ScheduledAction):
+        self._deferred_waiting -= 1
+        self._enqueue(item)
+
+    def _admit(self, item: ScheduledAction) -> bool:
+        """Applies the load-shedding policy. Returns True if the action should run now."""
+        decision = self._admission(item.action, item.priority, item.camera) if self._admission else RUN
+        if decision == RUN:
+            return True
+
+        if decision == DEFER and item.defers < self._max_defers:
+            item.defers += 1
+            self._deferred += 1
+            self._deferred_waiting += 1
+            logger.info(
+                f"⏸️ Deferring '{item.action}' for camera {item.camera} by "
+                f"{self._defer_seconds}s (attempt {item.defers}/{self._max_defers})"
+            )
+            asyncio.get_running_loop().call_later(
+                self._defer_seconds, self._requeue, item
+            )
+            return False
+
+        self._dropped += 1
+        logger.warning(
+            f"🗑️ Dropping '{item.action}' for camera {item.camera} "
+            f"(priority {item.priority}): upstream degraded"
+        )
+        if not item.future.done():
+            item.future.set_result(
+                {"error": f"Action '{item.action}' shed while upstream is degraded"}
+            )
+        return False
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(i)) for i in range(self._worker_count)
+        ]
+
+    def _next_item(self):
+        """Pick the next action: starving actions first, then strict priority with WFQ."""
+        now = time.monotonic()
+        starving = None
+        for tier in PRIORITY_TIERS:
+            arrivals = self._arrivals[tier]
+            while arrivals and self._is_stale(*arrivals[0]):
+                arrivals.popleft()
+            if tier == PRIORITY_TIERS[0] or not arrivals:
+                continue
+            oldest = arrivals[0][1]
+            if now - oldest.enqueued_at >= self._starvation_seconds and (
+                starving is None or oldest.enqueued_at < starving[1].enqueued_at
+            ):
+                starving = (tier, oldest)
+        if starving:
+            self._promoted += 1
+            return self._take(*starving)
+
+        for tier in PRIORITY_TIERS:
+            queue = self._queues[tier]
+            while queue:
+                finish_tag, seq, item = heapq.heappop(queue)
+                if self._is_stale(seq, item):
+                    continue
+                self._virtual_time[tier] = finish_tag
+                return self._take(tier, item)
+        return None
+
+    @staticmethod
+    def _is_stale(seq: int, item: ScheduledAction) -> bool:
+        return item.done or seq != item.seq
+
+    def _take(self, tier: str, item: ScheduledAction) -> ScheduledAction:
+        # Items picked out of order stay in the heap and are skipped lazily
+        item.done = True
+        self._pending -= 1
+        return item
+
+    async def _worker(self, index: int):
+        while True:
+            item = self._next_item()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if not self._admit(item):
+                continue
+
+            self._dispatched[item.priority] += 1
+            self._running += 1
+            waited = time.monotonic() - item.enqueued_at
+            logger.info(
+                f"🚦 Worker {index} dispatching '{item.action}' for camera "
+                f"{item.camera} (priority {item.priority}, waited {waited:.1f}s)"
+            )
+            try:
+                result = await self._handler(item.action, item.event)
+                if not item.future.done():
+                    item.future.set_result(result)
+            except Exception as e:
+                logger.error(f"❌ Scheduled action '{item.action}' failed: {e}")
+                if not item.future.done():
+                    item.future.set_exception(e)
+            finally:
+                self._running -= 1
+
+    async def stop(self):
+        """Cancel the worker tasks. Queued actions are abandoned."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "running": self._running,
+            "queued_by_priority": {
+                tier: sum(
+                    1 for seq, item in self._arrivals[tier] if not self._is_stale(seq, item)
+                )
+                for tier in PRIORITY_TIERS
+            },
+            "dispatched_by_priority": dict(self._dispatched),
+            "starvation_promotions": self._promoted,
+            "deferred": self._deferred,
+            "deferred_waiting": self._deferred_waiting,
+            "dropped": self._dropped,
+        }
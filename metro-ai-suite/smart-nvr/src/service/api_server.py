@@ -9,8 +9,8 @@ app = FastAPI()
 
 @app.get("/results/{rule_id}")
 async def fetch_results(rule_id: str):
-    responses = await get_responses(rule_id)
-    return [json.loads(r) for r in responses]
+    # Responses are decoded by the Redis payload codec
+    return await get_responses(rule_id)
 
 
 async def start_api():
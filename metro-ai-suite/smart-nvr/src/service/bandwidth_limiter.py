@@ -0,0 +1,194 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from config import (
+    UPLOAD_BANDWIDTH_LIMITS,
+    UPLOAD_BANDWIDTH_DEFAULT,
+    UPLOAD_CHUNK_SIZE,
+)
+from service import metrics
+
+logger = logging.getLogger(__name__)
+
+# Window used to report the current upload rate
+RATE_WINDOW = 10.0
+
+
+class BandwidthLimiter:
+    """
+    Token bucket shared by every upload to one destination.
+
+    Tokens are bytes, refilled at `rate` bytes/s up to `burst`. Uploads take
+    tokens chunk by chunk; while they wait, chunks are granted round-robin
+    across keys (cameras), so one camera uploading a large backlog cannot
+    starve the others. A rate of 0 disables limiting but still counts bytes.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float = None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst or max(rate, UPLOAD_CHUNK_SIZE)
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._condition = threading.Condition()
+        # key -> queue of waiting tickets; _turns is the round-robin order of keys
+        self._waiting = {}
+        self._turns = deque()
+        self._queued_bytes = 0
+        self._sent_bytes = 0
+        self._recent = deque()
+
+    def acquire(self, nbytes: int, key: str = "default"):
+        """Blocks until nbytes may be sent for key."""
+        if self.rate <= 0:
+            with self._condition:
+                self._record(nbytes)
+            return
+
+        ticket = object()
+        with self._condition:
+            queue = self._waiting.setdefault(key, deque())
+            queue.append(ticket)
+            if key not in self._turns:
+                self._turns.append(key)
+            self._queued_bytes += nbytes
+            try:
+                while True:
+                    self._refill()
+                    my_turn = self._turns[0] == key and queue[0] is ticket
+                    # Chunks larger than the bucket go through once it is full
+                    needed = min(nbytes, self.burst)
+                    if my_turn and self._tokens >= needed:
+                        break
+                    timeout = (needed - self._tokens) / self.rate if my_turn else None
+                    self._condition.wait(timeout=timeout)
+                self._tokens -= nbytes
+                self._record(nbytes)
+            finally:
+                self._queued_bytes -= nbytes
+                queue.remove(ticket)
+                self._turns.remove(key)
+                if queue:
+                    # Back of the line until every other waiting camera had a turn
+                    self._turns.append(key)
+                else:
+                    del self._waiting[key]
+                self._condition.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _record(self, nbytes: int):
+        now = time.monotonic()
+        self._sent_bytes += nbytes
+        self._recent.append((now, nbytes))
+        while self._recent and now - self._recent[0][0] > RATE_WINDOW:
+            self._recent.popleft()
+
+    def stats(self) -> dict:
+        with self._condition:
+            now = time.monotonic()
+            recent = sum(n for t, n in self._recent if now - t <= RATE_WINDOW)
+            return {
+                "rate_limit_bytes_per_sec": self.rate,
+                "bytes_per_sec": round(recent / RATE_WINDOW, 1),
+                "queued_bytes": self._queued_bytes,
+                "waiting_uploads": sum(len(q) for q in self._waiting.values()),
+                "sent_bytes": self._sent_bytes,
+            }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(name: str) -> BandwidthLimiter:
+    """Returns the shared limiter for an upload destination, creating it on first use."""
+    with _limiters_lock:
+        if name not in _limiters:
+            rate = UPLOAD_BANDWIDTH_LIMITS.get(name, UPLOAD_BANDWIDTH_DEFAULT)
+            _limiters[name] = BandwidthLimiter(name, rate)
+            if rate > 0:
+                logger.info(f"📶 Upload bandwidth to {name} limited to {rate:.0f} bytes/s")
+        return _limiters[name]
+
+
+class ThrottledMultipartFile:
+    """
+    Streams a file as a multipart/form-data body, taking tokens from a
+    BandwidthLimiter for each chunk read. Has a length so requests sends a
+    Content-Length instead of chunked encoding.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        field: str,
+        content_type: str,
+        limiter: BandwidthLimiter,
+        key: str = "default",
+    ):
+        self.limiter = limiter
+        self.key = key
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self._head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{path.name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self._file = open(path, "rb")
+        self._length = len(self._head) + path.stat().st_size + len(self._tail)
+        self._parts = deque([self._head])
+        self._file_done = False
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._length
+        size = min(size, UPLOAD_CHUNK_SIZE)
+        data = self._next(size)
+        if data:
+            self.limiter.acquire(len(data), self.key)
+        return data
+
+    def _next(self, size: int) -> bytes:
+        if self._parts:
+            part = self._parts.popleft()
+            if len(part) > size:
+                self._parts.appendleft(part[size:])
+                part = part[:size]
+            return part
+        if not self._file_done:
+            data = self._file.read(size)
+            if data:
+                return data
+            self._file_done = True
+            self._parts.append(self._tail)
+            return self._next(size)
+        return b""
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+metrics.register(
+    "upload_bandwidth",
+    lambda: {name: limiter.stats() for name, limiter in list(_limiters.items())},
+)
@@ -0,0 +1,177 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import logging
+import threading
+import time
+from contextlib import contextmanager
+import requests
+from config import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RESET_TIMEOUT,
+    BREAKER_HALF_OPEN_PROBES,
+    FRIGATE_BASE_URL,
+    VSS_SUMMARY_URL,
+    VSS_SEARCH_URL,
+)
+from service import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Upstream names used for breakers and load shedding
+FRIGATE = "frigate"
+VSS_SUMMARY = "vss_summary"
+VSS_SEARCH = "vss_search"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the upstream's circuit is open."""
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """Timeouts, connection errors and 5xx responses count against the breaker; 4xx do not."""
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500
+    return isinstance(exc, requests.exceptions.RequestException)
+
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds. It then lets up to `half_open_probes` calls
+    through; a successful probe closes the circuit, a failed one reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        half_open_probes: int = BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._total_failures = 0
+        self._total_rejected = 0
+        self._times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"🟡 Circuit '{self.name}' half-open, probing upstream")
+        return self._state
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"🟢 Circuit '{self.name}' closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes_in_flight = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._total_failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._times_opened += 1
+                    logger.warning(
+                        f"🔴 Circuit '{self.name}' opened after {self._failures} failure(s)"
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes_in_flight = 0
+
+    @contextmanager
+    def guard(self):
+        """Wrap an upstream call. Raises CircuitOpenError when the call is rejected."""
+        if not self._acquire():
+            raise CircuitOpenError(f"Upstream '{self.name}' is unavailable (circuit open)")
+        try:
+            yield
+        except Exception as e:
+            if is_upstream_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        else:
+            self.record_success()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "total_failures": self._total_failures,
+                "rejected_calls": self._total_rejected,
+                "times_opened": self._times_opened,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Returns the shared breaker for an upstream, creating it on first use."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def upstream_for_url(base_url: str) -> str:
+    """Maps a configured base URL to its upstream name."""
+    if base_url == VSS_SUMMARY_URL:
+        return VSS_SUMMARY
+    if base_url == VSS_SEARCH_URL:
+        return VSS_SEARCH
+    if base_url == FRIGATE_BASE_URL:
+        return FRIGATE
+    return base_url
+
+
+def is_degraded(name: str) -> bool:
+    """
+    True while the upstream's circuit is open. A half-open circuit is not
+    degraded: its traffic is what probes the upstream and closes it again.
+    """
+    return get_breaker(name).state == OPEN
+
+
+metrics.register(
+    "circuit_breakers",
+    lambda: {name: breaker.stats() for name, breaker in list(_breakers.items())},
+)
@@ -0,0 +1,233 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+import os
+import re
+import tempfile
+from typing import List, Optional, Tuple
+from config import (
+    CLIP_TRIM_ENABLED,
+    CLIP_TRIM_SOURCE,
+    CLIP_TRIM_PADDING,
+    CLIP_TRIM_MIN_IDLE,
+    CLIP_TRIM_MIN_DURATION,
+    CLIP_TRANSCODE_HEIGHT,
+    CLIP_TRANSCODE_BITRATE,
+)
+from service.ffmpeg_utils import ffmpeg_available, run_ffmpeg
+
+logger = logging.getLogger(__name__)
+
+# Skip the re-encode when trimming would keep almost the whole clip
+MAX_KEEP_RATIO = 0.9
+
+_FREEZE_START = re.compile(r"freeze_start:\s*([0-9.]+)")
+_FREEZE_END = re.compile(r"freeze_end:\s*([0-9.]+)")
+
+
+def merge_intervals(
+    intervals: List[Tuple[float, float]], duration: float, min_gap: float
+) -> List[Tuple[float, float]]:
+    """Clamp intervals to [0, duration] and merge those separated by less than min_gap."""
+    merged = []
+    for start, end in sorted(intervals):
+        start, end = max(0.0, start), min(duration, end)
+        if end <= start:
+            continue
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def active_intervals_from_segments(
+    segments: list,
+    start_time: float,
+    end_time: float,
+    padding: float = CLIP_TRIM_PADDING,
+    min_idle: float = CLIP_TRIM_MIN_IDLE,
+) -> List[Tuple[float, float]]:
+    """
+    Convert Frigate recording segments into active intervals relative to start_time.
+
+    A segment is active when Frigate recorded any motion or tracked objects in it.
+    """
+    intervals = []
+    for segment in segments:
+        if not (segment.get("motion") or segment.get("objects")):
+            continue
+        seg_start = max(segment.get("start_time", start_time), start_time)
+        seg_end = min(segment.get("end_time", end_time), end_time)
+        intervals.append(
+            (seg_start - start_time - padding, seg_end - start_time + padding)
+        )
+    return merge_intervals(intervals, end_time - start_time, min_idle)
+
+
+def active_intervals_from_freezes(
+    freezes: List[Tuple[float, float]],
+    duration: float,
+    padding: float = CLIP_TRIM_PADDING,
+    min_idle: float = CLIP_TRIM_MIN_IDLE,
+) -> List[Tuple[float, float]]:
+    """Invert the static (frozen) intervals reported by ffmpeg into active intervals."""
+    intervals = []
+    cursor = 0.0
+    for freeze_start, freeze_end in sorted(freezes):
+        if freeze_start > cursor:
+            intervals.append((cursor - padding, freeze_start + padding))
+        cursor = max(cursor, freeze_end)
+    if cursor < duration:
+        intervals.append((cursor - padding, duration + padding))
+    return merge_intervals(intervals, duration, min_idle)
+
+
+class ClipPreprocessor:
+    """
+    Optional stage between downloading a clip from Frigate and uploading it to VSS.
+
+    Cuts idle segments out of the clip and/or downscales it to a target
+    height and bitrate, so fewer bytes are sent and VSS processes fewer frames.
+    Any failure falls back to uploading the original clip.
+    """
+
+    def __init__(
+        self,
+        frigate_service,
+        trim_enabled: bool = CLIP_TRIM_ENABLED,
+        trim_source: str = CLIP_TRIM_SOURCE,
+        target_height: int = CLIP_TRANSCODE_HEIGHT,
+        target_bitrate: str = CLIP_TRANSCODE_BITRATE,
+        min_duration: float = CLIP_TRIM_MIN_DURATION,
+    ):
+        self.frigate_service = frigate_service
+        self.trim_enabled = trim_enabled
+        self.trim_source = trim_source
+        self.target_height = target_height
+        self.target_bitrate = target_bitrate
+        self.min_duration = min_duration
+
+    @property
+    def enabled(self) -> bool:
+        return self.trim_enabled or bool(self.target_height or self.target_bitrate)
+
+    async def process(
+        self, clip_path: str, camera_name: str, start_time: float, end_time: float
+    ) -> str:
+        """
+        Returns the path of the clip to upload. This is either a new temporary
+        file owned by the caller or clip_path itself when nothing was changed.
+        """
+        if not self.enabled:
+            return clip_path
+        if not ffmpeg_available():
+            logger.warning("ffmpeg not found, uploading clip without preprocessing")
+            return clip_path
+
+        duration = end_time - start_time
+        intervals = None
+        if self.trim_enabled:
+            try:
+                intervals = await self._find_active_intervals(
+                    clip_path, camera_name, start_time, end_time
+                )
+            except Exception as e:
+                logger.warning(f"Activity detection failed, keeping full clip: {e}")
+
+            if intervals is not None:
+                kept = sum(end - start for start, end in intervals)
+                if not intervals or kept < self.min_duration:
+                    logger.info(
+                        f"Only {kept:.1f}s of activity found, keeping full clip"
+                    )
+                    intervals = None
+                elif kept >= duration * MAX_KEEP_RATIO:
+                    intervals = None
+                else:
+                    logger.info(
+                        f"Trimming clip to {kept:.1f}s of activity out of {duration:.1f}s"
+                    )
+
+        if intervals is None and not (self.target_height or self.target_bitrate):
+            return clip_path
+
+        try:
+            return await self._transcode(clip_path, intervals)
+        except Exception as e:
+            logger.warning(f"Clip preprocessing failed, uploading original: {e}")
+            return clip_path
+
+    async def _find_active_intervals(
+        self, clip_path: str, camera_name: str, start_time: float, end_time: float
+    ) -> Optional[List[Tuple[float, float]]]:
+        if self.trim_source == "freezedetect":
+            freezes = await self._detect_freezes(clip_path)
+            return active_intervals_from_freezes(freezes, end_time - start_time)
+
+        segments = await asyncio.to_thread(
+            self.frigate_service.get_recording_segments,
+            camera_name,
+            start_time,
+            end_time,
+        )
+        if not segments:
+            return None
+        return active_intervals_from_segments(segments, start_time, end_time)
+
+    async def _detect_freezes(self, clip_path: str) -> List[Tuple[float, float]]:
+        """Runs ffmpeg's freezedetect filter and returns static intervals in seconds."""
+        _, stderr = await run_ffmpeg(
+            "-hide_banner",
+            "-i",
+            clip_path,
+            "-map",
+            "0:v:0",
+            "-vf",
+            f"freezedetect=n=0.003:d={CLIP_TRIM_MIN_IDLE}",
+            "-f",
+            "null",
+            "-",
+        )
+        starts = [float(v) for v in _FREEZE_START.findall(stderr)]
+        ends = [float(v) for v in _FREEZE_END.findall(stderr)]
+        # A freeze lasting until the end of the clip has no freeze_end line
+        ends += [float("inf")] * (len(starts) - len(ends))
+        return list(zip(starts, ends))
+
+    async def _transcode(
+        self, clip_path: str, intervals: Optional[List[Tuple[float, float]]]
+    ) -> str:
+        filters = []
+        if intervals:
+            selection = "+".join(
+                f"between(t,{start:.3f},{end:.3f})" for start, end in intervals
+            )
+            filters.append(f"select='{selection}'")
+            filters.append("setpts=N/FRAME_RATE/TB")
+        if self.target_height:
+            filters.append(f"scale=-2:{self.target_height}")
+
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
+            out_path = tmp_file.name
+
+        args = ["-hide_banner", "-y", "-i", clip_path, "-an"]
+        if filters:
+            args += ["-vf", ",".join(filters)]
+        args += ["-c:v", "libx264", "-preset", "veryfast"]
+        if self.target_bitrate:
+            args += ["-b:v", self.target_bitrate]
+        args += ["-movflags", "+faststart", out_path]
+
+        try:
+            await run_ffmpeg(*args)
+        except Exception:
+            os.remove(out_path)
+            raise
+
+        logger.info(
+            f"Preprocessed clip {os.path.getsize(clip_path)} -> "
+            f"{os.path.getsize(out_path)} bytes"
+        )
+        return out_path
@@ -0,0 +1,364 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from config import (
+    CLIP_SPOOL_DIR,
+    CLIP_SPOOL_MAX_BYTES,
+    CLIP_SPOOL_CONCURRENCY,
+    CLIP_SPOOL_MAX_ATTEMPTS,
+    CLIP_SPOOL_RETRY_BASE,
+    CLIP_SPOOL_RETRY_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+# Clip states
+PENDING = "pending"  # waiting for upload
+UPLOADING = "uploading"  # claimed by the uploader (upload or follow-up)
+UPLOADED = "uploaded"  # uploaded, follow-up (summary/search) still to run
+FAILED = "failed"  # gave up; kept in the index for inspection
+
+# HTTP statuses worth retrying: timeouts, throttling and upstream/server errors
+RETRYABLE_STATUSES = {408, 429}
+
+# Shortest pause between spool index queries while a slot is free
+MIN_POLL_INTERVAL = 0.25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    rule_id TEXT,
+    camera TEXT,
+    start_time REAL,
+    end_time REAL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL,
+    video_id TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS clips_due ON clips (state, next_attempt);
+"""
+
+
+def is_retryable(status: int) -> bool:
+    return status >= 500 or status in RETRYABLE_STATUSES
+
+
+class SpooledClip:
+    """A clip in the spool, as stored in the index."""
+
+    __slots__ = (
+        "id",
+        "path",
+        "size",
+        "action",
+        "rule_id",
+        "camera",
+        "start_time",
+        "end_time",
+        "state",
+        "attempts",
+        "video_id",
+    )
+
+    def __init__(self, row: sqlite3.Row):
+        for name in self.__slots__:
+            setattr(self, name, row[name])
+
+    @property
+    def is_search(self) -> bool:
+        return self.action == "add to search"
+
+
+class ClipSpool:
+    """
+    Durable on-disk queue of clips waiting to be uploaded to VSS.
+
+    Clips are moved into directory and tracked in a SQLite index next to them,
+    so pending uploads survive restarts and VSS outages.
+    """
+
+    def __init__(self, directory: str = CLIP_SPOOL_DIR, max_bytes: int = CLIP_SPOOL_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "spool.db"), check_same_thread=False, isolation_level=None
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def spooled_bytes(self) -> int:
+        # Only clips whose file is still on disk
+        row = self._execute(
+            "SELECT COALESCE(SUM(size), 0) FROM clips WHERE state != ? AND video_id IS NULL",
+            (FAILED,),
+        )[0]
+        return row[0]
+
+    def enqueue(self, clip_path: str, action: str, event: dict) -> str:
+        """
+        Moves clip_path into the spool and records it. Returns the spool ID.
+        Raises OSError if the spool is full.
+        """
+        size = os.path.getsize(clip_path)
+        if self.spooled_bytes() + size > self.max_bytes:
+            raise OSError(f"Clip spool is full ({self.max_bytes} bytes)")
+
+        clip_id = uuid.uuid4().hex
+        spool_path = os.path.join(self.directory, f"{clip_id}.mp4")
+        shutil.move(clip_path, spool_path)
+        now = time.time()
+        self._execute(
+            "INSERT INTO clips (id, path, size, action, rule_id, camera, start_time,"
+            " end_time, state, next_attempt, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                clip_id,
+                spool_path,
+                size,
+                action,
+                event.get("rule_id"),
+                event.get("camera"),
+                event.get("start_time"),
+                event.get("end_time"),
+                PENDING,
+                now,
+                now,
+            ),
+        )
+        logger.info(f"📥 Spooled clip {clip_id} ({size} bytes) for '{action}'")
+        return clip_id
+
+    def recover(self):
+        """Clips claimed by a previous process that died mid-upload are retried."""
+        self._execute(
+            "UPDATE clips SET state = CASE WHEN video_id IS NULL THEN ? ELSE ? END"
+            " WHERE state = ?",
+            (PENDING, UPLOADED, UPLOADING),
+        )
+
+    def claim_due(self, limit: int) -> list:
+        """Claims up to limit clips whose next attempt is due, oldest first."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM clips WHERE state IN (?, ?) AND next_attempt <= ?"
+                " ORDER BY next_attempt LIMIT ?",
+                (PENDING, UPLOADED, time.time(), limit),
+            ).fetchall()
+            clips = [SpooledClip(row) for row in rows]
+            self._db.executemany(
+                "UPDATE clips SET state = ? WHERE id = ?",
+                [(UPLOADING, clip.id) for clip in clips],
+            )
+        return clips
+
+    def next_due(self) -> float:
+        row = self._execute(
+            "SELECT MIN(next_attempt) FROM clips WHERE state IN (?, ?)",
+            (PENDING, UPLOADED),
+        )[0]
+        return row[0] if row[0] is not None else float("inf")
+
+    def mark_uploaded(self, clip: SpooledClip, video_id: str):
+        """Clip is in VSS: drop the local file and keep the row for the follow-up."""
+        self._execute(
+            "UPDATE clips SET video_id = ?, attempts = 0 WHERE id = ?",
+            (video_id, clip.id),
+        )
+        clip.attempts = 0
+        self._remove_file(clip.path)
+
+    def retry(self, clip: SpooledClip, error: str, delay: float):
+        state = UPLOADED if clip.video_id else PENDING
+        self._execute(
+            "UPDATE clips SET state = ?, attempts = attempts + 1, next_attempt = ?,"
+            " last_error = ? WHERE id = ?",
+            (state, time.time() + delay, error, clip.id),
+        )
+
+    def fail(self, clip: SpooledClip, error: str):
+        self._execute(
+            "UPDATE clips SET state = ?, last_error = ? WHERE id = ?",
+            (FAILED, error, clip.id),
+        )
+        self._remove_file(clip.path)
+
+    def complete(self, clip: SpooledClip):
+        self._execute("DELETE FROM clips WHERE id = ?", (clip.id,))
+        self._remove_file(clip.path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove spooled clip {path}: {e}")
+
+    def stats(self) -> dict:
+        rows = self._execute("SELECT state, COUNT(*) FROM clips GROUP BY state")
+        return {
+            "clips_by_state": {row[0]: row[1] for row in rows},
+            "spooled_bytes": self.spooled_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+
+class SpoolUploader:
+    """
+    Background worker draining the ClipSpool.
+
+    Uploads at most `concurrency` clips at a time; bandwidth is capped by the
+    per-destination limiter every clip upload goes through. Retryable
+    failures back off exponentially up to max_attempts. Once a clip is
+    uploaded, follow_up(clip) runs the action's next step (create the
+    summary or search embeddings) and is retried on its own without
+    re-uploading. follow_up returns a status dict like upload_clip does.
+    """
+
+    def __init__(
+        self,
+        spool: ClipSpool,
+        vms_service,
+        follow_up,
+        concurrency: int = CLIP_SPOOL_CONCURRENCY,
+        max_attempts: int = CLIP_SPOOL_MAX_ATTEMPTS,
+        retry_base: float = CLIP_SPOOL_RETRY_BASE,
+        retry_max: float = CLIP_SPOOL_RETRY_MAX,
+    ):
+        self.spool = spool
+        self.vms_service = vms_service
+        self.follow_up = follow_up
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+        self._inflight = set()
+        self._wakeup = None
+        self._task = None
+        self._uploaded = 0
+        self._failed = 0
+        self._retried = 0
+
+    def start(self):
+        if self._task:
+            return
+        self.spool.recover()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("🚚 Spool uploader started")
+
+    def notify(self):
+        """Wake the uploader after new clips were spooled."""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stops claiming clips and waits for in-flight uploads to finish."""
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        self._task = None
+        logger.info("🚚 Spool uploader stopped")
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            for clip in self.spool.claim_due(self.concurrency - len(self._inflight)):
+                task = asyncio.get_running_loop().create_task(self._process(clip))
+                self._inflight.add(task)
+                task.add_done_callback(self._on_done)
+
+            if len(self._inflight) >= self.concurrency:
+                # No slot to claim a due clip with; _on_done wakes us once one frees up
+                await self._wakeup.wait()
+                continue
+
+            wait = min(max(MIN_POLL_INTERVAL, self.spool.next_due() - time.time()), 5.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task):
+        self._inflight.discard(task)
+        # A slot was freed
+        self.notify()
+
+    async def _process(self, clip: SpooledClip):
+        try:
+            if not clip.video_id:
+                result = await self._upload(clip)
+                if result["status"] != 200:
+                    self._handle_failure(clip, result)
+                    return
+                clip.video_id = result["message"]
+                self.spool.mark_uploaded(clip, clip.video_id)
+                self._uploaded += 1
+
+            result = await self.follow_up(clip)
+            if result.get("status") != 200:
+                self._handle_failure(clip, result)
+                return
+            self.spool.complete(clip)
+            logger.info(f"✅ Spooled clip {clip.id} processed for '{clip.action}'")
+        except Exception as e:
+            logger.error(f"❌ Spooled clip {clip.id} failed: {e}")
+            self._handle_failure(clip, {"status": 500, "message": str(e)})
+
+    async def _upload(self, clip: SpooledClip) -> dict:
+        if not os.path.exists(clip.path):
+            return {"status": 410, "message": "Spooled clip file is missing"}
+        return await asyncio.to_thread(
+            self.vms_service.upload_clip, clip.path, clip.is_search, clip.camera
+        )
+
+    def _handle_failure(self, clip: SpooledClip, result: dict):
+        status = result.get("status", 500)
+        message = str(result.get("message", result))
+        if is_retryable(status) and clip.attempts + 1 < self.max_attempts:
+            delay = min(self.retry_base * (2 ** clip.attempts), self.retry_max)
+            self._retried += 1
+            logger.warning(
+                f"🔁 Spooled clip {clip.id} failed ({status}: {message}), "
+                f"retrying in {delay:.0f}s (attempt {clip.attempts + 1}/{self.max_attempts})"
+            )
+            self.spool.retry(clip, message, delay)
+        else:
+            self._failed += 1
+            logger.error(f"❌ Giving up on spooled clip {clip.id}: {status}: {message}")
+            self.spool.fail(clip, message)
+
+    def stats(self) -> dict:
+        return dict(
+            self.spool.stats(),
+            inflight=len(self._inflight),
+            uploaded=self._uploaded,
+            retried=self._retried,
+            failed=self._failed,
+        )
@@ -0,0 +1,109 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+"""
+Codecs for JSON-like payloads stored in Redis (rules, responses, search
+results, event records).
+
+Values written by a versioned codec start with a version byte naming the
+codec, so any process can read values written with any codec. Values without
+a known version byte are legacy plain-JSON strings and are still decoded.
+"""
+import json
+import logging
+from config import REDIS_CODEC
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, compact binary
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCodec:
+    """Plain json.dumps strings without a version byte (the original format)."""
+
+    name = "json"
+    version = None
+
+    def encode(self, value) -> bytes:
+        return json.dumps(value).encode()
+
+    def decode(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    version = b"\x01"
+
+    def encode(self, value) -> bytes:
+        return self.version + orjson.dumps(value)
+
+    def decode(self, data: bytes):
+        return orjson.loads(data[1:])
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    version = b"\x02"
+
+    def encode(self, value) -> bytes:
+        return self.version + msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes):
+        return msgpack.unpackb(data[1:], raw=False)
+
+
+# Version byte -> codec name, including codecs whose library is not installed
+VERSIONED_CODECS = {OrjsonCodec.version: "orjson", MsgpackCodec.version: "msgpack"}
+
+
+def _available_codecs() -> dict:
+    codecs = {"json": JsonCodec()}
+    if orjson is not None:
+        codecs["orjson"] = OrjsonCodec()
+    if msgpack is not None:
+        codecs["msgpack"] = MsgpackCodec()
+    return codecs
+
+
+CODECS = _available_codecs()
+_BY_VERSION = {codec.version: codec for codec in CODECS.values() if codec.version}
+
+
+def get_codec(name: str = REDIS_CODEC):
+    codec = CODECS.get(name)
+    if codec is None:
+        logger.warning(f"Redis codec '{name}' is not available, using json")
+        codec = CODECS["json"]
+    return codec
+
+
+_codec = get_codec()
+
+
+def encode(value) -> bytes:
+    """Encode a payload with the configured codec."""
+    return _codec.encode(value)
+
+
+def decode(data):
+    """Decode a payload written by any codec, including legacy JSON strings."""
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode()
+    codec = _BY_VERSION.get(data[:1])
+    if codec is None:
+        if data[:1] in VERSIONED_CODECS:
+            raise ValueError(
+                f"Payload was written with {VERSIONED_CODECS[data[:1]]}, which is not installed"
+            )
+        return json.loads(data)
+    return codec.decode(data)
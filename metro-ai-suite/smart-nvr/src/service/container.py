@@ -0,0 +1,133 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import logging
+import threading
+from fastapi import Request
+from service.frigate_registry import FrigateRegistry
+from api.endpoints.summarization_api import SummarizationService
+from service.vms_service import VmsService
+from service.search_batcher import SearchIngestBatcher
+from service.action_scheduler import ActionScheduler
+from service.clip_spool import ClipSpool, SpoolUploader
+from service import metrics
+from config import CLIP_SPOOL_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Shared service singletons for one process.
+
+    Nothing is built when the container is created: each service is
+    constructed on first access and then reused by the HTTP API, the MQTT
+    dispatcher and the ingest worker alike. Access is thread-safe since
+    dispatch runs on its own event loop thread.
+    """
+
+    def __init__(self):
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._instances[name] = factory()
+        return instance
+
+    @property
+    def frigate_service(self) -> FrigateRegistry:
+        """All Frigate instances, routing each request by camera."""
+        return self._get("frigate_service", self._build_frigate_registry)
+
+    @staticmethod
+    def _build_frigate_registry() -> FrigateRegistry:
+        registry = FrigateRegistry()
+        metrics.register("frigate", registry.stats)
+        return registry
+
+    @property
+    def summarization_service(self) -> SummarizationService:
+        return self._get("summarization_service", SummarizationService)
+
+    @property
+    def vms_service(self) -> VmsService:
+        return self._get(
+            "vms_service",
+            lambda: VmsService(self.frigate_service, self.summarization_service),
+        )
+
+    @property
+    def search_batcher(self) -> SearchIngestBatcher:
+        return self._get("search_batcher", self._build_search_batcher)
+
+    def _build_search_batcher(self) -> SearchIngestBatcher:
+        # Clips that fail to ingest are handed to the spool when it is enabled
+        spool_uploader = self.spool_uploader if CLIP_SPOOL_ENABLED else None
+        return SearchIngestBatcher(self.vms_service, spool_uploader=spool_uploader)
+
+    @property
+    def action_scheduler(self) -> ActionScheduler:
+        return self._get("action_scheduler", self._build_action_scheduler)
+
+    @staticmethod
+    def _build_action_scheduler() -> ActionScheduler:
+        # Imported here: the dispatcher resolves its services through the container
+        from service.dispatcher import dispatch_action, shed_policy
+
+        scheduler = ActionScheduler(dispatch_action, admission=shed_policy)
+        metrics.register("scheduler", scheduler.stats)
+        return scheduler
+
+    @property
+    def clip_spool(self) -> ClipSpool:
+        return self._get("clip_spool", ClipSpool)
+
+    @property
+    def spool_uploader(self) -> SpoolUploader:
+        return self._get("spool_uploader", self._build_spool_uploader)
+
+    def _build_spool_uploader(self) -> SpoolUploader:
+        from service.dispatcher import complete_spooled_clip
+
+        uploader = SpoolUploader(
+            self.clip_spool, self.vms_service, follow_up=complete_spooled_clip
+        )
+        metrics.register("clip_spool", uploader.stats)
+        return uploader
+
+
+_container = None
+_container_lock = threading.Lock()
+
+
+def init_container() -> ServiceContainer:
+    """Create the process-wide container (called from the app lifespan)."""
+    global _container
+    with _container_lock:
+        _container = ServiceContainer()
+    return _container
+
+
+def get_container() -> ServiceContainer:
+    """The process-wide container, created on first use outside the app (e.g. scripts)."""
+    global _container
+    if _container is None:
+        with _container_lock:
+            if _container is None:
+                _container = ServiceContainer()
+    return _container
+
+
+# FastAPI dependencies
+
+
+def get_frigate_service(request: Request) -> FrigateRegistry:
+    return request.app.state.container.frigate_service
+
+
+def get_vms_service(request: Request) -> VmsService:
+    return request.app.state.container.vms_service
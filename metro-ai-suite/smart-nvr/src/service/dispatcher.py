@@ -1,18 +1,24 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-from service.vms_service import VmsService
+from service.vms_service import is_final_summary
 from service.redis_store import save_summary_id, save_summary_result, save_search
-from api.endpoints.summarization_api import SummarizationService
-from api.endpoints.frigate_api import FrigateService
+from service.action_scheduler import RUN, DEFER, DROP
+from service.circuit_breaker import is_degraded, upstream_for_url
+from service.container import get_container
+from config import (
+    VSS_SUMMARY_URL,
+    VSS_SEARCH_URL,
+    SEARCH_BATCH_ENABLED,
+    CLIP_SPOOL_ENABLED,
+)
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
-frigate_service = FrigateService()
-summarization_service = SummarizationService()
-vms_service = VmsService(frigate_service, summarization_service)
 
 
 async def dispatch_action(action: str, event: dict):
+    vms_service = get_container().vms_service
     if action == "summarize":
         try:
             camera_name = event.get("camera")
@@ -25,6 +31,9 @@ async def dispatch_action(action: str, event: dict):
                     "Missing required fields: camera, start_time, or end_time"
                 )
 
+            if CLIP_SPOOL_ENABLED:
+                return await spool_clip(action, event)
+
             summary_response = await vms_service.summarize(
                 camera_name=camera_name,
                 start_time=start_time,
@@ -38,13 +47,16 @@ async def dispatch_action(action: str, event: dict):
             await save_summary_id(event["rule_id"], summary_id)
 
             # Retrieve actual summary result (synchronously)
-            summary_result = vms_service.summary(summary_id)["summary"]
+            result = vms_service.summary(summary_id)
+            summary_result = result["summary"]
 
-            logger.info(
-                f"Saving summary result  {summary_result} for summary id {summary_id}"
-            )
-            # Store summary response
-            await save_summary_result(summary_id, summary_result)
+            # Only final summaries are cached; pending ones are looked up again
+            # by the summary-status endpoints until VSS is done
+            if is_final_summary(result):
+                logger.info(
+                    f"Saving summary result  {summary_result} for summary id {summary_id}"
+                )
+                await save_summary_result(summary_id, summary_result)
 
             return {
                 "summary_id": summary_id,
@@ -67,6 +79,28 @@ async def dispatch_action(action: str, event: dict):
                     "Missing required fields: camera, start_time, or end_time"
                 )
 
+            if event.get("search_mode") == "keyframes":
+                # A few images per event: cheap enough to skip batching and the spool
+                output = await vms_service.search_keyframes(
+                    camera_name, start_time, end_time, event_id=event.get("id")
+                )
+                if output["status"] != 200:
+                    return output
+                await save_search(
+                    event["rule_id"],
+                    dict(output, camera=camera_name, start_time=start_time, end_time=end_time),
+                )
+                return output
+
+            if SEARCH_BATCH_ENABLED:
+                # Results are saved per event once the batch is ingested
+                return await get_container().search_batcher.add(
+                    event["rule_id"], camera_name, start_time, end_time
+                )
+
+            if CLIP_SPOOL_ENABLED:
+                return await spool_clip(action, event)
+
             output = await vms_service.search_embeddings(
                 camera_name=camera_name,
                 start_time=start_time,
@@ -85,3 +119,85 @@ async def dispatch_action(action: str, event: dict):
 
     else:
         return {"error": f"Unknown action: {action}"}
+
+
+async def spool_clip(action: str, event: dict) -> dict:
+    """
+    Download and preprocess the event clip now, while Frigate still has it, and
+    leave the VSS upload to the spool uploader so VSS outages don't lose clips.
+    """
+    container = get_container()
+    clip = await container.vms_service.prepare_clip(
+        event["camera"], event["start_time"], event["end_time"]
+    )
+    if clip["status"] != 200:
+        logger.info(clip)
+        return clip
+
+    try:
+        spool_id = await asyncio.to_thread(
+            container.clip_spool.enqueue, clip["message"], action, event
+        )
+    except OSError as e:
+        container.vms_service.remove_file(clip["message"])
+        logger.error(f"❌ Could not spool clip for '{action}': {e}")
+        return {"status": 507, "message": str(e)}
+
+    container.spool_uploader.notify()
+    return {"status": 202, "message": "Clip spooled for upload", "spool_id": spool_id}
+
+
+async def complete_spooled_clip(clip) -> dict:
+    """Follow-up for a spooled clip once it is uploaded to VSS."""
+    vms_service = get_container().vms_service
+    if clip.is_search:
+        output = await asyncio.to_thread(
+            vms_service.request_search_embeddings, clip.video_id
+        )
+        if output["status"] != 200:
+            return output
+        await save_search(
+            clip.rule_id,
+            {
+                "video_id": output["video_id"],
+                "message": output["message"],
+                "camera": clip.camera,
+                "start_time": clip.start_time,
+                "end_time": clip.end_time,
+            },
+        )
+        return output
+
+    summary_response = await asyncio.to_thread(
+        vms_service.create_summary_pipeline, clip.video_id, clip.camera, clip.start_time
+    )
+    if summary_response["status"] != 200:
+        return summary_response
+    await save_summary_id(clip.rule_id, summary_response["message"])
+    return summary_response
+
+
+# VSS upstreams each action depends on, used for load shedding. Every action
+# also depends on the Frigate instance serving the event's camera.
+ACTION_UPSTREAMS = {
+    "summarize": (upstream_for_url(VSS_SUMMARY_URL),),
+    "add to search": (upstream_for_url(VSS_SEARCH_URL),),
+}
+
+
+def shed_policy(action: str, priority: str, camera: str = None) -> str:
+    """
+    Load-shedding policy applied right before dispatch. While any upstream the
+    action depends on is degraded (circuit open), "low" actions are dropped and
+    "normal" ones deferred; "high" actions still run. Once a circuit is
+    half-open every action runs again, so any of them can close it.
+    """
+    if priority == "high" or action not in ACTION_UPSTREAMS:
+        return RUN
+    upstreams = [
+        *get_container().frigate_service.upstreams_for_camera(camera),
+        *ACTION_UPSTREAMS[action],
+    ]
+    if not any(is_degraded(name) for name in upstreams):
+        return RUN
+    return DROP if priority == "low" else DEFER
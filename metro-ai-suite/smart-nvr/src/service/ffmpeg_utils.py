@@ -0,0 +1,176 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+from config import FFMPEG_PATH, FFPROBE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Video stream parameters that must match for clips to be joined by stream copy
+CONCAT_COPY_FIELDS = (
+    "codec_name",
+    "profile",
+    "level",
+    "width",
+    "height",
+    "pix_fmt",
+    "sample_aspect_ratio",
+    "time_base",
+    "r_frame_rate",
+)
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which(FFMPEG_PATH) is not None
+
+
+async def run_process(binary: str, *args) -> Tuple[str, str]:
+    """Runs a command without blocking the event loop. Returns (stdout, stderr)."""
+    process = await asyncio.create_subprocess_exec(
+        binary,
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    stderr_text = stderr.decode(errors="replace")
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"{os.path.basename(binary)} exited with {process.returncode}: {stderr_text[-500:]}"
+        )
+    return stdout.decode(errors="replace"), stderr_text
+
+
+async def run_ffmpeg(*args) -> Tuple[str, str]:
+    return await run_process(FFMPEG_PATH, *args)
+
+
+async def probe_duration(path: str) -> Optional[float]:
+    """Returns the container duration in seconds, or None if ffprobe fails."""
+    try:
+        stdout, _ = await run_process(
+            FFPROBE_PATH,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            path,
+        )
+        return float(stdout.strip())
+    except Exception as e:
+        logger.warning(f"Failed to probe duration of {path}: {e}")
+        return None
+
+
+async def probe_video_stream(path: str) -> Optional[dict]:
+    """Returns the CONCAT_COPY_FIELDS of the first video stream, or None if ffprobe fails."""
+    try:
+        stdout, _ = await run_process(
+            FFPROBE_PATH,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            f"stream={','.join(CONCAT_COPY_FIELDS)}",
+            "-of",
+            "json",
+            path,
+        )
+        streams = json.loads(stdout).get("streams") or []
+        if not streams:
+            return None
+        return {field: streams[0].get(field) for field in CONCAT_COPY_FIELDS}
+    except Exception as e:
+        logger.warning(f"Failed to probe video stream of {path}: {e}")
+        return None
+
+
+async def streams_match(paths: List[str]) -> bool:
+    """True if every clip's video stream has the same parameters as the first one."""
+    streams = await asyncio.gather(*(probe_video_stream(path) for path in paths))
+    return streams[0] is not None and all(stream == streams[0] for stream in streams[1:])
+
+
+async def concat_clips(paths: List[str]) -> str:
+    """
+    Concatenates clips into a new temporary mp4 owned by the caller. Clips
+    whose video streams have matching parameters are joined by stream copy;
+    otherwise, or if the copy fails, they are re-encoded. A stream copy of
+    mismatched clips can succeed yet produce a broken or desynced file.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+        for path in paths:
+            list_file.write(f"file '{path}'\n")
+        list_path = list_file.name
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
+        out_path = tmp_file.name
+
+    base_args = ["-hide_banner", "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+    reencode_args = [*base_args, "-c:v", "libx264", "-preset", "veryfast", "-an", out_path]
+    try:
+        if await streams_match(paths):
+            try:
+                await run_ffmpeg(*base_args, "-c", "copy", "-an", out_path)
+            except RuntimeError as e:
+                logger.info(f"Stream copy concat failed, re-encoding: {e}")
+                await run_ffmpeg(*reencode_args)
+        else:
+            logger.info(f"Video parameters of {len(paths)} clips differ, re-encoding")
+            await run_ffmpeg(*reencode_args)
+    except Exception:
+        os.remove(out_path)
+        raise
+    finally:
+        os.remove(list_path)
+    return out_path
+
+
+async def images_to_video(paths: List[str], height: int) -> str:
+    """
+    Encodes still images (any mix of JPEG/PNG) into a 1 fps mp4, one second
+    per image, owned by the caller. Images are letterboxed into a 16:9 frame
+    of the given height so frames from different sources share one size.
+    """
+    height -= height % 2
+    width = round(height * 16 / 9 / 2) * 2
+    inputs, filters = [], []
+    for index, path in enumerate(paths):
+        inputs += ["-loop", "1", "-framerate", "1", "-t", "1", "-i", path]
+        filters.append(
+            f"[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p[v{index}]"
+        )
+    labels = "".join(f"[v{index}]" for index in range(len(paths)))
+    filters.append(f"{labels}concat=n={len(paths)}:v=1:a=0[out]")
+
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp_file:
+        out_path = tmp_file.name
+    try:
+        await run_ffmpeg(
+            "-hide_banner",
+            "-y",
+            *inputs,
+            "-filter_complex",
+            ";".join(filters),
+            "-map",
+            "[out]",
+            "-r",
+            "1",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            out_path,
+        )
+    except Exception:
+        os.remove(out_path)
+        raise
+    return out_path
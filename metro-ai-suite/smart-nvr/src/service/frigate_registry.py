@@ -0,0 +1,211 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, List, Tuple
+from fastapi import HTTPException
+from api.endpoints.frigate_api import FrigateService
+from config import (
+    FRIGATE_INSTANCES,
+    FRIGATE_MQTT_BROKERS,
+    FRIGATE_DISCOVERY_INTERVAL,
+    FRIGATE_REDISCOVERY_INTERVAL,
+    MQTT_BROKER,
+    MQTT_PORT,
+    MQTT_TOPIC,
+)
+from service.circuit_breaker import FRIGATE
+
+logger = logging.getLogger(__name__)
+
+
+class FrigateInstance:
+    """One Frigate backend: its client, MQTT endpoint and discovered cameras."""
+
+    def __init__(self, name: str, base_url: str, upstream: str, broker: Tuple[str, int]):
+        self.name = name
+        self.service = FrigateService(base_url, upstream=upstream)
+        self.broker = broker
+        self.topic = MQTT_TOPIC
+        self.cameras = {}
+        self.discovered_at = None
+
+    def stats(self) -> dict:
+        return dict(
+            self.service.stats(),
+            upstream=self.service.upstream,
+            cameras=sorted(self.cameras),
+            mqtt=f"{self.broker[0]}:{self.broker[1]}/{self.topic}",
+            discovered_at=self.discovered_at,
+        )
+
+
+def _parse_broker(broker: str) -> Tuple[str, int]:
+    host, _, port = broker.rpartition(":")
+    if not host:
+        return port, MQTT_PORT
+    return host, int(port)
+
+
+class FrigateRegistry:
+    """
+    Routes camera requests to the Frigate instance serving the camera.
+
+    Exposes the FrigateService methods the rest of the router uses, taking the
+    camera name to pick the instance. The camera -> instance map comes from
+    each instance's /api/config; it is rebuilt on lookup once older than
+    discovery_interval seconds, or for an unknown camera once older than
+    rediscovery_interval seconds, so lookups of a missing camera do not query
+    every instance each time. With a single instance every camera goes to it
+    without discovery.
+    """
+
+    def __init__(
+        self,
+        instances: Dict[str, str] = FRIGATE_INSTANCES,
+        brokers: Dict[str, str] = FRIGATE_MQTT_BROKERS,
+        discovery_interval: float = FRIGATE_DISCOVERY_INTERVAL,
+        rediscovery_interval: float = FRIGATE_REDISCOVERY_INTERVAL,
+    ):
+        single = len(instances) == 1
+        self.instances = {}
+        for name, base_url in instances.items():
+            # A lone instance keeps the plain "frigate" breaker
+            upstream = FRIGATE if single else f"{FRIGATE}:{name}"
+            broker = _parse_broker(brokers[name]) if name in brokers else (MQTT_BROKER, MQTT_PORT)
+            self.instances[name] = FrigateInstance(name, base_url, upstream, broker)
+        self.discovery_interval = discovery_interval
+        self.rediscovery_interval = min(rediscovery_interval, discovery_interval)
+        self._camera_instances = {}
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+        logger.info(f"📹 Frigate instances: {', '.join(instances)}")
+
+    def refresh(self, force: bool = True) -> Dict[str, list]:
+        """
+        Re-reads /api/config from every instance and rebuilds the camera map.
+        Returns camera -> tracked objects over all reachable instances. An
+        instance that cannot be reached keeps the cameras found last time.
+        """
+        return self._refresh(0 if force else self.discovery_interval)
+
+    def _refresh(self, max_age: float) -> Dict[str, list]:
+        """Rebuilds the camera map unless it is younger than max_age seconds."""
+        with self._lock:
+            # Checked under the lock: concurrent lookups share one refresh
+            if time.monotonic() - self._refreshed_at < max_age:
+                return self._camera_objects()
+            errors = []
+            for instance in self.instances.values():
+                try:
+                    config = instance.service.get_config()
+                except HTTPException as e:
+                    logger.warning(f"⚠️ Frigate '{instance.name}' discovery failed: {e.detail}")
+                    errors.append(e)
+                    continue
+                instance.cameras = FrigateService.camera_objects(config)
+                prefix = (config.get("mqtt") or {}).get("topic_prefix")
+                instance.topic = f"{prefix}/events" if prefix else MQTT_TOPIC
+                instance.discovered_at = time.time()
+
+            camera_instances = {}
+            for instance in self.instances.values():
+                for camera in instance.cameras:
+                    owner = camera_instances.setdefault(camera, instance)
+                    if owner is not instance:
+                        logger.warning(
+                            f"⚠️ Camera '{camera}' exists on Frigate '{owner.name}' and "
+                            f"'{instance.name}', using '{owner.name}'"
+                        )
+            self._camera_instances = camera_instances
+            self._refreshed_at = time.monotonic()
+            if errors and len(errors) == len(self.instances):
+                raise errors[-1]
+            return self._camera_objects()
+
+    def _camera_objects(self) -> Dict[str, list]:
+        return {
+            camera: instance.cameras[camera]
+            for camera, instance in self._camera_instances.items()
+        }
+
+    def instance_for_camera(self, camera_name: str) -> FrigateInstance:
+        if len(self.instances) == 1:
+            return next(iter(self.instances.values()))
+        instance = self._camera_instances.get(camera_name)
+        max_age = self.discovery_interval if instance else self.rediscovery_interval
+        if time.monotonic() - self._refreshed_at >= max_age:
+            # New camera, cameras moved, or the map was never built
+            try:
+                self._refresh(max_age)
+            except HTTPException:
+                pass
+            instance = self._camera_instances.get(camera_name)
+        if instance is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Camera '{camera_name}' is not served by any Frigate instance",
+            )
+        return instance
+
+    def for_camera(self, camera_name: str) -> FrigateService:
+        return self.instance_for_camera(camera_name).service
+
+    def upstreams_for_camera(self, camera_name: str) -> List[str]:
+        """
+        Breaker names the camera's requests depend on, from the cached map
+        only (no discovery). Unknown cameras depend on every instance.
+        """
+        instance = self._camera_instances.get(camera_name)
+        if instance is None and len(self.instances) == 1:
+            instance = next(iter(self.instances.values()))
+        if instance is not None:
+            return [instance.service.upstream]
+        return [i.service.upstream for i in self.instances.values()]
+
+    def mqtt_subscriptions(self) -> Dict[Tuple[str, int], List[str]]:
+        """(host, port) -> event topics to subscribe to on that broker."""
+        subscriptions = {}
+        for instance in self.instances.values():
+            topics = subscriptions.setdefault(instance.broker, [])
+            if instance.topic not in topics:
+                topics.append(instance.topic)
+        return subscriptions
+
+    # FrigateService interface, routed by camera
+
+    def get_camera_names(self) -> Dict[str, list]:
+        """Get mapping of camera names to detected objects across all instances"""
+        return self.refresh(force=True)
+
+    async def get_camera_events(self, camera_name: str) -> dict:
+        # Resolving the camera may run discovery against every instance
+        service = await asyncio.to_thread(self.for_camera, camera_name)
+        return await service.get_camera_events(camera_name)
+
+    def get_recording_segments(
+        self, camera_name: str, start_time: float, end_time: float
+    ) -> list:
+        return self.for_camera(camera_name).get_recording_segments(
+            camera_name, start_time, end_time
+        )
+
+    def get_clip_from_timestamps(
+        self, camera_name: str, start_time: int, end_time: int, download: bool = False
+    ):
+        return self.for_camera(camera_name).get_clip_from_timestamps(
+            camera_name, start_time, end_time, download
+        )
+
+    def get_event_snapshot(
+        self, event_id: str, height: int = None, camera_name: str = None
+    ) -> bytes:
+        return self.for_camera(camera_name).get_event_snapshot(event_id, height)
+
+    def get_recording_frame(self, camera_name: str, frame_time: float) -> bytes:
+        return self.for_camera(camera_name).get_recording_frame(camera_name, frame_time)
+
+    def stats(self) -> dict:
+        return {name: instance.stats() for name, instance in self.instances.items()}
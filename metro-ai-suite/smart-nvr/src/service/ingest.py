@@ -0,0 +1,52 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+from service.mqtt_listener import start_mqtt, stop_mqtt, get_dispatch_loop
+from service.container import get_container
+from service.leader_election import RedisLeaderLock
+from config import CLIP_SPOOL_ENABLED
+
+logger = logging.getLogger(__name__)
+
+
+async def _on_dispatch_loop(coro):
+    return await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(coro, get_dispatch_loop())
+    )
+
+
+async def _start_spool_uploader():
+    get_container().spool_uploader.start()
+
+
+async def start_ingestion():
+    logger.info("🚀 Starting MQTT ingestion")
+    await start_mqtt()
+    if CLIP_SPOOL_ENABLED:
+        # Spooled clips are uploaded next to the dispatches that spool them
+        await _on_dispatch_loop(_start_spool_uploader())
+
+
+async def stop_ingestion():
+    await stop_mqtt()
+    # Ingest clips still waiting in search batches; they run on the MQTT loop
+    try:
+        await _on_dispatch_loop(get_container().search_batcher.flush_all())
+    except Exception as e:
+        logger.error(f"Failed to flush pending search batches: {e}")
+    if CLIP_SPOOL_ENABLED:
+        # Unfinished clips stay in the spool for the next leader
+        try:
+            await _on_dispatch_loop(get_container().spool_uploader.stop())
+        except Exception as e:
+            logger.error(f"Failed to stop the spool uploader: {e}")
+
+
+async def run_ingestion(redis_client):
+    """
+    Consume MQTT events only while this process holds the ingest leader lock,
+    so any number of processes can run this without duplicating dispatches.
+    """
+    lock = RedisLeaderLock(redis_client)
+    await lock.run(start_ingestion, stop_ingestion)
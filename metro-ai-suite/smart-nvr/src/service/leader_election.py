@@ -0,0 +1,124 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from config import LEADER_LOCK_KEY, LEADER_LOCK_TTL, LEADER_RENEW_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Only extend/release the lock if we still own it
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLeaderLock:
+    """
+    Leader election over a single Redis key (SET NX PX plus owner-checked renewal).
+
+    Every candidate process runs run(); the one holding the key is the leader.
+    The leader renews the key every renew_interval seconds. If the key was
+    taken over it steps down at once. If renewals keep failing (Redis
+    unreachable) it steps down renew_interval before the key would expire,
+    so it has stopped consuming by the time another process can be elected.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        key: str = LEADER_LOCK_KEY,
+        ttl: float = LEADER_LOCK_TTL,
+        renew_interval: float = LEADER_RENEW_INTERVAL,
+    ):
+        self.redis_client = redis_client
+        self.key = key
+        self.ttl_ms = int(ttl * 1000)
+        self.renew_interval = min(renew_interval, ttl / 3)
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._last_renewed = 0.0
+
+    async def try_acquire(self) -> bool:
+        acquired = await self.redis_client.set(self.key, self.token, nx=True, px=self.ttl_ms)
+        return bool(acquired)
+
+    async def renew(self) -> bool:
+        renewed = await self.redis_client.eval(
+            _RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms
+        )
+        return bool(renewed)
+
+    async def release(self):
+        await self.redis_client.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+
+    async def run(self, on_elected, on_lost):
+        """
+        Campaign until cancelled. Awaits on_elected() when this process becomes
+        leader and on_lost() when it steps down or is cancelled while leading.
+        """
+        try:
+            while True:
+                delay = self.renew_interval
+                try:
+                    if self.is_leader:
+                        # Bounded so a hanging Redis call cannot outlive the lease
+                        if await asyncio.wait_for(self.renew(), self.renew_interval / 2):
+                            self._last_renewed = time.monotonic()
+                        else:
+                            logger.warning("👑 Leadership lost: lock is held by another process")
+                            await self._step_down(on_lost)
+                    elif await self.try_acquire():
+                        self.is_leader = True
+                        self._last_renewed = time.monotonic()
+                        logger.info(f"👑 Elected ingest leader ({self.token})")
+                        try:
+                            await on_elected()
+                        except Exception as e:
+                            # Do not hold the lock without consuming; let another process lead
+                            logger.error(f"❌ Failed to start as leader, releasing the lock: {e}")
+                            await self._step_down(on_lost)
+                            await self.release()
+                except Exception as e:
+                    logger.error(f"❌ Leader election error: {e}")
+                    if self.is_leader:
+                        remaining = self._step_down_deadline() - time.monotonic()
+                        if remaining <= 0:
+                            logger.warning("👑 Stepping down: lock could not be renewed in time")
+                            await self._step_down(on_lost)
+                        else:
+                            # Retry by the deadline at the latest
+                            delay = min(delay, remaining)
+
+                await asyncio.sleep(delay)
+        finally:
+            if self.is_leader:
+                await self._step_down(on_lost)
+                try:
+                    await self.release()
+                except Exception as e:
+                    logger.error(f"❌ Failed to release leader lock: {e}")
+
+    def _step_down_deadline(self) -> float:
+        """Monotonic time the leader must have stepped down by without a renewal."""
+        return self._last_renewed + self.ttl_ms / 1000 - self.renew_interval
+
+    async def _step_down(self, on_lost):
+        self.is_leader = False
+        try:
+            await on_lost()
+        except Exception as e:
+            logger.error(f"❌ Error while stepping down: {e}")
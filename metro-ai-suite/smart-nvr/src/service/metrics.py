@@ -0,0 +1,25 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import logging
+
+logger = logging.getLogger(__name__)
+
+# name -> callable returning a JSON-serializable dict
+_providers = {}
+
+
+def register(name: str, provider):
+    """Register a callable whose output is exposed under `name` on /metrics."""
+    _providers[name] = provider
+
+
+def collect() -> dict:
+    """Collect the current values from all registered providers."""
+    output = {}
+    for name, provider in _providers.items():
+        try:
+            output[name] = provider()
+        except Exception as e:
+            logger.warning(f"Failed to collect metrics for {name}: {e}")
+            output[name] = {"error": str(e)}
+    return output
@@ -4,8 +4,10 @@ import asyncio
 from cProfile import label
 import json
 import paho.mqtt.client as mqtt
+from fastapi import HTTPException
 from service.rule_engine import process_event
-from config import MQTT_BROKER, MQTT_PORT, MQTT_TOPIC, MQTT_USER, MQTT_PASSWORD
+from service.container import get_container
+from config import MQTT_USER, MQTT_PASSWORD
 import logging
 import threading
 
@@ -13,8 +15,11 @@ import threading
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mqtt-listener")
 
-# Create and run an asyncio event loop in a separate thread
-event_loop = asyncio.new_event_loop()
+# Events are dispatched on a dedicated asyncio event loop running in its own
+# thread, so blocking upstream calls never stall the HTTP API. It is started on
+# first use rather than at import.
+_dispatch_loop = None
+_dispatch_loop_lock = threading.Lock()
 
 
 def start_event_loop(loop):
@@ -22,16 +27,29 @@ def start_event_loop(loop):
     loop.run_forever()
 
 
-threading.Thread(target=start_event_loop, args=(event_loop,), daemon=True).start()
+def get_dispatch_loop() -> asyncio.AbstractEventLoop:
+    global _dispatch_loop
+    with _dispatch_loop_lock:
+        if _dispatch_loop is None:
+            _dispatch_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=start_event_loop,
+                args=(_dispatch_loop,),
+                name="mqtt-dispatch-loop",
+                daemon=True,
+            ).start()
+    return _dispatch_loop
 
 
 def on_connect(client, userdata, flags, rc):
     if rc == 0:
-        logger.info("✅ Connected to MQTT broker")
-        client.subscribe(MQTT_TOPIC)
-        logger.info(f"📡 Subscribed to topic: {MQTT_TOPIC}")
+        logger.info(f"✅ Connected to MQTT broker {userdata['broker']}")
+        # Subscriptions are renewed on every reconnect
+        for topic in userdata["topics"]:
+            client.subscribe(topic)
+            logger.info(f"📡 Subscribed to topic: {topic}")
     else:
-        logger.error(f"❌ Failed to connect to MQTT broker, code: {rc}")
+        logger.error(f"❌ Failed to connect to MQTT broker {userdata['broker']}, code: {rc}")
 
 
 def on_message(client, userdata, msg):
@@ -60,9 +78,14 @@ def on_message(client, userdata, msg):
             logger.info("🚀 Submitting event to process_event coroutine")
             future = asyncio.run_coroutine_threadsafe(
                 process_event(
-                    event_data, context={"source": "mqtt", "topic": msg.topic}
+                    event_data,
+                    context={
+                        "source": "mqtt",
+                        "broker": userdata["broker"],
+                        "topic": msg.topic,
+                    },
                 ),
-                event_loop,
+                get_dispatch_loop(),
             )
             # Optional: log completion/failure if needed
             future.add_done_callback(
@@ -85,16 +108,47 @@ def on_message(client, userdata, msg):
         logger.error(f"❌ Exception while processing MQTT message: {e}", exc_info=True)
 
 
-async def start_mqtt():
-    client = mqtt.Client()
+# (host, port) -> client; one connection per broker, shared by the Frigate
+# instances publishing to it
+mqtt_clients = {}
+
+
+def _connect(host: str, port: int, topics: list):
+    client = mqtt.Client(userdata={"broker": f"{host}:{port}", "topics": topics})
     client.username_pw_set(MQTT_USER, MQTT_PASSWORD)
     client.on_connect = on_connect
     client.on_message = on_message
 
     try:
-        client.connect(MQTT_BROKER, MQTT_PORT)
-        logger.info(f"${MQTT_BROKER}  ${MQTT_PORT}  ${MQTT_USER}  ${MQTT_PASSWORD}")
-        logger.info(f"🚀 Connecting to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}...")
+        logger.info(f"🚀 Connecting to MQTT broker at {host}:{port}...")
+        client.connect(host, port)
         client.loop_start()
+        return client
     except Exception as e:
-        logger.error(f"❌ Error connecting to MQTT: {e}")
+        logger.error(f"❌ Error connecting to MQTT at {host}:{port}: {e}")
+        # The leader must not keep the lock without consuming events
+        raise RuntimeError(f"Cannot connect to MQTT broker {host}:{port}") from e
+
+
+async def start_mqtt():
+    get_dispatch_loop()
+    registry = get_container().frigate_service
+    if len(registry.instances) > 1:
+        # Discovers the event topic of every instance; unreachable instances
+        # keep the default topic
+        try:
+            await asyncio.to_thread(registry.refresh)
+        except HTTPException as e:
+            logger.warning(f"⚠️ Frigate discovery failed, using default topics: {e.detail}")
+
+    for (host, port), topics in registry.mqtt_subscriptions().items():
+        mqtt_clients[(host, port)] = _connect(host, port, topics)
+    return mqtt_clients
+
+
+async def stop_mqtt():
+    for (host, port), client in list(mqtt_clients.items()):
+        logger.info(f"🔌 Disconnecting from MQTT broker {host}:{port}")
+        client.disconnect()
+        client.loop_stop()
+    mqtt_clients.clear()
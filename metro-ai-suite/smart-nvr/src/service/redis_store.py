@@ -1,15 +1,114 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-import json
+import asyncio
+import threading
 from fastapi import Request
-from config import REDIS_HOST, REDIS_PORT
+import time
+from config import (
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_SOCKET_KEEPALIVE,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_RETRY_ON_TIMEOUT,
+    REDIS_RETRIES,
+    EVENT_INDEX_RETENTION,
+    EVENT_INDEX_MAX_RESULTS,
+)
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.client import NEVER_DECODE
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from service import metrics, codec
+
+# --- CONNECTION POOL ---
+# redis.asyncio connections belong to the event loop that opened them, so each
+# loop (the API loop, the MQTT dispatch loop) gets one pool built from the same
+# settings, and every client on that loop shares it.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _build_pool() -> redis.BlockingConnectionPool:
+    retry_kwargs = {}
+    if REDIS_RETRY_ON_TIMEOUT:
+        retry_kwargs = {
+            "retry": Retry(ExponentialBackoff(), REDIS_RETRIES),
+            "retry_on_error": [RedisTimeoutError],
+        }
+    # Blocking: at peak, callers wait for a free connection instead of failing
+    return redis.BlockingConnectionPool(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        decode_responses=True,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+        socket_keepalive=REDIS_SOCKET_KEEPALIVE,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        **retry_kwargs,
+    )
+
+
+def get_redis_client() -> redis.Redis:
+    """The pooled Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        entry = _pools.get(loop)
+        if entry is None:
+            pool = _build_pool()
+            entry = _pools[loop] = {
+                "name": threading.current_thread().name,
+                "pool": pool,
+                "client": redis.Redis(connection_pool=pool),
+            }
+    return entry["client"]
+
+
+async def close_redis_client():
+    """Closes the running event loop's pool and its connections."""
+    with _pools_lock:
+        entry = _pools.pop(asyncio.get_running_loop(), None)
+    if entry:
+        await entry["client"].aclose()
+        await entry["pool"].disconnect()
+
+
+def pool_stats() -> dict:
+    stats = {}
+    for entry in list(_pools.values()):
+        pool = entry["pool"]
+        in_use = len(pool._in_use_connections)
+        idle = len(pool._available_connections)
+        stats[entry["name"]] = {
+            "max_connections": pool.max_connections,
+            "in_use": in_use,
+            "idle": idle,
+            "utilization": round(in_use / pool.max_connections, 3),
+        }
+    return stats
+
+
+metrics.register("redis_pool", pool_stats)
+
 
 # --- RULE MANAGEMENT ---
-# Fallback client for non-FastAPI contexts (like MQTT)
-fallback_redis_client = redis.from_url(
-    f"redis://{REDIS_HOST}:{REDIS_PORT}", decode_responses=True
-)
+def get_fallback_redis_client():
+    """Client for non-FastAPI contexts (like MQTT), backed by the shared pool."""
+    return get_redis_client()
+
+
+async def _read_raw(redis_client, *command):
+    """
+    Runs a read command with response decoding disabled: payloads written by
+    a binary codec are not valid UTF-8 text.
+    """
+    return await redis_client.execute_command(*command, **{NEVER_DECODE: []})
 
 
 async def add_rule(request: Request, rule_id: str, rule_data: dict) -> bool:
@@ -18,7 +117,7 @@ async def add_rule(request: Request, rule_id: str, rule_data: dict) -> bool:
     key = f"rule:{rule_id}"
     if await redis_client.exists(key):
         return False
-    await redis_client.set(key, json.dumps(rule_data))
+    await redis_client.set(key, codec.encode(rule_data))
     await redis_client.sadd("rules", rule_id)
     return True
 
@@ -26,15 +125,15 @@ async def add_rule(request: Request, rule_id: str, rule_data: dict) -> bool:
 async def store_rule(request: Request, rule_id: str, rule_data: dict):
     """Overwrites an existing rule and adds the rule ID to the 'rules' set."""
     redis_client = request.app.state.redis_client
-    await redis_client.set(f"rule:{rule_id}", json.dumps(rule_data))
+    await redis_client.set(f"rule:{rule_id}", codec.encode(rule_data))
     await redis_client.sadd("rules", rule_id)
 
 
 async def get_rule(request: Request, rule_id: str):
     """Gets a rule by its ID. Returns None if not found."""
     redis_client = request.app.state.redis_client
-    data = await redis_client.get(f"rule:{rule_id}")
-    return json.loads(data) if data else None
+    data = await _read_raw(redis_client, "GET", f"rule:{rule_id}")
+    return codec.decode(data) if data else None
 
 
 async def get_rules(request=None):
@@ -42,19 +141,13 @@ async def get_rules(request=None):
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
     )
     rule_ids = await redis_client.smembers("rules")
-    rules = []
-    for rid in rule_ids:
-        data = await redis_client.get(f"rule:{rid}")
-        if data:
-            rules.append(json.loads(data))
-    return rules
-
-
-import json
-from fastapi import Request
+    if not rule_ids:
+        return []
+    records = await _read_raw(redis_client, "MGET", *(f"rule:{rid}" for rid in rule_ids))
+    return [codec.decode(data) for data in records if data]
 
 
 async def delete_rule(request: Request, rule_id: str) -> bool:
@@ -69,17 +162,18 @@ async def delete_rule(request: Request, rule_id: str) -> bool:
     # Delete the rule and its related keys
     await redis_client.delete(f"rule:{rule_id}")
     await redis_client.delete(f"search_results:{rule_id}")
+    await redis_client.delete(f"limit:bucket:rule:{rule_id}", f"limit:suppressed:{rule_id}")
     await redis_client.srem("rules", rule_id)
 
     # Delete associated summary_result keys from response list
     response_key = f"response:{rule_id}"
-    response_entries = await redis_client.lrange(response_key, 0, -1)
+    response_entries = await _read_raw(redis_client, "LRANGE", response_key, 0, -1)
 
     summary_keys_to_delete = []
 
     for entry in response_entries:
         try:
-            item = json.loads(entry)
+            item = codec.decode(entry)
             summary_id = item.get("summary_id")
             if summary_id:
                 summary_keys_to_delete.append(f"summary_ids:{rule_id}")
@@ -104,26 +198,50 @@ async def store_response(rule_id: str, response: dict, request=None):
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
+    )
+    await redis_client.rpush(f"response:{rule_id}", codec.encode(response))
+
+
+async def store_responses(responses: list, request=None):
+    """Appends (rule_id, response) pairs in one pipelined round trip."""
+    redis_client = (
+        getattr(request.app.state, "redis_client", None)
+        if request
+        else get_fallback_redis_client()
     )
-    await redis_client.rpush(f"response:{rule_id}", json.dumps(response))
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for rule_id, response in responses:
+            pipe.rpush(f"response:{rule_id}", codec.encode(response))
+        await pipe.execute()
 
 
 async def get_responses(request: Request, rule_id: str):
     """Retrieves all stored responses for a rule."""
     redis_client = request.app.state.redis_client
-    return await redis_client.lrange(f"response:{rule_id}", 0, -1)
+    entries = await _read_raw(redis_client, "LRANGE", f"response:{rule_id}", 0, -1)
+    return [codec.decode(entry) for entry in entries]
 
 
 # --- SUMMARY STORAGE ---
 
+# Optional fields kept on search result entries
+SEARCH_RESULT_EXTRA_FIELDS = (
+    "camera",
+    "start_time",
+    "end_time",
+    "offset_start",
+    "offset_end",
+    "keyframes",
+)
+
 
 async def save_summary_id(rule_id: str, summary_id: str, request=None):
     """Save summary ID under a rule."""
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
     )
     await redis_client.rpush(f"summary_ids:{rule_id}", summary_id)
 
@@ -134,19 +252,21 @@ async def save_search(rule_id: str, search_output: dict, request=None):
 
     Args:
         rule_id (str): ID of the rule that triggered the search
-        search_output (dict): {video_id: message}
+        search_output (dict): {video_id: message}, plus the camera, event times
+            and offsets into the uploaded video when clips were ingested in a batch,
+            or the keyframe mapping (video second -> frame) in keyframes mode
     """
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
     )
 
-    entry = json.dumps(
-        {"video_id": search_output["video_id"], "message": search_output["message"]}
-    )
-
-    await redis_client.rpush(f"search_results:{rule_id}", entry)
+    entry = {"video_id": search_output["video_id"], "message": search_output["message"]}
+    for key in SEARCH_RESULT_EXTRA_FIELDS:
+        if key in search_output:
+            entry[key] = search_output[key]
+    await redis_client.rpush(f"search_results:{rule_id}", codec.encode(entry))
 
 
 async def get_summary_ids(request: Request, rule_id: str):
@@ -160,7 +280,7 @@ async def save_summary_result(summary_id: str, summary_result: str, request=None
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
     )
     await redis_client.set(f"summary_result:{summary_id}", summary_result)
 
@@ -179,13 +299,13 @@ async def get_search_results_by_rule(rule_id: str, request=None) -> list[dict]:
     redis_client = (
         getattr(request.app.state, "redis_client", None)
         if request
-        else fallback_redis_client
+        else get_fallback_redis_client()
     )
     key = f"search_results:{rule_id}"
 
     try:
-        results = await redis_client.lrange(key, 0, -1)
-        return [json.loads(entry) for entry in results]
+        results = await _read_raw(redis_client, "LRANGE", key, 0, -1)
+        return [codec.decode(entry) for entry in results]
     except Exception as e:
         logger.error(f"Failed to fetch search results for rule {rule_id}: {e}")
         return []
@@ -195,3 +315,89 @@ async def get_summary_result(request: Request, summary_id: str):
     """Retrieve stored summary response."""
     redis_client = request.app.state.redis_client
     return await redis_client.get(f"summary_result:{summary_id}")
+
+
+async def get_summary_results(request: Request, summary_ids: list) -> dict:
+    """Retrieve stored summary responses for several IDs in one round trip."""
+    if not summary_ids:
+        return {}
+    redis_client = request.app.state.redis_client
+    values = await redis_client.mget([f"summary_result:{sid}" for sid in summary_ids])
+    return {sid: value for sid, value in zip(summary_ids, values) if value}
+
+
+async def save_summary_results(summary_results: dict, request=None):
+    """Store several summary responses in one round trip."""
+    if not summary_results:
+        return
+    redis_client = (
+        getattr(request.app.state, "redis_client", None)
+        if request
+        else get_fallback_redis_client()
+    )
+    await redis_client.mset(
+        {f"summary_result:{sid}": result for sid, result in summary_results.items()}
+    )
+
+
+# --- MATCHED EVENT INDEX ---
+# Sorted sets scored by event start time, one per camera and one per
+# camera/label pair, hold event IDs; the event records live in event:{id}.
+
+
+def _event_index_keys(camera: str, label: str) -> tuple:
+    return f"events:camera:{camera}", f"events:camera:{camera}:label:{label}"
+
+
+async def index_event(event: dict, rule_ids: list, request=None):
+    """
+    Record a matched event and the rules it matched in the time index.
+    Entries older than EVENT_INDEX_RETENTION seconds are trimmed on write.
+    """
+    redis_client = (
+        getattr(request.app.state, "redis_client", None)
+        if request
+        else get_fallback_redis_client()
+    )
+    camera = event["camera"]
+    label = event["label"]
+    start_time = float(event["start_time"])
+    event_id = event.get("id") or f"{camera}-{start_time}"
+    record = {
+        "id": event_id,
+        "camera": camera,
+        "label": label,
+        "start_time": start_time,
+        "end_time": event.get("end_time"),
+        "rule_ids": rule_ids,
+    }
+
+    cutoff = time.time() - EVENT_INDEX_RETENTION
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.set(f"event:{event_id}", codec.encode(record), ex=int(EVENT_INDEX_RETENTION))
+        for key in _event_index_keys(camera, label):
+            pipe.zadd(key, {event_id: start_time})
+            pipe.zremrangebyscore(key, "-inf", f"({cutoff}")
+        await pipe.execute()
+
+
+async def get_indexed_events(
+    request: Request,
+    camera: str,
+    start_time: float,
+    end_time: float,
+    label: str = None,
+    limit: int = EVENT_INDEX_MAX_RESULTS,
+) -> list:
+    """Matched events on a camera that started within [start_time, end_time], oldest first."""
+    redis_client = request.app.state.redis_client
+    camera_key, label_key = _event_index_keys(camera, label)
+    event_ids = await redis_client.zrangebyscore(
+        label_key if label else camera_key, start_time, end_time, start=0, num=limit
+    )
+    if not event_ids:
+        return []
+    records = await _read_raw(
+        redis_client, "MGET", *(f"event:{event_id}" for event_id in event_ids)
+    )
+    return [codec.decode(record) for record in records if record]
@@ -1,7 +1,15 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
-from service.redis_store import get_rules, store_response
-from service.dispatcher import dispatch_action
+from service.redis_store import (
+    get_rules,
+    store_responses,
+    index_event,
+    get_fallback_redis_client,
+)
+from service.action_limiter import admit
+from service.container import get_container
+from service.action_scheduler import DEFAULT_PRIORITY
+import asyncio
 import logging
 from fastapi import Request
 
@@ -17,14 +25,53 @@ async def process_event(event: dict, context: dict = None):
     rules = await get_rules()
     logger.info(f"📌 Loaded {len(rules)} rules")
 
+    matched = []
     for rule in rules:
         logger.info(f"🔁 Evaluating rule: {rule}")
         if rule["label"] == event.get("label") and (
             not rule.get("camera") or rule["camera"] == event.get("camera")
         ):
             logger.info(f"✅ Match found.")
-            event["rule_id"] = rule["id"]
-            response = await dispatch_action(rule["action"], event)
-            await store_response(rule["id"], response)
+            matched.append(rule)
         else:
             logger.info("❌ Rule did not match.")
+
+    if not matched:
+        return
+
+    try:
+        await index_event(event, [rule["id"] for rule in matched])
+    except Exception as e:
+        logger.error(f"❌ Failed to index event: {e}")
+
+    # Cooldowns and rate limits, checked atomically in Redis before queueing
+    redis_client = get_fallback_redis_client()
+    suppressed = await asyncio.gather(
+        *(admit(redis_client, rule, event) for rule in matched)
+    )
+    matched = [rule for rule, reason in zip(matched, suppressed) if reason is None]
+    if not matched:
+        return
+
+    # Fan out every matched action at once; actions on the same clip share
+    # its download (see VmsService.prepare_clip)
+    scheduler = get_container().action_scheduler
+    futures = []
+    for rule in matched:
+        rule_event = dict(
+            event, rule_id=rule["id"], search_mode=rule.get("search_mode", "clip")
+        )
+        futures.append(
+            scheduler.submit(
+                rule["action"], rule_event, rule.get("priority", DEFAULT_PRIORITY)
+            )
+        )
+
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    responses = []
+    for rule, result in zip(matched, results):
+        if isinstance(result, Exception):
+            logger.error(f"❌ Action '{rule['action']}' for rule {rule['id']} failed: {result}")
+            result = {"error": str(result)}
+        responses.append((rule["id"], result))
+    await store_responses(responses)
@@ -0,0 +1,207 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import asyncio
+import logging
+from config import SEARCH_BATCH_WINDOW, SEARCH_BATCH_SIZE, SEARCH_BATCH_MAX_RETRIES
+from service.ffmpeg_utils import concat_clips, ffmpeg_available, probe_duration
+from service.redis_store import save_search
+
+logger = logging.getLogger(__name__)
+
+
+class PendingClip:
+    """A downloaded clip waiting to be ingested for search."""
+
+    __slots__ = ("rule_id", "camera", "start_time", "end_time", "path", "attempts")
+
+    def __init__(self, rule_id, camera, start_time, end_time, path):
+        self.rule_id = rule_id
+        self.camera = camera
+        self.start_time = start_time
+        self.end_time = end_time
+        self.path = path
+        self.attempts = 0
+
+
+class SearchIngestBatcher:
+    """
+    Groups "add to search" clips per camera and ingests each group as a single
+    video: one upload and one search-embeddings call per batch instead of per
+    event. Every event is recorded in search_results:{rule_id} with its offset
+    inside the uploaded video.
+
+    A batch is flushed when it reaches max_size clips or window seconds after
+    its first clip was added, whichever comes first.
+
+    Clips that fail to ingest are not lost: they are handed to the clip spool
+    when spool_uploader is given, else queued for the camera's next batch up
+    to max_retries times.
+    """
+
+    def __init__(
+        self,
+        vms_service,
+        window: float = SEARCH_BATCH_WINDOW,
+        max_size: int = SEARCH_BATCH_SIZE,
+        max_retries: int = SEARCH_BATCH_MAX_RETRIES,
+        spool_uploader=None,
+    ):
+        self.vms_service = vms_service
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.max_retries = max_retries
+        self.spool_uploader = spool_uploader
+        self._batches = {}
+        self._timers = {}
+        self._flushes = set()
+
+    async def add(self, rule_id: str, camera: str, start_time: float, end_time: float) -> dict:
+        """Downloads the clip now and queues it for the camera's next batch."""
+        clip = await self.vms_service.prepare_clip(camera, start_time, end_time)
+        if clip["status"] != 200:
+            return clip
+
+        batch = self._queue(PendingClip(rule_id, camera, start_time, end_time, clip["message"]))
+        logger.info(
+            f"📦 Queued clip for batched search ingestion on camera {camera} "
+            f"({len(batch)}/{self.max_size})"
+        )
+        return {
+            "status": 202,
+            "message": f"Queued for batched search ingestion ({len(batch)}/{self.max_size})",
+        }
+
+    def _queue(self, clip: PendingClip, flush_when_full: bool = True) -> list:
+        batch = self._batches.setdefault(clip.camera, [])
+        batch.append(clip)
+        if flush_when_full and len(batch) >= self.max_size:
+            self._schedule_flush(clip.camera)
+        elif clip.camera not in self._timers:
+            self._timers[clip.camera] = asyncio.get_running_loop().call_later(
+                self.window, self._schedule_flush, clip.camera
+            )
+        return batch
+
+    def _schedule_flush(self, camera: str):
+        task = asyncio.get_running_loop().create_task(self.flush(camera))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def flush(self, camera: str):
+        """Uploads the camera's pending clips as one video and records per-event offsets."""
+        timer = self._timers.pop(camera, None)
+        if timer:
+            timer.cancel()
+        batch = self._batches.pop(camera, [])
+        if not batch:
+            return
+
+        logger.info(f"🚚 Flushing {len(batch)} clip(s) for camera {camera}")
+        failed = []
+        if len(batch) == 1 or not ffmpeg_available():
+            # Nothing to concatenate (or no ffmpeg): ingest clips one by one
+            for clip in batch:
+                try:
+                    await self._ingest([clip], clip.path)
+                except Exception as e:
+                    logger.error(f"❌ Search ingestion failed for a clip on camera {camera}: {e}")
+                    failed.append(clip)
+        else:
+            combined_path = None
+            try:
+                combined_path = await concat_clips([clip.path for clip in batch])
+                await self._ingest(batch, combined_path)
+            except Exception as e:
+                logger.error(f"❌ Batched search ingestion failed for camera {camera}: {e}")
+                failed = batch
+            finally:
+                if combined_path:
+                    self.vms_service.remove_file(combined_path)
+
+        kept = await self._retry_later(failed) if failed else set()
+        for clip in batch:
+            if clip.path not in kept:
+                self.vms_service.remove_file(clip.path)
+
+    async def _retry_later(self, clips: list) -> set:
+        """
+        Spools or re-queues clips that failed to ingest. Returns the paths of
+        the clips kept; the others are dropped and their files can be removed.
+        """
+        kept = set()
+        for clip in clips:
+            if self.spool_uploader is not None:
+                event = {
+                    "rule_id": clip.rule_id,
+                    "camera": clip.camera,
+                    "start_time": clip.start_time,
+                    "end_time": clip.end_time,
+                }
+                try:
+                    # Moves the clip into the spool, which retries the upload on its own
+                    await asyncio.to_thread(
+                        self.spool_uploader.spool.enqueue, clip.path, "add to search", event
+                    )
+                    self.spool_uploader.notify()
+                    continue
+                except OSError as e:
+                    logger.error(f"❌ Could not spool clip that failed ingestion: {e}")
+            clip.attempts += 1
+            if clip.attempts > self.max_retries:
+                logger.error(
+                    f"❌ Dropping clip for camera {clip.camera} "
+                    f"[{clip.start_time}, {clip.end_time}] after {clip.attempts} failed ingestions"
+                )
+                continue
+            # Waits for the window, so a failing upstream is not retried in a loop
+            self._queue(clip, flush_when_full=False)
+            kept.add(clip.path)
+            logger.info(
+                f"🔁 Re-queued clip for camera {clip.camera} (attempt {clip.attempts}/{self.max_retries})"
+            )
+        return kept
+
+    async def _ingest(self, batch: list, video_path: str):
+        offsets = []
+        cursor = 0.0
+        for clip in batch:
+            duration = await probe_duration(clip.path)
+            if duration is None:
+                duration = clip.end_time - clip.start_time
+            offsets.append((cursor, cursor + duration))
+            cursor += duration
+
+        upload = await asyncio.to_thread(
+            self.vms_service.upload_clip, video_path, True, batch[0].camera
+        )
+        if upload["status"] != 200:
+            raise RuntimeError(upload["message"])
+        output = await asyncio.to_thread(
+            self.vms_service.request_search_embeddings, upload["message"]
+        )
+        if output["status"] != 200:
+            raise RuntimeError(output["message"])
+
+        for clip, (offset_start, offset_end) in zip(batch, offsets):
+            await save_search(
+                clip.rule_id,
+                {
+                    "video_id": output["video_id"],
+                    "message": output["message"],
+                    "camera": clip.camera,
+                    "start_time": clip.start_time,
+                    "end_time": clip.end_time,
+                    "offset_start": round(offset_start, 3),
+                    "offset_end": round(offset_end, 3),
+                },
+            )
+        logger.info(
+            f"✅ Ingested {len(batch)} clip(s) as video {output['video_id']} for search"
+        )
+
+    async def flush_all(self):
+        """Flushes every pending batch, e.g. on shutdown."""
+        for camera in list(self._batches):
+            await self.flush(camera)
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
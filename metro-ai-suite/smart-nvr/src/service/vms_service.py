@@ -1,19 +1,25 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
+import asyncio
 import requests
 import os
 import tempfile
+import shutil
 import subprocess
 import aiofiles
 import logging
 from pathlib import Path
 from typing import Optional
 from fastapi import HTTPException
-from api.endpoints.frigate_api import FrigateService
 from model.model import Sampling, Evam, SummaryPayload
-from api.endpoints.summarization_api import SummarizationService
+from service.clip_preprocessor import ClipPreprocessor
+from service.ffmpeg_utils import ffmpeg_available, images_to_video
+from service.circuit_breaker import CircuitOpenError, get_breaker, upstream_for_url
 from config import VSS_SUMMARY_URL
 from config import VSS_SEARCH_URL
+from config import UPSTREAM_TIMEOUT
+from config import SUMMARY_BATCH_CONCURRENCY, SHARED_CLIP_TTL
+from config import KEYFRAME_INTERVAL, KEYFRAME_MAX_FRAMES, KEYFRAME_HEIGHT
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -22,25 +28,58 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
 )
 
-frigate_service = FrigateService()
-summarization_service = SummarizationService()
+SUMMARY_PENDING_MESSAGE = "Final summary is being generated please wait for a while."
+
+
+def is_final_summary(result: dict) -> bool:
+    """True once VSS returned the final summary rather than per-frame progress."""
+    return (
+        bool(result.get("summary"))
+        and "frameSummaries" not in result
+        and result["summary"] != SUMMARY_PENDING_MESSAGE
+    )
+
+
+def _private_copy(path: str) -> str:
+    """A new temp file with the same content, hard-linked when possible."""
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(path)[1], delete=False) as tmp_file:
+        copy_path = tmp_file.name
+    try:
+        os.remove(copy_path)
+        os.link(path, copy_path)
+    except OSError:
+        shutil.copyfile(path, copy_path)
+    return copy_path
+
+
+def _prepared_path(task: asyncio.Future) -> Optional[str]:
+    """Path of a successfully prepared shared clip, else None."""
+    if not task.done() or task.cancelled() or task.exception():
+        return None
+    clip = task.result()
+    return clip["message"] if clip["status"] == 200 else None
 
 
 class VmsService:
-    def __init__(self, frigate_service, summarization_service):
+    def __init__(self, frigate_service, summarization_service, clip_preprocessor=None):
         self.frigate_service = frigate_service
         self.summarization_service = summarization_service
+        self.clip_preprocessor = clip_preprocessor or ClipPreprocessor(frigate_service)
         self.vss_summary_url: str = VSS_SUMMARY_URL
         self.vss_search_url: str = VSS_SEARCH_URL
+        # event loop -> {(camera, start, end): shared prepared clip}
+        self._shared_clips = {}
         logger.info("VmsService initialized.")
 
-    async def upload_video_to_summarizer(
-        self, camera_name: str, start_time: float, end_time: float, is_search: bool
+    async def download_clip(
+        self, camera_name: str, start_time: float, end_time: float
     ) -> dict:
-        """Fetches clip from Frigate, writes to temp file, uploads it, and returns videoId."""
+        """Fetches clip from Frigate and writes it to a temp file. Returns the file path on success."""
         try:
-            stream_response = self.frigate_service.get_clip_from_timestamps(
-                camera_name, start_time, end_time, download=True
+            # Off the event loop: waits for a free request slot on the instance
+            stream_response = await asyncio.to_thread(
+                self.frigate_service.get_clip_from_timestamps,
+                camera_name, start_time, end_time, True,
             )
             logger.info("Clip retrieved from Frigate.")
         except Exception as e:
@@ -78,19 +117,121 @@ class VmsService:
             )
         except Exception as e:
             logger.error(f"Failed to process video stream: {e}")
+            self.remove_file(tmp_path)
             return {"status": 500, "message": "Failed to process video stream"}
+        finally:
+            # Closes the upstream stream and frees its Frigate request slot,
+            # also when writing failed before the first chunk
+            if stream_response.background is not None:
+                await stream_response.background()
 
-        # Upload file
+        return {"status": 200, "message": tmp_path}
+
+    async def prepare_clip(
+        self, camera_name: str, start_time: float, end_time: float
+    ) -> dict:
+        """
+        Downloads and preprocesses a clip. Returns the path of a temp file owned by the caller.
+
+        Actions on the same clip (e.g. a "summarize" and an "add to search" rule
+        matching one event) share a single download: the prepared clip is kept
+        for SHARED_CLIP_TTL seconds after its last use and every caller gets
+        its own hard link (or copy) of it.
+        """
+        shared = self._shared_clips.setdefault(asyncio.get_running_loop(), {})
+        key = (camera_name, start_time, end_time)
+        entry = shared.get(key)
+        if entry is None:
+            entry = shared[key] = {
+                "task": asyncio.ensure_future(
+                    self._download_and_process(camera_name, start_time, end_time)
+                ),
+                "users": 0,
+                "expiry": None,
+            }
+            entry["task"].add_done_callback(
+                lambda task, entry=entry: self._remove_orphaned_clip(shared, key, entry)
+            )
+        elif entry["expiry"]:
+            entry["expiry"].cancel()
+            entry["expiry"] = None
+            logger.info(f"♻️ Reusing prepared clip for {camera_name} [{start_time}, {end_time}]")
+
+        entry["users"] += 1
         try:
-            if is_search:
-                upload_result = self.summarization_service.video_upload(
-                    tmp_path, self.vss_search_url
-                )
-            else:
-                upload_result = self.summarization_service.video_upload(
-                    tmp_path, self.vss_summary_url
+            clip = await asyncio.shield(entry["task"])
+            if clip["status"] != 200:
+                return clip
+            return {"status": 200, "message": await asyncio.to_thread(_private_copy, clip["message"])}
+        finally:
+            entry["users"] -= 1
+            if entry["users"] == 0:
+                # Failures are not cached so a later retry downloads again
+                delay = SHARED_CLIP_TTL if _prepared_path(entry["task"]) else 0
+                entry["expiry"] = asyncio.get_running_loop().call_later(
+                    delay, self._release_shared_clip, shared, key, entry
                 )
 
+    def _remove_orphaned_clip(self, shared: dict, key: tuple, entry: dict):
+        """
+        Runs when the download finishes. If every caller gave up (e.g. was
+        cancelled) before that, the entry is already released and nobody
+        else will remove the prepared file.
+        """
+        if shared.get(key) is entry:
+            return
+        path = _prepared_path(entry["task"])
+        if path:
+            self.remove_file(path)
+
+    def _release_shared_clip(self, shared: dict, key: tuple, entry: dict):
+        if shared.get(key) is not entry or entry["users"]:
+            return
+        del shared[key]
+        path = _prepared_path(entry["task"])
+        if path:
+            self.remove_file(path)
+
+    async def _download_and_process(
+        self, camera_name: str, start_time: float, end_time: float
+    ) -> dict:
+        clip = await self.download_clip(camera_name, start_time, end_time)
+        if clip["status"] != 200:
+            return clip
+
+        processed_path = await self.clip_preprocessor.process(
+            clip["message"], camera_name, start_time, end_time
+        )
+        if processed_path != clip["message"]:
+            self.remove_file(clip["message"])
+        return {"status": 200, "message": processed_path}
+
+    async def upload_video_to_summarizer(
+        self, camera_name: str, start_time: float, end_time: float, is_search: bool
+    ) -> dict:
+        """Fetches clip from Frigate, preprocesses it, uploads it, and returns videoId."""
+        clip = await self.prepare_clip(camera_name, start_time, end_time)
+        if clip["status"] != 200:
+            return clip
+
+        try:
+            # The upload may wait on the bandwidth limiter; keep it off the loop
+            return await asyncio.to_thread(
+                self.upload_clip, clip["message"], is_search, camera_name
+            )
+        finally:
+            self.remove_file(clip["message"])
+
+    def upload_clip(
+        self, clip_path: str, is_search: bool, camera_name: Optional[str] = None
+    ) -> dict:
+        """Uploads a local clip to the VSS search or summary service and returns videoId."""
+        try:
+            base_url = self.vss_search_url if is_search else self.vss_summary_url
+            upload_result = self.summarization_service.video_upload(
+                clip_path, base_url, camera=camera_name
+            )
+
             if not upload_result or "videoId" not in upload_result:
                 return {
                     "status": 500,
@@ -99,16 +240,21 @@ class VmsService:
 
             logger.info(f"Video uploaded, videoId: {upload_result.get('videoId')}")
             return {"status": 200, "message": upload_result["videoId"]}
+        except HTTPException as e:
+            logger.error(f"Video upload failed: {e.detail}")
+            return {"status": e.status_code, "message": "Video upload failed"}
         except Exception as e:
             logger.error(f"Video upload failed: {e}")
             return {"status": 500, "message": "Video upload failed"}
-        finally:
-            try:
-                if os.path.exists(tmp_path):
-                    logger.info(f"Cleaning up temporary file: {tmp_path}")
-                    os.remove(tmp_path)
-            except Exception as e:
-                logger.warning(f"Failed to remove temporary file: {e}")
+
+    @staticmethod
+    def remove_file(path: str):
+        try:
+            if os.path.exists(path):
+                logger.info(f"Cleaning up temporary file: {path}")
+                os.remove(path)
+        except Exception as e:
+            logger.warning(f"Failed to remove temporary file: {e}")
 
     async def summarize(
         self, camera_name: str, start_time: float, end_time: float
@@ -124,9 +270,17 @@ class VmsService:
         if upload_resp["status"] != 200:
             return upload_resp
 
+        return self.create_summary_pipeline(
+            upload_resp["message"], camera_name, start_time
+        )
+
+    def create_summary_pipeline(
+        self, video_id: str, camera_name: str, start_time: float
+    ) -> dict:
+        """Starts summarization of an uploaded video. Returns the summary pipeline ID."""
         try:
             payload = SummaryPayload(
-                videoId=upload_resp["message"],
+                videoId=video_id,
                 title=f"summary_{camera_name}_{int(start_time)}",
                 sampling=Sampling(chunkDuration=8, samplingFrame=8),
                 evam=Evam(evamPipeline="object_detection"),
@@ -145,6 +299,9 @@ class VmsService:
                 f"Summary pipeline created with ID: {pipeline.get('summaryPipelineId')}"
             )
             return {"status": 200, "message": pipeline["summaryPipelineId"]}
+        except HTTPException as e:
+            logger.error(f"Failed to create summary: {e.detail}")
+            return {"status": e.status_code, "message": "Failed to create video summary"}
         except Exception as e:
             logger.error(f"Failed to create summary: {e}")
             return {"status": 500, "message": "Failed to create video summary"}
@@ -152,7 +309,7 @@ class VmsService:
     def summary(self, summary_id: str):
         logger.info(f"Fetching summary result for ID: {summary_id}")
         try:
-            result = summarization_service.get_summary_result(
+            result = self.summarization_service.get_summary_result(
                 summary_id, self.vss_summary_url
             )
         except Exception as e:
@@ -181,13 +338,33 @@ class VmsService:
                 )
 
             return {
-                "summary": "Final summary is being generated please wait for a while.",
+                "summary": SUMMARY_PENDING_MESSAGE,
                 "frameSummaries": simplified_frame_summaries,
             }
 
         logger.info("Summary retrieved successfully.")
         return {"summary": video_summary}
 
+    async def summaries(self, summary_ids: list) -> dict:
+        """
+        Fetch several summaries from VSS concurrently, at most
+        SUMMARY_BATCH_CONCURRENCY at a time. Failed lookups map to
+        {"error": ..., "status": HTTP status code}.
+        """
+        semaphore = asyncio.Semaphore(SUMMARY_BATCH_CONCURRENCY)
+
+        async def fetch(summary_id: str) -> dict:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.summary, summary_id)
+                except HTTPException as e:
+                    return {"error": e.detail, "status": e.status_code}
+                except Exception as e:
+                    return {"error": str(e), "status": 500}
+
+        results = await asyncio.gather(*(fetch(sid) for sid in summary_ids))
+        return dict(zip(summary_ids, results))
+
     async def search_embeddings(
         self, camera_name: str, start_time: float, end_time: float
     ) -> dict:
@@ -212,19 +389,129 @@ class VmsService:
             logger.error(f"Failed to upload video for embedding search: {e}")
             raise
 
-        url = f"{self.vss_search_url}/manager/videos/search-embeddings/{upload_resp['message']}"
+        return self.request_search_embeddings(upload_resp["message"])
+
+    @staticmethod
+    def keyframe_times(
+        start_time: float,
+        end_time: float,
+        interval: float = KEYFRAME_INTERVAL,
+        max_frames: int = KEYFRAME_MAX_FRAMES,
+    ) -> list:
+        """Evenly spaced frame timestamps within the event, at most max_frames."""
+        if max_frames <= 0 or end_time <= start_time:
+            return []
+        count = min(max_frames, int((end_time - start_time) // interval) + 1)
+        step = (end_time - start_time) / count
+        return [round(start_time + step * (i + 0.5), 3) for i in range(count)]
+
+    async def fetch_keyframes(
+        self, event_id: Optional[str], camera_name: str, start_time: float, end_time: float
+    ) -> list:
+        """
+        Downloads the event's best snapshot (first, it has no exact timestamp)
+        and periodic recording frames into temp files owned by the caller.
+        Returns [{"path", "timestamp", "source"}]; frames Frigate cannot serve
+        are skipped.
+        """
+        jobs = []
+        if event_id:
+            jobs.append(
+                ("snapshot", None, ".jpg",
+                 self.frigate_service.get_event_snapshot, (event_id, KEYFRAME_HEIGHT, camera_name))
+            )
+        max_frames = KEYFRAME_MAX_FRAMES - len(jobs)
+        for ts in self.keyframe_times(start_time, end_time, max_frames=max_frames):
+            jobs.append(
+                ("recording", ts, ".png",
+                 self.frigate_service.get_recording_frame, (camera_name, ts))
+            )
+
+        images = await asyncio.gather(
+            *(asyncio.to_thread(fetch, *args) for *_, fetch, args in jobs),
+            return_exceptions=True,
+        )
+
+        frames = []
+        for (source, ts, suffix, _, _), image in zip(jobs, images):
+            if isinstance(image, Exception) or not image:
+                logger.warning(f"Skipping {source} keyframe at {ts}: {image}")
+                continue
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_file:
+                tmp_file.write(image)
+            frames.append({"path": tmp_file.name, "timestamp": ts, "source": source})
+        return frames
+
+    async def search_keyframes(
+        self,
+        camera_name: str,
+        start_time: float,
+        end_time: float,
+        event_id: Optional[str] = None,
+    ) -> dict:
+        """
+        Indexes a handful of keyframes instead of the whole clip: the frames are
+        encoded as a 1 fps video (one second per frame), uploaded and embedded.
+        The result maps each second of that video back to its frame.
+        """
+        if not ffmpeg_available():
+            logger.warning("ffmpeg not found, indexing the whole clip instead of keyframes")
+            return await self.search_embeddings(camera_name, start_time, end_time)
+
+        frames = await self.fetch_keyframes(event_id, camera_name, start_time, end_time)
+        if not frames:
+            logger.warning("No keyframes available, indexing the whole clip instead")
+            return await self.search_embeddings(camera_name, start_time, end_time)
+
+        video_path = None
+        try:
+            video_path = await images_to_video(
+                [frame["path"] for frame in frames], KEYFRAME_HEIGHT
+            )
+            upload_resp = await asyncio.to_thread(
+                self.upload_clip, video_path, True, camera_name
+            )
+            if upload_resp["status"] != 200:
+                return upload_resp
+            output = await asyncio.to_thread(
+                self.request_search_embeddings, upload_resp["message"]
+            )
+        finally:
+            for frame in frames:
+                self.remove_file(frame["path"])
+            if video_path:
+                self.remove_file(video_path)
+
+        if output["status"] == 200:
+            output["keyframes"] = [
+                {"offset": offset, "timestamp": frame["timestamp"], "source": frame["source"]}
+                for offset, frame in enumerate(frames)
+            ]
+            logger.info(
+                f"Indexed {len(frames)} keyframe(s) for camera {camera_name} "
+                f"as video {output['video_id']}"
+            )
+        return output
+
+    def request_search_embeddings(self, video_id: str) -> dict:
+        """Triggers embedding generation for an uploaded video on the search service."""
+        url = f"{self.vss_search_url}/manager/videos/search-embeddings/{video_id}"
         logger.info(f"Calling search-embeddings API: {url}")
 
         try:
-            response = requests.post(url)
-            response.raise_for_status()
+            with get_breaker(upstream_for_url(self.vss_search_url)).guard():
+                response = requests.post(url, timeout=UPSTREAM_TIMEOUT)
+                response.raise_for_status()
             message = response.json().get("message", "No message in response.")
             logger.info(f"Embedding search response: {message}")
             return {
                 "status": 200,
-                "video_id": upload_resp["message"],
+                "video_id": video_id,
                 "message": message,
             }
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping search-embeddings call: {e}")
+            return {"status": 503, "message": str(e)}
         except requests.RequestException as e:
             logger.error(f"Search embeddings API failed: {e}")
             raise
@@ -0,0 +1,5 @@
+# Backend modules import each other from the src folder (e.g. `from config import ...`)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
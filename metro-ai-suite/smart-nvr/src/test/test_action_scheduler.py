@@ -0,0 +1,103 @@
+# test/test_action_scheduler.py
+
+import asyncio
+from types import SimpleNamespace
+
+import requests
+
+from service import circuit_breaker, dispatcher
+from service.action_scheduler import ActionScheduler
+from service.circuit_breaker import CircuitBreaker, OPEN, HALF_OPEN, CLOSED, VSS_SEARCH
+
+EVENT = {"camera": "front", "start_time": 0, "end_time": 10, "rule_id": "r1"}
+
+
+def install_breaker(monkeypatch, breaker):
+    monkeypatch.setitem(circuit_breaker._breakers, VSS_SEARCH, breaker)
+    container = SimpleNamespace(
+        frigate_service=SimpleNamespace(upstreams_for_camera=lambda camera: [])
+    )
+    monkeypatch.setattr(dispatcher, "get_container", lambda: container)
+    monkeypatch.setitem(dispatcher.ACTION_UPSTREAMS, "add to search", (VSS_SEARCH,))
+
+
+def open_breaker(reset_timeout):
+    breaker = CircuitBreaker(
+        VSS_SEARCH, failure_threshold=1, reset_timeout=reset_timeout, half_open_probes=1
+    )
+    breaker.record_failure()
+    return breaker
+
+
+def run_one(breaker, priority="normal"):
+    async def handler(action, event):
+        with breaker.guard():
+            return {"status": 200}
+
+    async def main():
+        scheduler = ActionScheduler(
+            handler,
+            workers=1,
+            camera_weights={},
+            admission=dispatcher.shed_policy,
+            defer_seconds=60,
+            max_defers=3,
+        )
+        try:
+            future = scheduler.submit("add to search", EVENT, priority)
+            await asyncio.sleep(0.05)
+            return future, scheduler.stats()
+        finally:
+            await scheduler.stop()
+
+    return asyncio.run(main())
+
+
+def test_normal_action_is_deferred_while_circuit_open(monkeypatch):
+    breaker = open_breaker(reset_timeout=60)
+    install_breaker(monkeypatch, breaker)
+
+    future, stats = run_one(breaker)
+
+    assert not future.done()
+    assert stats["deferred"] == 1
+    assert breaker.state == OPEN
+
+
+def test_normal_action_closes_half_open_circuit(monkeypatch):
+    breaker = open_breaker(reset_timeout=0)
+    install_breaker(monkeypatch, breaker)
+    assert breaker.state == HALF_OPEN
+
+    future, stats = run_one(breaker)
+
+    assert future.result() == {"status": 200}
+    assert stats["deferred"] == 0
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_circuit(monkeypatch):
+    breaker = open_breaker(reset_timeout=0)
+    install_breaker(monkeypatch, breaker)
+    assert breaker.state == HALF_OPEN
+    breaker.reset_timeout = 60
+
+    async def handler(action, event):
+        with breaker.guard():
+            raise requests.exceptions.ConnectionError("down")
+
+    async def main():
+        scheduler = ActionScheduler(
+            handler, workers=1, camera_weights={}, admission=dispatcher.shed_policy
+        )
+        try:
+            future = scheduler.submit("add to search", EVENT, "low")
+            await asyncio.sleep(0.05)
+            return future
+        finally:
+            await scheduler.stop()
+
+    future = asyncio.run(main())
+
+    assert isinstance(future.exception(), requests.exceptions.ConnectionError)
+    assert breaker.state == OPEN
@@ -16,3 +16,21 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(), logging.FileHandler("vms_event_router_ui.log")],
 )
 logger = logging.getLogger("VMS_UI")
+
+# Shared HTTP client towards the router: connection pool and per-endpoint cache TTLs (seconds)
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+API_CACHE_TTL = {
+    "cameras": float(os.getenv("API_CACHE_TTL_CAMERAS", "60")),
+    "events": float(os.getenv("API_CACHE_TTL_EVENTS", "5")),
+    "rules": float(os.getenv("API_CACHE_TTL_RULES", "5")),
+    "rule_responses": float(os.getenv("API_CACHE_TTL_RULE_RESPONSES", "5")),
+    "search_responses": float(os.getenv("API_CACHE_TTL_SEARCH_RESPONSES", "5")),
+    "summary_status": float(os.getenv("API_CACHE_TTL_SUMMARY_STATUS", "2")),
+}
+
+# Central summary-status poller
+SUMMARY_POLL_INTERVAL = float(os.getenv("SUMMARY_POLL_INTERVAL", "5"))
+SUMMARY_POLL_MAX_INTERVAL = float(os.getenv("SUMMARY_POLL_MAX_INTERVAL", "60"))
+SUMMARY_POLL_BATCH_SIZE = int(os.getenv("SUMMARY_POLL_BATCH_SIZE", "20"))
+# How long finished summaries stay in the shared state store
+SUMMARY_POLL_RETENTION = float(os.getenv("SUMMARY_POLL_RETENTION", "3600"))
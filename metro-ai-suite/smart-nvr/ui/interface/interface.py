@@ -15,10 +15,11 @@ from services.api_client import (
     fetch_rules,
     delete_rule_by_id,
     fetch_search_responses,
-    fetch_summary_status,
+    fetch_summary_statuses,
 )
 from services.video_processor import process_video
-from services.event_utils import display_events
+from services.event_utils import EventTableModel
+from services.summary_poller import FAILED, SummaryStatusPoller
 from config import logger
 import json
 
@@ -46,6 +47,7 @@ def stop_event_updates():
         stop_event_thread.set()
         event_update_thread.join(timeout=2)
         logger.info("Event update thread stopped.")
+    summary_poller.stop()
 
 
 def cleanup_temp_files():
@@ -102,60 +104,31 @@ def render_rule_rows(rules, response_output):
     return rule_column
 
 
-polling_threads = {}
+# One background poller for every summary in flight; Gradio callbacks only read its state
+summary_poller = SummaryStatusPoller(fetch_many=fetch_summary_statuses)
 
+# Formatted event rows kept between refreshes, per camera
+event_table = EventTableModel()
 
-def poll_summary_status(summary_id, status_output, stop_event):
-    while not stop_event.is_set():
-        try:
-            raw_response = fetch_summary_status(summary_id)
-            logger.info(f"raw_response : {raw_response}")
-            if isinstance(raw_response, str):
-                if not raw_response.strip():
-                    logger.warning(f"Empty response for summary_id={summary_id}")
-                    raise ValueError(
-                        "Empty response received from fetch_summary_status."
-                    )
-                logger.info(f"raw_response : {raw_response}")
-                response = json.loads(raw_response)
-            elif isinstance(raw_response, dict):
-                response = raw_response
-            else:
-                raise ValueError(f"Invalid response type: {type(raw_response)}")
-
-            status = response.get("status", "unknown")
-            logger.info(f"Polled summary {summary_id} status: {status}")
-
-            # Format response as markdown
-            markdown_output = f"## Summary Status (Auto-Polling)\n\n"
-            markdown_output += f"**Summary ID:** `{summary_id}`\n\n"
-            for key, value in response.items():
-                if key == "status":
-                    status_emoji = (
-                        "✅"
-                        if value == "completed"
-                        else "❌" if value == "failed" else "⏳"
-                    )
-                    markdown_output += f"**Status:** {status_emoji} {value}\n\n"
-                else:
-                    markdown_output += (
-                        f"**{key.replace('_', ' ').title()}:** {value}\n\n"
-                    )
-
-            # Safely update the status_output (Gradio Markdown)
-            logger.info(f"status_output : {status_output} and markdown_output {markdown_output}")
-            status_output=markdown_output
-
-            if status in ("completed", "failed"):
-                break
 
-        except Exception as e:
-            logger.error(f"Error polling summary status: {e}", exc_info=True)
-            error_markdown = f"## Error\n\n❌ **Error fetching status:** {str(e)}"
-            status_output =error_markdown
-            break
+def format_summary_status(summary_id, entry):
+    """Render a poller entry as markdown. Returns (markdown, error message or None)."""
+    if entry["response"] is None or entry["state"] == FAILED:
+        if entry["error"]:
+            return (
+                f"## Error\n\n❌ **Error fetching status:** {entry['error']}",
+                entry["error"],
+            )
+        return (
+            f"## Summary Status\n\n**Summary ID:** `{summary_id}`\n\n⏳ Waiting for status...",
+            None,
+        )
 
-        time.sleep(10)
+    markdown_output = f"## Summary Status\n\n"
+    markdown_output += f"**Summary ID:** `{summary_id}`\n\n"
+    for key, value in entry["response"].items():
+        markdown_output += f"**{key.replace('_', ' ').title()}:** {value}\n\n"
+    return markdown_output, None
 
 
 def extract_summary_id(raw_id):
@@ -174,17 +147,7 @@ def process_and_poll(camera, start, duration, action, status_output):
     summary_id = extract_summary_id(raw_id)
 
     if result["status"] == "success" and summary_id:
-        if summary_id in polling_threads:
-            polling_threads[summary_id]["stop"].set()
-
-        stop_event = threading.Event()
-        thread = threading.Thread(
-            target=poll_summary_status,
-            args=(summary_id, status_output, stop_event),
-            daemon=True,
-        )
-        thread.start()
-        polling_threads[summary_id] = {"thread": thread, "stop": stop_event}
+        summary_poller.track(summary_id)
 
     return result
 def wrapper_fn(
@@ -294,38 +257,26 @@ def refresh_summary_status(summary_id):
     if not summary_id:
         return "", gr.update(visible=False), gr.update(visible=False)
 
-    try:
-        response = fetch_summary_status(summary_id)
-        if isinstance(response, dict):
-            # Hide toast and return formatted markdown
-            markdown_output = f"## Summary Status\n\n"
-            markdown_output += f"**Summary ID:** `{summary_id}`\n\n"
-            for key, value in response.items():
-                markdown_output += f"**{key.replace('_', ' ').title()}:** {value}\n\n"
-            return markdown_output, gr.update(visible=False), gr.update(visible=False)
-        else:
-            return f"## Summary Status\n\n```json\n{json.dumps(response, indent=2)}\n```", gr.update(visible=False), gr.update(visible=False)
-
-    except Exception as e:
-        return f"## Error\n\n❌ **Error fetching status:** {str(e)}", gr.update(visible=True), gr.update(visible=True)
+    markdown_output, error = format_summary_status(
+        summary_id, summary_poller.poll_now(summary_id)
+    )
+    return markdown_output, gr.update(visible=bool(error)), gr.update(visible=bool(error))
 
 def auto_refresh_summary_status(summary_id):
     if not summary_id:
         return "", gr.update(visible=False), gr.update(visible=False)
 
-    try:
-        response = fetch_summary_status(summary_id)
-        if isinstance(response, dict):
-            markdown_output = f"## Summary Status\n\n"
-            markdown_output += f"**Summary ID:** `{summary_id}`\n\n"
-            for key, value in response.items():
-                markdown_output += f"**{key.replace('_', ' ').title()}:** {value}\n\n"
-            # Hide toast on success
-            return markdown_output, gr.update(visible=False), gr.update(visible=False)
-        else:
-            return f"## Summary Status\n\n```json\n{json.dumps(response, indent=2)}\n```", gr.update(visible=False), gr.update(visible=False)
-    except Exception as e:
-        return f"## Error\n\n❌ **Error fetching status:** {str(e)}", f"❌ Error: {str(e)}", gr.update(visible=True)
+    entry = summary_poller.get(summary_id)
+    if entry is None:
+        # e.g. the UI was restarted while a summary was in flight
+        summary_poller.track(summary_id)
+        return gr.update(), gr.update(), gr.update()
+
+    markdown_output, error = format_summary_status(summary_id, entry)
+    if error:
+        return markdown_output, gr.update(value=f"❌ Error: {error}", visible=True), gr.update(visible=True)
+    # Hide toast on success
+    return markdown_output, gr.update(visible=False), gr.update(visible=False)
 
 def create_ui():
     show_genai_tab = os.getenv("NVR_GENAI", "false").lower() == "true"
@@ -526,7 +477,7 @@ def create_ui():
                     def fetch_and_display_events(camera):
                         nonlocal recent_events
                         recent_events = fetch_events(camera)
-                        return display_events(recent_events)
+                        return event_table.update(camera, recent_events)
 
                     cam_dropdown_view.change(
                         fn=fetch_and_display_events,
@@ -560,6 +511,12 @@ def create_ui():
                         value="Summarize",
                         label="Select Action",
                     )
+
+                    priority_dropdown = gr.Dropdown(
+                        choices=["High", "Normal", "Low"],
+                        value="Normal",
+                        label="Priority",
+                    )
                     add_rule_btn = gr.Button("➕ Add Rule")
 
                 # 🔄 Trigger label load when dropdown loads (first time)
@@ -593,8 +550,8 @@ def create_ui():
 
                 # 🚀 Show alert on rule add
                 # 🔘 Combined logic: show message, sleep, hide
-                def add_rule_with_auto_hide(camera, label, action):
-                    resp = add_rule(camera, label, action)
+                def add_rule_with_auto_hide(camera, label, action, priority):
+                    resp = add_rule(camera, label, action, priority)
                     message = (
                         resp.get("message") if isinstance(resp, dict) else str(resp)
                     )
@@ -610,7 +567,12 @@ def create_ui():
 
                 add_rule_btn.click(
                     fn=add_rule_with_auto_hide,
-                    inputs=[camera_dropdown, label_filter, action_dropdown_auto],
+                    inputs=[
+                        camera_dropdown,
+                        label_filter,
+                        action_dropdown_auto,
+                        priority_dropdown,
+                    ],
                     outputs=[add_rule_alert],
                 )
 
@@ -625,8 +587,8 @@ def create_ui():
                 gr.Markdown("### Current Rules")
                 delete_status = gr.Textbox(label="Deletion Status", visible=False)
                 rules_table = gr.Dataframe(
-                    headers=["ID", "Camera", "Label", "Action", "Delete"],
-                    datatype=["str", "str", "str", "str", "str"],
+                    headers=["ID", "Camera", "Label", "Action", "Priority", "Delete"],
+                    datatype=["str", "str", "str", "str", "str", "str"],
                     interactive=False,
                 )
                 refresh_rules_btn = gr.Button("🔄 Refresh Rules")
@@ -634,7 +596,14 @@ def create_ui():
                 def load_rules():
                     rules = fetch_rules()
                     return [
-                        [r["id"], r["camera"], r["label"], r["action"], "🗑️ Delete"]
+                        [
+                            r["id"],
+                            r["camera"],
+                            r["label"],
+                            r["action"],
+                            r.get("priority", "normal"),
+                            "🗑️ Delete",
+                        ]
                         for r in rules
                     ]
 
@@ -1,18 +1,23 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
 import time
-from ui.config import API_BASE_URL, logger
+from ui.config import API_BASE_URL, API_POOL_SIZE, API_CACHE_TTL, logger
+from ui.services.http_client import CachedHttpClient
 import uuid
 import hashlib
-import requests
 from typing import List, Dict, Optional
 
+# Shared by all UI sessions: pooled connections, TTL cache and request coalescing
+http = CachedHttpClient(API_BASE_URL, pool_size=API_POOL_SIZE)
+
+
+def _sort_events(events: list) -> list:
+    return sorted(events, key=lambda x: x.get("start_time", 0), reverse=True)
+
 
 def fetch_cameras() -> Dict[str, List[str]]:
     try:
-        response = requests.get(f"{API_BASE_URL}/cameras", timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return http.get_json("/cameras", ttl=API_CACHE_TTL["cameras"], timeout=10)
     except Exception as e:
         logger.error(f"Error fetching cameras: {e}")
         return {}
@@ -20,26 +25,26 @@ def fetch_cameras() -> Dict[str, List[str]]:
 
 def fetch_events(camera_name):
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/events", params={"camera": camera_name}, timeout=15
+        return http.get_json(
+            "/events",
+            params={"camera": camera_name},
+            ttl=API_CACHE_TTL["events"],
+            timeout=15,
+            transform=_sort_events,
         )
-        response.raise_for_status()
-        events = response.json()
-        events.sort(key=lambda x: x.get("start_time", 0), reverse=True)
-        return events
     except Exception as e:
         logger.error(f"Error fetching events: {e}")
         return []
 
 
-def add_rule(camera: str, label: str, action: str) -> Dict:
+def add_rule(camera: str, label: str, action: str, priority: str = "normal") -> Dict:
     # Create a consistent rule ID based on camera, label, and action
     rule_content = f"{camera}-{label}-{action.lower()}"
     hash = hashlib.md5(rule_content.encode(), usedforsecurity=False).hexdigest()[:8]  # 8-char hash
     rule_id = camera + "-" + label + "-" + action + "-" + hash
     # First check if rule already exists
     try:
-        check_response = requests.get(f"{API_BASE_URL}/rules/{rule_id}")
+        check_response = http.session.get(http.url(f"/rules/{rule_id}"))
         if check_response.status_code == 200:
             return {
                 "status": "exists",
@@ -55,11 +60,13 @@ def add_rule(camera: str, label: str, action: str) -> Dict:
         "camera": camera,
         "label": label,
         "action": action.lower(),
+        "priority": priority.lower(),
     }
 
     try:
-        response = requests.post(f"{API_BASE_URL}/rules/", json=payload)
+        response = http.session.post(http.url("/rules/"), json=payload)
         response.raise_for_status()
+        http.invalidate("/rules")
         return {
             "status": "success",
             "message": f"Rule {rule_id} added successfully.",
@@ -71,9 +78,7 @@ def add_rule(camera: str, label: str, action: str) -> Dict:
 
 def fetch_rules() -> List[dict]:
     try:
-        response = requests.get(f"{API_BASE_URL}/rules/")
-        response.raise_for_status()
-        return response.json()  # ✅ Return list of rule dicts
+        return http.get_json("/rules/", ttl=API_CACHE_TTL["rules"])  # ✅ Return list of rule dicts
     except Exception as e:
         logger.error(f"Error fetching rules: {e}")
         return []
@@ -81,10 +86,7 @@ def fetch_rules() -> List[dict]:
 
 def fetch_rule_responses() -> Dict:
     try:
-        response = requests.get(f"{API_BASE_URL}/rules/responses/")
-        print(response)
-        response.raise_for_status()
-        return response.json()
+        return http.get_json("/rules/responses/", ttl=API_CACHE_TTL["rule_responses"])
     except Exception as e:
         logger.error(f"Error fetching rule responses: {e}")
         return {"error": str(e)}
@@ -92,8 +94,9 @@ def fetch_rule_responses() -> Dict:
 
 def delete_rule_by_id(rule_id: str) -> str:
     try:
-        response = requests.delete(f"{API_BASE_URL}/rules/{rule_id}")
+        response = http.session.delete(http.url(f"/rules/{rule_id}"))
         if response.status_code == 200:
+            http.invalidate("/rules")
             return f"✅ Rule {rule_id} deleted"
         else:
             return f"❌ Failed to delete rule {rule_id}: {response.text}"
@@ -107,9 +110,9 @@ def fetch_search_responses() -> Dict:
     Fetch search responses for all rules with action 'search'.
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/rules/search-responses/")
-        response.raise_for_status()
-        return response.json()
+        return http.get_json(
+            "/rules/search-responses/", ttl=API_CACHE_TTL["search_responses"]
+        )
     except Exception as e:
         logger.error(f"Error fetching search responses: {e}")
         return {"error": str(e)}
@@ -120,10 +123,48 @@ def fetch_summary_status(summary_id: str) -> str:
     Fetch search responses for all rules with action 'search'.
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/summary-status/{summary_id}")
-        response.raise_for_status()
-        return response.json()
+        return http.get_json(
+            f"/summary-status/{summary_id}", ttl=API_CACHE_TTL["summary_status"]
+        )
     except Exception as e:
         logger.error(f"Error fetching search responses: {e}")
         return str(e)
 
+
+
+def fetch_summary_statuses(summary_ids: List[str]) -> Dict:
+    """
+    Fetch the status of several summaries in one request.
+    Returns {summary_id: status}; empty on error.
+    """
+    if not summary_ids:
+        return {}
+    try:
+        response = http.session.post(
+            http.url("/summary-status/batch"),
+            json={"summary_ids": list(summary_ids)},
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.error(f"Error fetching summary statuses: {e}")
+        return {}
+
+
+def fetch_event_history(
+    camera: str, start_time: float, end_time: float, label: Optional[str] = None
+) -> List[dict]:
+    """
+    Fetch rule-matched events for a camera that started within a time window.
+    """
+    params = {"camera": camera, "start_time": start_time, "end_time": end_time}
+    if label:
+        params["label"] = label
+    try:
+        return http.get_json(
+            "/events/history", params=params, ttl=API_CACHE_TTL["events"], timeout=15
+        )
+    except Exception as e:
+        logger.error(f"Error fetching event history: {e}")
+        return []
@@ -1,21 +1,213 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: Apache-2.0
+import heapq
+from operator import itemgetter
+import threading
 from datetime import datetime
+import numpy as np
 from ui.config import logger
 from typing import List, Dict, Optional, Tuple
 import gradio as gr
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Epoch seconds outside these are out of datetime's range (years 1 to 9999)
+MIN_TIMESTAMP = -62135596800
+MAX_TIMESTAMP = 253402300799
+
 
 def format_timestamp(ts):
     try:
         if ts is None:
             return "N/A"
-        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.fromtimestamp(ts).strftime(TIMESTAMP_FORMAT)
     except Exception as e:
         logger.error(f"Timestamp formatting error: {e}")
         return "Invalid Timestamp"
 
 
+def _local_offset(ts: int) -> float:
+    try:
+        return datetime.fromtimestamp(ts).astimezone().utcoffset().total_seconds()
+    except (ValueError, OverflowError, OSError):
+        # Local time falls outside datetime's range near years 1 and 9999
+        return np.nan
+
+
+def _local_offsets(seconds: np.ndarray) -> np.ndarray:
+    """UTC offset of each timestamp, NaN where local time cannot be represented."""
+    # UTC offsets only change on quarter-hour boundaries: look each bucket up once
+    buckets, inverse = np.unique(seconds // 900, return_inverse=True)
+    offsets = np.array([_local_offset(bucket * 900) for bucket in buckets.tolist()])
+    return offsets[inverse]
+
+
+def format_timestamps(values) -> List[str]:
+    """Columnar format_timestamp: formats a whole column of epoch seconds at once."""
+    values = list(values)
+    result = np.full(len(values), "N/A", dtype=object)
+    numeric = np.array(
+        [v if isinstance(v, (int, float)) else np.nan for v in values], dtype=float
+    )
+    valid = np.isfinite(numeric) & (numeric > MIN_TIMESTAMP) & (numeric < MAX_TIMESTAMP)
+
+    if valid.any():
+        indices = np.flatnonzero(valid)
+        seconds = np.floor(numeric[indices]).astype(np.int64)
+        offsets = _local_offsets(seconds)
+        representable = np.isfinite(offsets)
+        valid[indices[~representable]] = False
+        if representable.any():
+            local = (
+                seconds[representable] + offsets[representable].astype(np.int64)
+            ).astype("datetime64[s]")
+            result[indices[representable]] = np.char.replace(
+                np.datetime_as_string(local), "T", " "
+            )
+
+    invalid = ~valid & np.array([v is not None for v in values], dtype=bool)
+    if invalid.any():
+        logger.error(f"Timestamp formatting error: {int(invalid.sum())} invalid value(s)")
+        result[invalid] = "Invalid Timestamp"
+    return result.tolist()
+
+
+def _thumbnail_html(thumbnail) -> str:
+    if thumbnail:
+        return f'<img src="data:image/jpeg;base64,{thumbnail}" style="width:80px;height:60px;object-fit:cover;" alt="Event Thumbnail">'
+    return "No Image"
+
+
+def format_event_rows(events: List[dict]) -> List[List]:
+    """Bulk version of display_events: same rows, with timestamps formatted per column."""
+    if not events:
+        return []
+    starts = format_timestamps(event.get("start_time") for event in events)
+    ends = format_timestamps(event.get("end_time") for event in events)
+
+    rows = []
+    for event, start, end in zip(events, starts, ends):
+        data = event.get("data") or {}
+        has_description = isinstance(data, dict) and "description" in data
+        rows.append(
+            [
+                str(event.get("label", "N/A")),
+                start,
+                end,
+                str(data.get("top_score", "N/A")) if has_description else "NA",
+                str(data.get("description", "N/A")) if has_description else "N/A",
+                _thumbnail_html(event.get("thumbnail", "")),
+            ]
+        )
+    return rows
+
+
+def _event_key(event: dict):
+    return event.get("id") or (event.get("label"), event.get("start_time"))
+
+
+def _event_signature(event: dict):
+    # Fields that change while an event is in progress or being described
+    data = event.get("data") or {}
+    if not isinstance(data, dict):
+        data = {}
+    return (
+        event.get("end_time"),
+        data.get("top_score"),
+        data.get("description"),
+        bool(event.get("thumbnail")),
+    )
+
+
+def _start_time(event: dict) -> float:
+    start_time = event.get("start_time")
+    return start_time if isinstance(start_time, (int, float)) else 0
+
+
+class EventTableModel:
+    """
+    Incremental events table per camera.
+
+    Formatted rows are kept between refreshes. Each refresh only formats
+    events that are new since the last one (or whose end time, score,
+    description or thumbnail changed), drops events no longer returned,
+    and merges new rows into the existing newest-first order instead of
+    re-sorting everything.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def update(self, camera: str, events: List[dict]) -> List[List]:
+        """Apply the latest event list for camera and return the table rows."""
+        with self._lock:
+            table = self._tables.setdefault(
+                camera, {"rows": {}, "signatures": {}, "order": [], "cursor": None}
+            )
+            rows, signatures = table["rows"], table["signatures"]
+
+            changed, new = [], []
+            seen = set()
+            for event in events:
+                key = _event_key(event)
+                if key in seen:
+                    # Duplicates in one refresh would otherwise become duplicate rows
+                    continue
+                seen.add(key)
+                signature = _event_signature(event)
+                if signatures.get(key) != signature:
+                    changed.append((key, signature, event))
+                    if key not in rows:
+                        new.append((_start_time(event), key))
+
+            removed = rows.keys() - seen
+            for key in removed:
+                del rows[key]
+                del signatures[key]
+
+            if changed:
+                formatted = format_event_rows([event for _, _, event in changed])
+                for (key, signature, _), row in zip(changed, formatted):
+                    rows[key] = row
+                    signatures[key] = signature
+
+            self._reorder(table, new, removed)
+
+            logger.info(
+                f"Events table for {camera}: {len(changed)} row(s) formatted, "
+                f"{len(removed)} removed, {len(rows)} total"
+            )
+            return [list(rows[key]) for _, key in table["order"]]
+
+    @staticmethod
+    def _reorder(table: dict, new: list, removed: set):
+        order = table["order"]
+        if removed:
+            order = [item for item in order if item[1] not in removed]
+        if new:
+            new.sort(key=itemgetter(0), reverse=True)
+            if not order or new[-1][0] >= order[0][0]:
+                # Common case: everything new is newer than what is shown
+                order = new + order
+            else:
+                order = list(heapq.merge(new, order, key=itemgetter(0), reverse=True))
+        table["order"] = order
+        table["cursor"] = order[0][0] if order else None
+
+    def cursor(self, camera: str) -> Optional[float]:
+        """Start time of the newest event shown for camera."""
+        with self._lock:
+            table = self._tables.get(camera)
+            return table["cursor"] if table else None
+
+    def reset(self, camera: Optional[str] = None):
+        with self._lock:
+            if camera is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(camera, None)
+
+
 def display_events(recent_events) -> List[List]:
     """Format events for display in a table."""
     logger.info(f"Displaying {len(recent_events)} events in table")
@@ -0,0 +1,111 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Dict, Optional
+
+
+class _InflightCall:
+    """A GET currently being fetched; concurrent identical calls wait on it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CachedHttpClient:
+    """
+    Shared HTTP client used by every UI session to talk to the router.
+
+    - One pooled requests.Session, so connections are reused across calls.
+    - Per-endpoint TTL cache for GET requests.
+    - Request coalescing: concurrent identical GETs share a single upstream call.
+    - Invalidation by path prefix after write actions (add/delete rule).
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 20):
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, tuple] = {}
+        self._inflight: Dict[tuple, _InflightCall] = {}
+        # Bumped on every invalidation so in-flight reads don't cache stale data
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def get_json(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        ttl: float = 0.0,
+        timeout: Optional[float] = None,
+        transform: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        GET a JSON resource. Results are cached for `ttl` seconds and
+        `transform` is applied once, before the result is cached.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                self.stats["hits"] += 1
+                return cached[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InflightCall()
+                generation = self._generation
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            response = self.session.get(self.url(path), params=params, timeout=timeout)
+            response.raise_for_status()
+            result = response.json()
+            if transform:
+                result = transform(result)
+            call.result = result
+            if ttl > 0:
+                with self._lock:
+                    if generation == self._generation:
+                        self._cache[key] = (time.monotonic() + ttl, result)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def invalidate(self, *prefixes: str):
+        """Drop cached entries whose path starts with any of the prefixes (all if none given)."""
+        with self._lock:
+            self._generation += 1
+            for key in list(self._cache):
+                if not prefixes or key[0].startswith(prefixes):
+                    del self._cache[key]
+
+    def clear(self):
+        self.invalidate()
@@ -0,0 +1,215 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: Apache-2.0
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+from ui.config import (
+    SUMMARY_POLL_INTERVAL,
+    SUMMARY_POLL_MAX_INTERVAL,
+    SUMMARY_POLL_BATCH_SIZE,
+    SUMMARY_POLL_RETENTION,
+    logger,
+)
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def parse_summary_response(raw_response) -> dict:
+    """Normalize a summary-status response into a dict, raising ValueError on errors."""
+    if isinstance(raw_response, dict):
+        return raw_response
+    if isinstance(raw_response, str) and raw_response.strip():
+        try:
+            response = json.loads(raw_response)
+        except json.JSONDecodeError:
+            raise ValueError(raw_response)
+        if isinstance(response, dict):
+            return response
+    raise ValueError(f"Invalid summary status response: {raw_response!r}")
+
+
+def is_client_error(response: dict) -> bool:
+    status = response.get("status")
+    return isinstance(status, int) and 400 <= status < 500
+
+
+def summary_state(response: dict) -> str:
+    """
+    The router returns frameSummaries while VSS is still working and only the
+    final summary once it is done. An explicit status field wins if present.
+    The batch endpoint reports failed lookups as {"error": ..., "status": code}.
+    Only a 4xx (e.g. an unknown summary ID) is final; 5xx, timeouts and open
+    circuits may clear up, so those stay pending.
+    """
+    if response.get("error"):
+        return FAILED if is_client_error(response) else PENDING
+    status = str(response.get("status", "")).lower()
+    if status in (COMPLETED, FAILED):
+        return status
+    if response.get("summary") and "frameSummaries" not in response:
+        return COMPLETED
+    return PENDING
+
+
+class SummaryStatusPoller:
+    """
+    Single background thread polling every tracked summary ID.
+
+    Due IDs are fetched together in batches of up to batch_size. An ID whose
+    status did not change (or whose fetch failed) backs off exponentially up to
+    max_interval; any change resets it to interval. Results are kept in a
+    shared state store that Gradio callbacks read with get(), so UI timers
+    never hit the router themselves.
+
+    fetch_many(summary_ids) returns {summary_id: raw status response}; IDs
+    missing from the result count as failed fetches.
+    """
+
+    def __init__(
+        self,
+        fetch_many: Callable[[Iterable[str]], Dict[str, object]],
+        interval: float = SUMMARY_POLL_INTERVAL,
+        max_interval: float = SUMMARY_POLL_MAX_INTERVAL,
+        batch_size: int = SUMMARY_POLL_BATCH_SIZE,
+        retention: float = SUMMARY_POLL_RETENTION,
+    ):
+        self._fetch_many = fetch_many
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.batch_size = max(1, batch_size)
+        self.retention = retention
+
+        self._entries: Dict[str, dict] = {}
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, summary_id: str, delay: float = 0.0):
+        """Start (or restart) polling a summary ID."""
+        with self._condition:
+            entry = self._entries.get(summary_id)
+            if entry is None:
+                entry = self._entries[summary_id] = {
+                    "state": PENDING,
+                    "response": None,
+                    "error": None,
+                    "updated_at": None,
+                }
+            entry["interval"] = self.interval
+            entry["next_poll"] = time.monotonic() + delay
+            self._ensure_thread()
+            self._condition.notify()
+        logger.info(f"Tracking summary {summary_id} in the status poller")
+
+    def get(self, summary_id: str) -> Optional[dict]:
+        """Latest known state of a summary ID, or None if it is not tracked."""
+        with self._condition:
+            entry = self._entries.get(summary_id)
+            return dict(entry) if entry else None
+
+    def poll_now(self, summary_id: str) -> dict:
+        """Fetch one ID immediately (manual refresh) and return its updated state."""
+        # Push the background poll back so the ID isn't fetched twice
+        self.track(summary_id, delay=self.interval)
+        self._poll([summary_id])
+        return self.get(summary_id)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="summary-status-poller", daemon=True
+        )
+        self._thread.start()
+
+    def _due_ids(self, now: float) -> list:
+        due = [
+            (entry["next_poll"], summary_id)
+            for summary_id, entry in self._entries.items()
+            if entry["state"] == PENDING and entry["next_poll"] <= now
+        ]
+        return [summary_id for _, summary_id in sorted(due)[: self.batch_size]]
+
+    def _next_wakeup(self, now: float) -> Optional[float]:
+        pending = [
+            entry["next_poll"]
+            for entry in self._entries.values()
+            if entry["state"] == PENDING
+        ]
+        return max(0.0, min(pending) - now) if pending else None
+
+    def _evict_finished(self, now: float):
+        for summary_id, entry in list(self._entries.items()):
+            if entry["state"] != PENDING and now - entry["updated_at"] > self.retention:
+                del self._entries[summary_id]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopped:
+                    return
+                now = time.monotonic()
+                self._evict_finished(now)
+                batch = self._due_ids(now)
+                if not batch:
+                    self._condition.wait(timeout=self._next_wakeup(now))
+                    continue
+            self._poll(batch)
+
+    def _poll(self, batch: list):
+        try:
+            results = self._fetch_many(batch)
+        except Exception as e:
+            logger.error(f"Summary status batch fetch failed: {e}")
+            results = {}
+
+        now = time.monotonic()
+        with self._condition:
+            for summary_id in batch:
+                entry = self._entries.get(summary_id)
+                if entry is None:
+                    continue
+                self._apply(summary_id, entry, results.get(summary_id), now)
+
+    def _apply(self, summary_id: str, entry: dict, raw_response, now: float):
+        entry["updated_at"] = now
+        try:
+            if raw_response is None:
+                raise ValueError("No status returned")
+            response = parse_summary_response(raw_response)
+            if response.get("error") and summary_state(response) == PENDING:
+                # Transient upstream failure: retry later like a failed fetch
+                raise ValueError(response["error"])
+        except ValueError as e:
+            entry["error"] = str(e)
+            self._back_off(entry, now)
+            logger.warning(f"Summary {summary_id} status fetch failed: {e}")
+            return
+
+        changed = response != entry["response"]
+        entry["response"] = response
+        entry["error"] = response.get("error")
+        entry["state"] = summary_state(response)
+        if entry["state"] != PENDING:
+            logger.info(f"Summary {summary_id} finished with state {entry['state']}")
+        elif changed:
+            entry["interval"] = self.interval
+            entry["next_poll"] = now + entry["interval"]
+        else:
+            self._back_off(entry, now)
+
+    def _back_off(self, entry: dict, now: float):
+        entry["interval"] = min(entry["interval"] * 2, self.max_interval)
+        entry["next_poll"] = now + entry["interval"]
@@ -11,18 +11,29 @@ from ui.services.api_client import (
     delete_rule_by_id,
     fetch_search_responses,
     fetch_summary_status,
+    fetch_summary_statuses,
+    fetch_event_history,
+    http,
 )
 
 API_RULE_ID = "cam1-person-summarize-abcdef12"
 SUMMARY_ID = "summary-id-001"
 
+
+@pytest.fixture(autouse=True)
+def clear_api_cache():
+    http.clear()
+    yield
+    http.clear()
+
+
 # === fetch_cameras ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_cameras_success(mock_get):
     mock_get.return_value = MagicMock(status_code=200, json=lambda: {"cameras": ["cam1", "cam2"]})
     assert fetch_cameras() == ["cam1", "cam2"]
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Connection failed"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Connection failed"))
 @patch("ui.services.api_client.logger")
 def test_fetch_cameras_failure(mock_logger, mock_get):
     assert fetch_cameras() == []
@@ -30,14 +41,14 @@ def test_fetch_cameras_failure(mock_logger, mock_get):
 
 
 # === fetch_events ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_events_success(mock_get):
     data = [{"start_time": 1}, {"start_time": 5}, {"start_time": 2}]
     mock_get.return_value = MagicMock(status_code=200, json=lambda: data)
     result = fetch_events("cam1")
     assert result == sorted(data, key=lambda x: x["start_time"], reverse=True)
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Timeout"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Timeout"))
 @patch("ui.services.api_client.logger")
 def test_fetch_events_failure(mock_logger, mock_get):
     assert fetch_events("cam1") == []
@@ -45,8 +56,8 @@ def test_fetch_events_failure(mock_logger, mock_get):
 
 
 # === add_rule ===
-@patch("ui.services.api_client.requests.post")
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.post")
+@patch("ui.services.api_client.http.session.get")
 def test_add_rule_success(mock_get, mock_post):
     mock_get.return_value = MagicMock(status_code=404)
     mock_post.return_value = MagicMock(status_code=200)
@@ -54,21 +65,29 @@ def test_add_rule_success(mock_get, mock_post):
     assert response["status"] == "success"
     assert "rule_id" in response
 
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.post")
+@patch("ui.services.api_client.http.session.get")
+def test_add_rule_sends_priority(mock_get, mock_post):
+    mock_get.return_value = MagicMock(status_code=404)
+    mock_post.return_value = MagicMock(status_code=200)
+    add_rule("cam1", "person", "Summarize", "High")
+    assert mock_post.call_args.kwargs["json"]["priority"] == "high"
+
+@patch("ui.services.api_client.http.session.get")
 def test_add_rule_exists(mock_get):
     mock_get.return_value = MagicMock(status_code=200)
     result = add_rule("cam1", "person", "summarize")
     assert result["status"] == "exists"
     assert "rule_id" in result
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Error checking rule"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Error checking rule"))
 def test_add_rule_check_error(mock_get):
     result = add_rule("cam1", "person", "summarize")
     assert result["status"] == "error"
     assert "Error checking rule" in result["message"]
 
-@patch("ui.services.api_client.requests.get", return_value=MagicMock(status_code=404))
-@patch("ui.services.api_client.requests.post", side_effect=Exception("Post failed"))
+@patch("ui.services.api_client.http.session.get", return_value=MagicMock(status_code=404))
+@patch("ui.services.api_client.http.session.post", side_effect=Exception("Post failed"))
 def test_add_rule_post_error(mock_post, mock_get):
     result = add_rule("cam1", "person", "summarize")
     assert result["status"] == "error"
@@ -76,12 +95,12 @@ def test_add_rule_post_error(mock_post, mock_get):
 
 
 # === fetch_rules ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_rules_success(mock_get):
     mock_get.return_value = MagicMock(status_code=200, json=lambda: [{"id": "rule1"}])
     assert fetch_rules() == [{"id": "rule1"}]
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Fetch failed"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Fetch failed"))
 @patch("ui.services.api_client.logger")
 def test_fetch_rules_failure(mock_logger, mock_get):
     assert fetch_rules() == []
@@ -89,12 +108,12 @@ def test_fetch_rules_failure(mock_logger, mock_get):
 
 
 # === fetch_rule_responses ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_rule_responses_success(mock_get):
     mock_get.return_value = MagicMock(status_code=200, json=lambda: {"r1": "response1"})
     assert fetch_rule_responses() == {"r1": "response1"}
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("API Down"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("API Down"))
 @patch("ui.services.api_client.logger")
 def test_fetch_rule_responses_failure(mock_logger, mock_get):
     result = fetch_rule_responses()
@@ -103,19 +122,19 @@ def test_fetch_rule_responses_failure(mock_logger, mock_get):
 
 
 # === delete_rule_by_id ===
-@patch("ui.services.api_client.requests.delete")
+@patch("ui.services.api_client.http.session.delete")
 def test_delete_rule_by_id_success(mock_delete):
     mock_delete.return_value = MagicMock(status_code=200)
     result = delete_rule_by_id(API_RULE_ID)
     assert result.startswith("✅")
 
-@patch("ui.services.api_client.requests.delete")
+@patch("ui.services.api_client.http.session.delete")
 def test_delete_rule_by_id_failure(mock_delete):
     mock_delete.return_value = MagicMock(status_code=400, text="Bad Request")
     result = delete_rule_by_id(API_RULE_ID)
     assert result.startswith("❌")
 
-@patch("ui.services.api_client.requests.delete", side_effect=Exception("Internal Error"))
+@patch("ui.services.api_client.http.session.delete", side_effect=Exception("Internal Error"))
 @patch("ui.services.api_client.logger")
 def test_delete_rule_by_id_error(mock_logger, mock_delete):
     result = delete_rule_by_id(API_RULE_ID)
@@ -124,12 +143,12 @@ def test_delete_rule_by_id_error(mock_logger, mock_delete):
 
 
 # === fetch_search_responses ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_search_responses_success(mock_get):
     mock_get.return_value = MagicMock(status_code=200, json=lambda: {"search": "ok"})
     assert fetch_search_responses() == {"search": "ok"}
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Failure"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Failure"))
 @patch("ui.services.api_client.logger")
 def test_fetch_search_responses_failure(mock_logger, mock_get):
     assert "error" in fetch_search_responses()
@@ -137,14 +156,129 @@ def test_fetch_search_responses_failure(mock_logger, mock_get):
 
 
 # === fetch_summary_status ===
-@patch("ui.services.api_client.requests.get")
+@patch("ui.services.api_client.http.session.get")
 def test_fetch_summary_status_success(mock_get):
     mock_get.return_value = MagicMock(status_code=200, json=lambda: "complete")
     assert fetch_summary_status(SUMMARY_ID) == "complete"
 
-@patch("ui.services.api_client.requests.get", side_effect=Exception("Summary not found"))
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Summary not found"))
 @patch("ui.services.api_client.logger")
 def test_fetch_summary_status_failure(mock_logger, mock_get):
     result = fetch_summary_status(SUMMARY_ID)
     assert "Summary not found" in result
     mock_logger.error.assert_called_once()
+
+
+# === fetch_summary_statuses ===
+@patch("ui.services.api_client.http.session.post")
+def test_fetch_summary_statuses_single_request(mock_post):
+    data = {"s1": {"summary": "done"}, "s2": {"summary": "pending", "frameSummaries": []}}
+    mock_post.return_value = MagicMock(status_code=200, json=lambda: data)
+    assert fetch_summary_statuses(["s1", "s2"]) == data
+    mock_post.assert_called_once()
+    assert mock_post.call_args.kwargs["json"] == {"summary_ids": ["s1", "s2"]}
+
+@patch("ui.services.api_client.http.session.post", side_effect=Exception("Router down"))
+@patch("ui.services.api_client.logger")
+def test_fetch_summary_statuses_failure(mock_logger, mock_post):
+    assert fetch_summary_statuses(["s1"]) == {}
+    mock_logger.error.assert_called_once()
+
+@patch("ui.services.api_client.http.session.post")
+def test_fetch_summary_statuses_empty(mock_post):
+    assert fetch_summary_statuses([]) == {}
+    mock_post.assert_not_called()
+
+
+# === fetch_event_history ===
+@patch("ui.services.api_client.http.session.get")
+def test_fetch_event_history_success(mock_get):
+    data = [{"id": "e1", "camera": "cam1", "label": "person", "start_time": 100.0}]
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: data)
+    assert fetch_event_history("cam1", 50, 150, "person") == data
+    assert mock_get.call_args.kwargs["params"] == {
+        "camera": "cam1", "start_time": 50, "end_time": 150, "label": "person"
+    }
+
+@patch("ui.services.api_client.http.session.get", side_effect=Exception("Timeout"))
+@patch("ui.services.api_client.logger")
+def test_fetch_event_history_failure(mock_logger, mock_get):
+    assert fetch_event_history("cam1", 50, 150) == []
+    mock_logger.error.assert_called_once()
+
+
+# === shared client cache ===
+@patch("ui.services.api_client.http.session.get")
+def test_fetch_rules_is_cached(mock_get):
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [{"id": "rule1"}])
+    assert fetch_rules() == fetch_rules()
+    assert mock_get.call_count == 1
+
+@patch("ui.services.api_client.http.session.get")
+def test_fetch_events_cached_per_camera(mock_get):
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [{"start_time": 1}])
+    fetch_events("cam1")
+    fetch_events("cam1")
+    fetch_events("cam2")
+    assert mock_get.call_count == 2
+
+@patch("ui.services.api_client.http.session.post")
+@patch("ui.services.api_client.http.session.get")
+def test_add_rule_invalidates_rules_cache(mock_get, mock_post):
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [])
+    fetch_rules()
+    mock_get.return_value = MagicMock(status_code=404)
+    mock_post.return_value = MagicMock(status_code=200)
+    add_rule("cam1", "person", "summarize")
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [{"id": "rule1"}])
+    assert fetch_rules() == [{"id": "rule1"}]
+
+@patch("ui.services.api_client.http.session.delete")
+@patch("ui.services.api_client.http.session.get")
+def test_delete_rule_invalidates_rules_cache(mock_get, mock_delete):
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [{"id": API_RULE_ID}])
+    fetch_rules()
+    mock_delete.return_value = MagicMock(status_code=200)
+    delete_rule_by_id(API_RULE_ID)
+    mock_get.return_value = MagicMock(status_code=200, json=lambda: [])
+    assert fetch_rules() == []
+
+@patch("ui.services.api_client.http.session.get")
+def test_failed_fetch_is_not_cached(mock_get):
+    mock_get.side_effect = [Exception("Down"), MagicMock(status_code=200, json=lambda: [{"id": "r"}])]
+    assert fetch_rules() == []
+    assert fetch_rules() == [{"id": "r"}]
+
+def test_concurrent_identical_calls_are_coalesced():
+    import threading
+    import time
+
+    release = threading.Event()
+    calls = []
+
+    def slow_get(*args, **kwargs):
+        calls.append(args)
+        release.wait(timeout=5)
+        return MagicMock(status_code=200, json=lambda: {"cam1": ["person"]})
+
+    coalesced = http.stats["coalesced"]
+    with patch("ui.services.api_client.http.session.get", side_effect=slow_get):
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(fetch_cameras()))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        # Bounded so a coalescing regression fails instead of hanging the suite
+        deadline = time.monotonic() + 5
+        while http.stats["coalesced"] - coalesced < 4 and time.monotonic() < deadline:
+            threading.Event().wait(0.01)
+        waiting = http.stats["coalesced"] - coalesced
+        release.set()
+        for t in threads:
+            t.join()
+
+    assert waiting == 4
+    assert len(calls) == 1
+    assert results == [{"cam1": ["person"]}] * 5
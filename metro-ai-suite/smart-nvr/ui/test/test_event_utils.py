@@ -1,6 +1,12 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from ui.services.event_utils import format_timestamp, display_events
+from ui.services.event_utils import (
+    format_timestamp,
+    format_timestamps,
+    format_event_rows,
+    display_events,
+    EventTableModel,
+)
 
 
 def test_format_timestamp_valid():
@@ -47,3 +53,74 @@ def test_display_events_malformed(mock_logger):
     events = [{"bad_key": "value"}]
     rows = display_events(events)
     assert rows == [['N/A', 'N/A', 'N/A', 'NA', 'N/A', 'No Image']]
+
+
+# === columnar formatting / incremental table ===
+def test_format_timestamps_matches_format_timestamp():
+    values = [1721126400, 1721126460.5, None]
+    assert format_timestamps(values) == [format_timestamp(v) for v in values]
+
+
+@patch("ui.services.event_utils.logger")
+def test_format_timestamps_invalid(mock_logger):
+    assert format_timestamps(["bad"]) == ["Invalid Timestamp"]
+    mock_logger.error.assert_called_once()
+
+
+@patch("ui.services.event_utils.logger")
+def test_format_timestamps_out_of_range(mock_logger):
+    values = [-1e11, 1e12, -62135596800 + 1, 1721126400]
+    result = format_timestamps(values)
+    assert result[:2] == ["Invalid Timestamp", "Invalid Timestamp"]
+    assert result[3] == format_timestamp(1721126400)
+
+
+def test_format_event_rows_matches_display_events():
+    events = [
+        {
+            "label": "vehicle",
+            "start_time": 1721126400,
+            "end_time": None,
+            "data": {"top_score": 0.92, "description": "Vehicle detected"},
+            "thumbnail": "fakebase64string",
+        },
+        {"label": "person", "start_time": 1721126500, "end_time": 1721126560},
+        {"bad_key": "value"},
+    ]
+    assert format_event_rows(events) == display_events(events)
+
+
+def make_event(event_id, start_time, **kwargs):
+    return dict({"id": event_id, "label": "person", "start_time": start_time}, **kwargs)
+
+
+@patch("ui.services.event_utils.format_event_rows", wraps=format_event_rows)
+def test_event_table_model_only_formats_new_events(mock_format):
+    model = EventTableModel()
+    first = [make_event("a", 100), make_event("b", 200)]
+    rows = model.update("cam1", first)
+    assert [row[1] for row in rows] == [format_timestamp(200), format_timestamp(100)]
+    assert model.cursor("cam1") == 200
+
+    rows = model.update("cam1", first + [make_event("c", 300)])
+    formatted = mock_format.call_args[0][0]
+    assert [event["id"] for event in formatted] == ["c"]
+    assert [row[1] for row in rows] == [format_timestamp(t) for t in (300, 200, 100)]
+    assert model.cursor("cam1") == 300
+
+
+def test_event_table_model_skips_duplicate_events():
+    model = EventTableModel()
+    rows = model.update("cam1", [make_event("a", 100), make_event("a", 100), make_event("b", 200)])
+    assert len(rows) == 2
+
+
+def test_event_table_model_updates_and_removes_events():
+    model = EventTableModel()
+    model.update("cam1", [make_event("a", 100), make_event("b", 200)])
+
+    rows = model.update("cam1", [make_event("b", 200, end_time=260), make_event("x", 150)])
+
+    assert len(rows) == 2
+    assert rows[0][2] == format_timestamp(260)
+    assert rows[1][1] == format_timestamp(150)
@@ -0,0 +1,172 @@
+# test/test_summary_poller.py
+
+import threading
+from unittest.mock import MagicMock
+from ui.services.summary_poller import (
+    SummaryStatusPoller,
+    parse_summary_response,
+    summary_state,
+    PENDING,
+    COMPLETED,
+    FAILED,
+)
+
+IN_PROGRESS = {"summary": "Final summary is being generated", "frameSummaries": []}
+DONE = {"summary": "A person walked in."}
+
+
+def make_poller(fetch_many, **kwargs):
+    kwargs.setdefault("interval", 1.0)
+    kwargs.setdefault("max_interval", 8.0)
+    return SummaryStatusPoller(fetch_many=fetch_many, **kwargs)
+
+
+# === response helpers ===
+def test_parse_summary_response_accepts_dict_and_json():
+    assert parse_summary_response(DONE) == DONE
+    assert parse_summary_response('{"summary": "x"}') == {"summary": "x"}
+
+def test_parse_summary_response_rejects_error_string():
+    try:
+        parse_summary_response("Connection refused")
+    except ValueError as e:
+        assert "Connection refused" in str(e)
+    else:
+        assert False, "expected ValueError"
+
+def test_summary_state():
+    assert summary_state(IN_PROGRESS) == PENDING
+    assert summary_state(DONE) == COMPLETED
+    assert summary_state({"status": "failed"}) == "failed"
+    assert summary_state({"error": "Summary not found", "status": 404}) == FAILED
+    assert summary_state({"error": "VSS unavailable", "status": 503}) == PENDING
+    assert summary_state({"error": "Read timed out"}) == PENDING
+
+
+# === polling ===
+def test_batch_polls_all_due_ids_in_one_call():
+    fetch_many = MagicMock(return_value={"a": IN_PROGRESS, "b": DONE})
+    poller = make_poller(fetch_many)
+    for summary_id in ("a", "b"):
+        poller._entries[summary_id] = {
+            "state": PENDING, "response": None, "error": None,
+            "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+        }
+
+    poller._poll(poller._due_ids(now=1.0))
+
+    fetch_many.assert_called_once_with(["a", "b"])
+    assert poller.get("a")["state"] == PENDING
+    assert poller.get("b")["state"] == COMPLETED
+    assert poller.get("b")["response"] == DONE
+
+def test_batch_size_limits_ids_per_call():
+    poller = make_poller(MagicMock(), batch_size=2)
+    for summary_id in ("a", "b", "c"):
+        poller._entries[summary_id] = {
+            "state": PENDING, "response": None, "error": None,
+            "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+        }
+    assert len(poller._due_ids(now=1.0)) == 2
+
+def test_unchanged_status_backs_off_exponentially():
+    poller = make_poller(MagicMock(return_value={"a": IN_PROGRESS}))
+    poller._entries["a"] = {
+        "state": PENDING, "response": IN_PROGRESS, "error": None,
+        "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+    }
+    intervals = []
+    for _ in range(5):
+        poller._poll(["a"])
+        intervals.append(poller.get("a")["interval"])
+    assert intervals == [2.0, 4.0, 8.0, 8.0, 8.0]
+
+def test_changed_status_resets_interval():
+    poller = make_poller(MagicMock(return_value={"a": {"summary": "x", "frameSummaries": [1]}}))
+    poller._entries["a"] = {
+        "state": PENDING, "response": IN_PROGRESS, "error": None,
+        "updated_at": None, "interval": 8.0, "next_poll": 0.0,
+    }
+    poller._poll(["a"])
+    assert poller.get("a")["interval"] == 1.0
+
+def test_fetch_error_is_recorded_and_backs_off():
+    poller = make_poller(MagicMock(side_effect=Exception("router down")))
+    poller._entries["a"] = {
+        "state": PENDING, "response": None, "error": None,
+        "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+    }
+    poller._poll(["a"])
+    entry = poller.get("a")
+    assert entry["state"] == PENDING
+    assert entry["error"]
+    assert entry["interval"] == 2.0
+
+def test_error_response_fails_the_summary_and_stops_polling():
+    poller = make_poller(
+        MagicMock(return_value={"a": {"error": "Summary not found", "status": 404}})
+    )
+    poller._entries["a"] = {
+        "state": PENDING, "response": None, "error": None,
+        "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+    }
+    poller._poll(["a"])
+    entry = poller.get("a")
+    assert entry["state"] == FAILED
+    assert entry["error"] == "Summary not found"
+    assert poller._due_ids(now=100.0) == []
+
+def test_upstream_error_keeps_polling_with_backoff():
+    fetch = MagicMock(return_value={"a": {"error": "VSS unavailable", "status": 503}})
+    poller = make_poller(fetch)
+    poller._entries["a"] = {
+        "state": PENDING, "response": IN_PROGRESS, "error": None,
+        "updated_at": None, "interval": 1.0, "next_poll": 0.0,
+    }
+    poller._poll(["a"])
+    entry = poller.get("a")
+    assert entry["state"] == PENDING
+    assert entry["response"] == IN_PROGRESS
+    assert entry["error"] == "VSS unavailable"
+    assert entry["interval"] == 2.0
+
+    fetch.return_value = {"a": DONE}
+    poller._poll(["a"])
+    assert poller.get("a")["state"] == COMPLETED
+
+def test_finished_entries_are_evicted_after_retention():
+    poller = make_poller(MagicMock(), retention=10)
+    poller._entries["a"] = {
+        "state": COMPLETED, "response": DONE, "error": None,
+        "updated_at": 0.0, "interval": 1.0, "next_poll": 0.0,
+    }
+    poller._evict_finished(now=5.0)
+    assert poller.get("a") is not None
+    poller._evict_finished(now=11.0)
+    assert poller.get("a") is None
+
+
+# === background thread ===
+def test_single_thread_polls_tracked_ids_until_completed():
+    calls = []
+
+    def fetch_many(summary_ids):
+        calls.append(list(summary_ids))
+        response = DONE if len(calls) > 2 else IN_PROGRESS
+        return {summary_id: response for summary_id in summary_ids}
+
+    poller = make_poller(fetch_many, interval=0.01, max_interval=0.02)
+    try:
+        poller.track("a")
+        poller.track("b")
+        for _ in range(500):
+            if all(poller.get(s)["state"] == COMPLETED for s in ("a", "b")):
+                break
+            threading.Event().wait(0.01)
+        assert poller.get("a")["state"] == COMPLETED
+        assert poller.get("b")["state"] == COMPLETED
+        polls = len(calls)
+        threading.Event().wait(0.1)
+        assert len(calls) == polls  # completed IDs are no longer polled
+    finally:
+        poller.stop()